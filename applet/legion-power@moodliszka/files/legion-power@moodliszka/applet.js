@@ -403,17 +403,9 @@ class MonitorBrightnessSlider extends PopupMenu.PopupSliderMenuItem {
         let brightness = Math.round(value * 100);
         brightness = Math.max(0, Math.min(100, brightness));
 
-        // Debounce: wait 300ms before actually setting brightness
-        // This prevents flooding ddcutil with commands while dragging
-        if (this._setBrightnessTimeout) {
-            GLib.source_remove(this._setBrightnessTimeout);
-        }
-        
-        this._setBrightnessTimeout = GLib.timeout_add(GLib.PRIORITY_DEFAULT, 300, Lang.bind(this, function() {
-            this._setBrightnessTimeout = 0;
-            this._setBrightness(brightness);
-            return false;
-        }));
+        // The service queues writes per display and only applies the
+        // latest value, so every drag step can be sent right away
+        this._setBrightness(brightness);
         
         // Update label immediately for responsiveness
         this._updateBrightnessLabel(brightness);
@@ -446,16 +438,27 @@ class MonitorBrightnessSlider extends PopupMenu.PopupSliderMenuItem {
         this._getBrightness();
     }
 
+    _brightnessApplied(brightness) {
+        if (!this._seeking)
+            this.setValue(brightness / 100);
+        this._updateBrightnessLabel(brightness);
+    }
+
+    _brightnessFailed(brightness) {
+        global.logError("Monitor " + this._displayId + " did not accept brightness " + brightness);
+        // Show what the monitor is actually at again
+        if (!this._seeking)
+            this._getBrightness();
+    }
+
     _setBrightness(value) {
         if (!this._applet._legionProxy) return;
 
         try {
             this._applet._legionProxy.SetMonitorBrightnessRemote(this._displayId, value, Lang.bind(this, function (error) {
-                if (error) {
+                // The applied value arrives with MonitorBrightnessChanged
+                if (error)
                     global.logError("Failed to set monitor brightness: " + error);
-                    return;
-                }
-                this._updateBrightnessLabel(value);
             }));
         } catch (e) {
             global.logError("Error setting monitor brightness: " + e);
@@ -670,10 +673,32 @@ class LegionPowerApplet extends Applet.TextIconApplet {
                   <arg name="display_id" type="i" />
                   <arg name="brightness" type="i" />
                 </signal>
+                <signal name="MonitorBrightnessFailed">
+                  <arg name="display_id" type="i" />
+                  <arg name="brightness" type="i" />
+                </signal>
+                <signal name="MonitorsChanged">
+                  <arg name="monitors" type="aa{sv}" />
+                </signal>
               </interface>
             </node>`;
             let LegionProxy = Gio.DBusProxy.makeProxyWrapper(LegionInterface);
             this._legionProxy = new LegionProxy(Gio.DBus.system, LegionBusName, "/com/legion/Power");
+            this._legionProxy.connectSignal('MonitorBrightnessChanged', Lang.bind(this, function(proxy, sender, [displayId, brightness]) {
+                for (let slider of this._monitorSliders) {
+                    if (slider._displayId === displayId)
+                        slider._brightnessApplied(brightness);
+                }
+            }));
+            this._legionProxy.connectSignal('MonitorBrightnessFailed', Lang.bind(this, function(proxy, sender, [displayId, brightness]) {
+                for (let slider of this._monitorSliders) {
+                    if (slider._displayId === displayId)
+                        slider._brightnessFailed(brightness);
+                }
+            }));
+            this._legionProxy.connectSignal('MonitorsChanged', Lang.bind(this, function() {
+                this._setupExternalMonitors(true);
+            }));
 
             // Create Legion controls section
             this.menu.addMenuItem(new PopupMenu.PopupSeparatorMenuItem());
@@ -743,7 +768,7 @@ class LegionPowerApplet extends Applet.TextIconApplet {
         }
     }
 
-    _setupExternalMonitors() {
+    _setupExternalMonitors(skipRefresh) {
         global.log("Legion Power: _setupExternalMonitors called");
         
         // Clean up existing monitors
@@ -776,8 +801,12 @@ class LegionPowerApplet extends Applet.TextIconApplet {
         global.log("Legion Power: Refreshing monitor cache...");
 
         // Refresh monitor cache first to detect newly connected monitors
+        // (not needed when called for MonitorsChanged - the service just did)
+        let refresh = skipRefresh ?
+            (callback => callback(null)) :
+            (callback => this._legionProxy.RefreshExternalMonitorsRemote(callback));
         try {
-            this._legionProxy.RefreshExternalMonitorsRemote(Lang.bind(this, function(error) {
+            refresh(Lang.bind(this, function(error) {
                 if (error) {
                     global.logWarning("Could not refresh monitor cache: " + error);
                 }
@@ -0,0 +1,124 @@
+// Reader for the service's shared-memory telemetry segment (--shm).
+//
+// GJS has no mmap, so the whole segment is read with one read() call and
+// accepted when the header sequence is even and equals the trailer copy
+// (the writer stores the trailer before the data and the header last).
+//
+// Usage from applet.js:
+//     const TelemetryShm = imports.ui.appletManager.applets["legion-power@moodliszka"].telemetryShm;
+//     let telemetry = TelemetryShm.read();  // null if unavailable
+//
+// Layout offsets - keep in sync with backend/legion_shm.py.
+
+const ByteArray = imports.byteArray;
+const GLib = imports.gi.GLib;
+
+var SHM_PATH = "/dev/shm/legion-power-telemetry";
+
+const MAGIC = "LEGNTEL";
+const VERSION = 2;
+const RECORD_SIZE = 584;
+const SEQ_OFFSET = 16;
+const TRAILER_OFFSET = 576;
+const DATA = 64;
+const MAX_TEMPS = 8;
+const MAX_FANS = 4;
+const LABEL_SIZE = 32;
+const SLOT_SIZE = LABEL_SIZE + 4;
+const MAX_ATTEMPTS = 3;
+
+const STATES = ["Unknown", "Charging", "Discharging", "Not charging", "Full"];
+const PROFILES = [null, "quiet", "balanced", "performance"];
+const AC_UNKNOWN = 255;
+
+function _label(bytes, offset) {
+    let end = offset;
+    while (end < offset + LABEL_SIZE && bytes[end] !== 0)
+        end++;
+    return ByteArray.toString(bytes.subarray(offset, end));
+}
+
+function _seq(view, offset) {
+    // Sequence numbers stay far below 2^53
+    return view.getUint32(offset, true) + view.getUint32(offset + 4, true) * 0x100000000;
+}
+
+function _decode(bytes, view) {
+    let battery = {
+        capacity: view.getInt32(DATA + 8, true),
+        cycle_count: view.getInt32(DATA + 12, true),
+        voltage: view.getFloat64(DATA + 16, true),
+        power_now: view.getFloat64(DATA + 24, true),
+        energy_now: view.getFloat64(DATA + 32, true),
+        energy_full: view.getFloat64(DATA + 40, true),
+        energy_full_design: view.getFloat64(DATA + 48, true),
+        health: view.getFloat64(DATA + 56, true),
+        state: STATES[view.getUint8(DATA + 72)] || "Unknown"
+    };
+    let timeRemaining = view.getInt32(DATA + 64, true);
+    let timeToFull = view.getInt32(DATA + 68, true);
+    if (timeRemaining >= 0)
+        battery.time_remaining_minutes = timeRemaining;
+    if (timeToFull >= 0)
+        battery.time_to_full_minutes = timeToFull;
+
+    let temperatures = {};
+    let nTemps = Math.min(view.getUint8(DATA + 75), MAX_TEMPS);
+    for (let i = 0; i < nTemps; i++) {
+        let slot = DATA + 76 + i * SLOT_SIZE;
+        temperatures[_label(bytes, slot)] = view.getFloat32(slot + LABEL_SIZE, true);
+    }
+
+    let fans = {};
+    let nFans = Math.min(view.getUint8(DATA + 364), MAX_FANS);
+    for (let i = 0; i < nFans; i++) {
+        let slot = DATA + 368 + i * SLOT_SIZE;
+        fans[_label(bytes, slot)] = view.getUint32(slot + LABEL_SIZE, true);
+    }
+
+    let ac = view.getUint8(DATA + 73);
+    return {
+        timestamp: view.getFloat64(DATA, true),
+        battery: battery,
+        temperatures: temperatures,
+        fans: fans,
+        ac_online: ac === AC_UNKNOWN ? null : ac === 1,
+        power_profile: PROFILES[view.getUint8(DATA + 74)] || null
+    };
+}
+
+/**
+ * Read the latest telemetry published by the service
+ *
+ * Returns an object with timestamp, battery, temperatures, fans,
+ * ac_online and power_profile (same names as the D-Bus API), or null
+ * if the segment is missing, has another layout or nothing was
+ * published yet.
+ */
+function read(path) {
+    for (let attempt = 0; attempt < MAX_ATTEMPTS; attempt++) {
+        let bytes;
+        try {
+            let [ok, contents] = GLib.file_get_contents(path || SHM_PATH);
+            if (!ok)
+                return null;
+            bytes = contents;
+        } catch (e) {
+            return null;
+        }
+        if (bytes.length !== RECORD_SIZE ||
+            ByteArray.toString(bytes.subarray(0, MAGIC.length)) !== MAGIC)
+            return null;
+
+        let view = new DataView(bytes.buffer, bytes.byteOffset, bytes.length);
+        if (view.getUint16(8, true) !== VERSION)
+            return null;
+
+        let seq = _seq(view, SEQ_OFFSET);
+        if (seq === 0)
+            return null;
+        if (seq % 2 === 0 && seq === _seq(view, TRAILER_OFFSET))
+            return _decode(bytes, view);
+    }
+    return null;
+}
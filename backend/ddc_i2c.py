@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+DDC/CI over I2C
+Native VCP Get/Set on /dev/i2c-N without spawning ddcutil
+
+Implements the DDC/CI packet format (VESA DDC/CI 1.1) for the
+commands the toolkit needs:
+    
+    Get VCP request   51 82 01 <code> <chk>            -> 0x37
+    Get VCP reply     6E 88 02 <rc> <code> <type> <max hi> <max lo>
+                      <cur hi> <cur lo> <chk>          <- 0x37
+    Set VCP           51 84 03 <code> <val hi> <val lo> <chk>
+    Capabilities      51 83 F3 <offset hi> <offset lo> <chk>
+    Caps reply        6E 8x E3 <offset hi> <offset lo> <up to 32
+                      bytes of the string> <chk>        <- 0x37
+
+The request checksum XORs the destination address (0x6E) with all bytes,
+the reply checksum the virtual host address (0x50). Monitors need time
+between transactions: 40 ms from a Get request to reading its reply and
+50 ms after any command before the next one.
+
+A device path that is a Unix socket is treated as a simulated bus
+(ddc_simulator.I2CResponder) speaking a tiny read/write framing, so the
+protocol code runs unchanged against the simulator.
+"""
+
+import errno
+import fcntl
+import logging
+import os
+import socket
+import stat
+import struct
+import threading
+import time
+from typing import Tuple
+
+try:
+    from legion_metrics import METRICS
+except ImportError:
+    from .legion_metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+I2C_SLAVE = 0x0703      # ioctl: set the target address for read()/write()
+DDC_CI_ADDR = 0x37      # 7-bit DDC/CI address (0x6E/0x6F on the wire)
+DEST_ADDR = 0x6E        # checksum seed for host -> display
+HOST_ADDR = 0x51        # source address byte of host messages
+REPLY_SEED = 0x50       # checksum seed for display -> host
+
+GET_VCP = 0x01
+GET_VCP_REPLY = 0x02
+SET_VCP = 0x03
+CAPABILITIES = 0xF3
+CAPABILITIES_REPLY = 0xE3
+
+REPLY_SIZE = 11
+CAPS_FRAGMENT = 32
+CAPS_REPLY_SIZE = 6 + CAPS_FRAGMENT
+CAPS_MAX_SIZE = 4096
+
+# Simulated bus framing (SOCK_SEQPACKET): b"W" + data is answered with
+# SIM_ACK or SIM_NACK, b"R" + length with the bytes read
+SIM_WRITE = b"W"
+SIM_READ = b"R"
+SIM_ACK = b"\x00"
+SIM_NACK = b"\x01"
+
+
+class I2CError(Exception):
+    """Raised when a DDC/CI transaction fails"""
+    pass
+
+
+class UnsupportedVCPError(I2CError):
+    """Raised when the display answers that it does not support a VCP code"""
+    pass
+
+
+def checksum(seed: int, data: bytes) -> int:
+    """XOR checksum over data, starting from an address byte"""
+    value = seed
+    for byte in data:
+        value ^= byte
+    return value
+
+
+def encode_request(payload: bytes) -> bytes:
+    """Wrap a command payload into a host -> display packet"""
+    packet = bytes([HOST_ADDR, 0x80 | len(payload)]) + payload
+    return packet + bytes([checksum(DEST_ADDR, packet)])
+
+
+def decode_vcp_reply(reply: bytes, code: int) -> Tuple[int, int]:
+    """
+    Validate a Get VCP reply
+    
+    Returns:
+        (current, maximum)
+    
+    Raises:
+        UnsupportedVCPError: If the display does not support the code
+        I2CError: On a null message, bad checksum or a reply for another
+                  code
+    """
+    if len(reply) >= 3 and reply[1] == 0x80:
+        raise I2CError("Display returned a null message (not ready)")
+    if len(reply) < REPLY_SIZE or reply[0] != DEST_ADDR or reply[1] != 0x88:
+        raise I2CError(f"Malformed VCP reply: {reply.hex()}")
+    if checksum(REPLY_SEED, reply[:REPLY_SIZE - 1]) != reply[REPLY_SIZE - 1]:
+        raise I2CError(f"VCP reply checksum mismatch: {reply.hex()}")
+    if reply[2] != GET_VCP_REPLY or reply[4] != code:
+        raise I2CError(f"Unexpected VCP reply: {reply.hex()}")
+    if reply[3] != 0:
+        raise UnsupportedVCPError(f"VCP code 0x{code:02x} not supported (result {reply[3]})")
+    
+    maximum, current = struct.unpack(">HH", reply[6:10])
+    return current, maximum
+
+
+def decode_capabilities_reply(reply: bytes, offset: int) -> bytes:
+    """
+    Validate a capabilities reply fragment
+    
+    Returns:
+        The fragment's data (empty at the end of the string)
+    
+    Raises:
+        I2CError: On a null message, bad checksum or wrong offset
+    """
+    if len(reply) < 3 or reply[0] != DEST_ADDR:
+        raise I2CError(f"Malformed capabilities reply: {reply.hex()}")
+    length = reply[1] & 0x7F
+    if length == 0:
+        raise I2CError("Display returned a null message (not ready)")
+    if length < 3 or length > CAPS_FRAGMENT + 3 or len(reply) < length + 3:
+        raise I2CError(f"Malformed capabilities reply: {reply.hex()}")
+    if checksum(REPLY_SEED, reply[:length + 2]) != reply[length + 2]:
+        raise I2CError(f"Capabilities reply checksum mismatch: {reply.hex()}")
+    if reply[2] != CAPABILITIES_REPLY or struct.unpack(">H", reply[3:5])[0] != offset:
+        raise I2CError(f"Unexpected capabilities reply: {reply.hex()}")
+    return reply[5:length + 2]
+
+
+class DDCDevice:
+    """
+    One monitor's DDC/CI channel, kept open between calls
+    
+    Transactions on a device are serialized and paced; the fd stays open
+    until close().
+    """
+    
+    GET_REPLY_DELAY = 0.040     # request -> read reply
+    COMMAND_INTERVAL = 0.050    # after any command, before the next
+    RETRIES = 3
+    
+    def __init__(self, path: str, sleep_multiplier: float = 1.0):
+        """
+        Open the bus
+        
+        Args:
+            path: I2C device (/dev/i2c-N) or a simulated bus socket
+            sleep_multiplier: Scale the protocol delays (like ddcutil's
+                              --sleep-multiplier; below 1 may fail on
+                              slow monitors)
+        
+        Raises:
+            I2CError: If the device cannot be opened
+        """
+        self.path = path
+        self.sleep_multiplier = sleep_multiplier
+        self.failed_attempts = 0  # attempts that needed a retry, ever
+        self._lock = threading.Lock()
+        self._ready_at = 0.0
+        self._fd = None
+        self._sock = None
+        
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+                self._sock.connect(path)
+            else:
+                self._fd = os.open(path, os.O_RDWR)
+                fcntl.ioctl(self._fd, I2C_SLAVE, DDC_CI_ADDR)
+        except OSError as e:
+            self.close()
+            raise I2CError(f"Cannot open {path}: {e}")
+    
+    def close(self):
+        """
+        Close the bus
+        
+        Waits for a transaction in progress, so that it never continues
+        on a descriptor number that was closed and reused meanwhile;
+        later calls fail with I2CError.
+        """
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+    
+    def _write(self, data: bytes):
+        if self._sock is not None:
+            self._sock.send(SIM_WRITE + data)
+            if self._sock.recv(1) != SIM_ACK:
+                raise OSError(errno.EIO, "Write not acknowledged")
+        elif self._fd is not None:
+            os.write(self._fd, data)
+        else:
+            raise OSError(errno.EBADF, "Bus closed")
+    
+    def _read(self, length: int) -> bytes:
+        if self._sock is not None:
+            self._sock.send(SIM_READ + bytes([length]))
+            return self._sock.recv(length)
+        if self._fd is None:
+            raise OSError(errno.EBADF, "Bus closed")
+        return os.read(self._fd, length)
+    
+    def _pace(self):
+        """Wait until the display accepts the next command"""
+        wait = self._ready_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _finished(self):
+        """Start the post-command interval"""
+        self._ready_at = time.monotonic() + self.COMMAND_INTERVAL * self.sleep_multiplier
+    
+    def get_vcp(self, code: int) -> Tuple[int, int]:
+        """
+        Read a VCP feature
+        
+        Args:
+            code: VCP code (e.g. 0x10 brightness)
+        
+        Returns:
+            (current, maximum)
+        
+        Raises:
+            UnsupportedVCPError: At once if the display does not support
+                                 the code (a valid answer, not retried)
+            I2CError: After RETRIES failed attempts
+        """
+        request = encode_request(bytes([GET_VCP, code]))
+        with self._lock, METRICS.timed('ddc.i2c.getvcp') as timer:
+            error = None
+            for _ in range(self.RETRIES):
+                self._pace()
+                try:
+                    self._write(request)
+                    time.sleep(self.GET_REPLY_DELAY * self.sleep_multiplier)
+                    return decode_vcp_reply(self._read(REPLY_SIZE), code)
+                except UnsupportedVCPError:
+                    raise
+                except (OSError, I2CError) as e:
+                    error = e
+                    self.failed_attempts += 1
+                    logger.debug("getvcp 0x%02x on %s failed: %s", code, self.path, e)
+                finally:
+                    self._finished()
+            timer.error = True
+            raise I2CError(f"getvcp 0x{code:02x} on {self.path} failed: {error}")
+    
+    def set_vcp(self, code: int, value: int):
+        """
+        Write a VCP feature
+        
+        Raises:
+            I2CError: After RETRIES failed writes
+        """
+        request = encode_request(bytes([SET_VCP, code]) + struct.pack(">H", value))
+        with self._lock, METRICS.timed('ddc.i2c.setvcp') as timer:
+            error = None
+            for _ in range(self.RETRIES):
+                self._pace()
+                try:
+                    self._write(request)
+                    return
+                except OSError as e:
+                    error = e
+                    self.failed_attempts += 1
+                    logger.debug("setvcp 0x%02x on %s failed: %s", code, self.path, e)
+                finally:
+                    self._finished()
+            timer.error = True
+            raise I2CError(f"setvcp 0x{code:02x} on {self.path} failed: {error}")
+    
+    def capabilities(self) -> str:
+        """
+        Read the MCCS capabilities string
+        
+        Raises:
+            I2CError: If a fragment fails RETRIES times
+        """
+        data = b""
+        with self._lock, METRICS.timed('ddc.i2c.capabilities') as timer:
+            while len(data) < CAPS_MAX_SIZE:
+                offset = len(data)
+                request = encode_request(bytes([CAPABILITIES]) + struct.pack(">H", offset))
+                error = None
+                for _ in range(self.RETRIES):
+                    self._pace()
+                    try:
+                        self._write(request)
+                        time.sleep(self.GET_REPLY_DELAY * self.sleep_multiplier)
+                        fragment = decode_capabilities_reply(self._read(CAPS_REPLY_SIZE), offset)
+                        break
+                    except (OSError, I2CError) as e:
+                        error = e
+                        self.failed_attempts += 1
+                        logger.debug("capabilities at %s on %s failed: %s", offset, self.path, e)
+                    finally:
+                        self._finished()
+                else:
+                    timer.error = True
+                    raise I2CError(f"capabilities on {self.path} failed: {error}")
+                if not fragment:
+                    break
+                data += fragment
+        return data.rstrip(b"\0").decode('ascii', errors='replace')
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+libddcutil Binding
+DDC/CI through libddcutil (ctypes) with persistent display handles
+
+Used when raw /dev/i2c-N access is not possible: the library keeps
+ddcutil's monitor quirk handling and retries, but runs in-process, so
+VCP get/set costs neither a process spawn nor ddcutil's per-invocation
+display detection. Display handles are opened once at detection and
+reused until the display disappears.
+
+Only the small part of the API the toolkit needs is bound, against the
+libddcutil 2.x ABI (libddcutil.so.5): ddca_get_display_info_list2,
+ddca_open_display2 and ddca_get/set_non_table_vcp_value.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from legion_metrics import METRICS
+except ImportError:
+    from .legion_metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+DDCA_IO_I2C = 0
+
+# The monitor answered that it does not support a feature
+DDCRC_REPORTED_UNSUPPORTED = -3005
+DDCRC_DETERMINED_UNSUPPORTED = -3016
+
+
+class LibDDCError(Exception):
+    """Raised when libddcutil is unavailable or a call fails"""
+    pass
+
+
+class LibUnsupportedVCPError(LibDDCError):
+    """Raised when the display reports a VCP code as unsupported"""
+    pass
+
+
+class _IOPath(ctypes.Structure):
+    _fields_ = [
+        ('io_mode', ctypes.c_int),
+        ('path', ctypes.c_int),  # union of i2c_busno / hiddev_devno
+    ]
+
+
+class _VersionSpec(ctypes.Structure):
+    _fields_ = [
+        ('major', ctypes.c_uint8),
+        ('minor', ctypes.c_uint8),
+    ]
+
+
+class _DisplayInfo(ctypes.Structure):
+    _fields_ = [
+        ('marker', ctypes.c_char * 4),
+        ('dispno', ctypes.c_int),
+        ('path', _IOPath),
+        ('usb_bus', ctypes.c_int),
+        ('usb_device', ctypes.c_int),
+        ('mfg_id', ctypes.c_char * 4),
+        ('model_name', ctypes.c_char * 14),
+        ('sn', ctypes.c_char * 14),
+        ('product_code', ctypes.c_uint16),
+        ('edid_bytes', ctypes.c_uint8 * 128),
+        ('vcp_version', _VersionSpec),
+        ('dref', ctypes.c_void_p),
+    ]
+
+
+class _DisplayInfoList(ctypes.Structure):
+    _fields_ = [
+        ('ct', ctypes.c_int),
+        ('info', _DisplayInfo * 0),  # flexible array member
+    ]
+
+
+class _Version(ctypes.Structure):
+    _fields_ = [
+        ('major', ctypes.c_uint8),
+        ('minor', ctypes.c_uint8),
+        ('micro', ctypes.c_uint8),
+    ]
+
+
+class _NonTableValue(ctypes.Structure):
+    _fields_ = [
+        ('mh', ctypes.c_uint8),
+        ('ml', ctypes.c_uint8),
+        ('sh', ctypes.c_uint8),
+        ('sl', ctypes.c_uint8),
+    ]
+
+
+@dataclass
+class LibDisplay:
+    """A display found by libddcutil, with its open handle"""
+    dispno: int
+    bus: int  # I2C bus number (-1 if not on I2C)
+    mfg_id: str
+    model: str
+    serial: str
+    vcp_version: str
+    handle: ctypes.c_void_p
+
+
+class LibDDCUtil:
+    """
+    Minimal libddcutil wrapper
+    
+    Handles are not thread-safe: callers serialize access per display
+    (DDCController does so with its display locks).
+    """
+    
+    def __init__(self, library: Optional[str] = None):
+        """
+        Load libddcutil
+        
+        Args:
+            library: Library path or name (default: $LEGION_LIBDDCUTIL or
+                     the system's libddcutil)
+        
+        Raises:
+            LibDDCError: If the library cannot be loaded
+        """
+        name = library or os.environ.get('LEGION_LIBDDCUTIL') or ctypes.util.find_library('ddcutil')
+        if not name:
+            raise LibDDCError("libddcutil not found")
+        try:
+            lib = ctypes.CDLL(name)
+        except OSError as e:
+            raise LibDDCError(f"Cannot load {name}: {e}")
+        
+        try:
+            lib.ddca_ddcutil_version.restype = _Version
+            version = lib.ddca_ddcutil_version()
+            if version.major < 2:
+                raise LibDDCError(f"libddcutil {version.major}.{version.minor} is too old (need 2.x)")
+            lib.ddca_get_display_info_list2.argtypes = [
+                ctypes.c_bool, ctypes.POINTER(ctypes.POINTER(_DisplayInfoList))]
+            lib.ddca_free_display_info_list.argtypes = [ctypes.POINTER(_DisplayInfoList)]
+            lib.ddca_free_display_info_list.restype = None
+            lib.ddca_open_display2.argtypes = [
+                ctypes.c_void_p, ctypes.c_bool, ctypes.POINTER(ctypes.c_void_p)]
+            lib.ddca_close_display.argtypes = [ctypes.c_void_p]
+            lib.ddca_get_non_table_vcp_value.argtypes = [
+                ctypes.c_void_p, ctypes.c_uint8, ctypes.POINTER(_NonTableValue)]
+            lib.ddca_set_non_table_vcp_value.argtypes = [
+                ctypes.c_void_p, ctypes.c_uint8, ctypes.c_uint8, ctypes.c_uint8]
+            lib.ddca_redetect_displays.argtypes = []
+            lib.ddca_rc_name.argtypes = [ctypes.c_int]
+            lib.ddca_rc_name.restype = ctypes.c_char_p
+        except AttributeError as e:
+            raise LibDDCError(f"Unsupported libddcutil version: {e}")
+        
+        self._lib = lib
+        self.displays: Dict[int, LibDisplay] = {}  # by display number
+        logger.info("libddcutil %s.%s.%s loaded from %s",
+                    version.major, version.minor, version.micro, name)
+    
+    def _check(self, rc: int, what: str):
+        if rc != 0:
+            name = self._lib.ddca_rc_name(rc)
+            error = (LibUnsupportedVCPError
+                     if rc in (DDCRC_REPORTED_UNSUPPORTED, DDCRC_DETERMINED_UNSUPPORTED)
+                     else LibDDCError)
+            raise error(f"{what} failed: {name.decode() if name else rc}")
+    
+    def detect(self, redetect: bool = False) -> List[LibDisplay]:
+        """
+        Enumerate displays and open handles for new ones
+        
+        Handles of displays that are still present are kept; handles of
+        displays that disappeared are closed.
+        
+        Args:
+            redetect: Rescan the buses first (libddcutil otherwise returns
+                      the displays found when it was loaded); this
+                      invalidates all handles, so they are reopened
+        
+        Returns:
+            Valid displays, by display number
+        """
+        dlist = ctypes.POINTER(_DisplayInfoList)()
+        with METRICS.timed('libddcutil.detect'):
+            if redetect:
+                self.close()
+                self._check(self._lib.ddca_redetect_displays(), "ddca_redetect_displays")
+            self._check(self._lib.ddca_get_display_info_list2(False, ctypes.byref(dlist)),
+                        "ddca_get_display_info_list2")
+        try:
+            count = dlist.contents.ct
+            infos = ctypes.cast(ctypes.addressof(dlist.contents.info),
+                                ctypes.POINTER(_DisplayInfo * count)).contents
+            found = {}
+            for info in infos:
+                key = self._identity(info)
+                existing = self.displays.get(info.dispno)
+                if existing is not None and self._identity_of(existing) == key:
+                    found[info.dispno] = existing
+                    continue
+                
+                handle = ctypes.c_void_p()
+                try:
+                    self._check(self._lib.ddca_open_display2(info.dref, False, ctypes.byref(handle)),
+                                "ddca_open_display2")
+                except LibDDCError as e:
+                    logger.warning("Cannot open display %s: %s", info.dispno, e)
+                    continue
+                found[info.dispno] = LibDisplay(
+                    dispno=info.dispno,
+                    bus=info.path.path if info.path.io_mode == DDCA_IO_I2C else -1,
+                    mfg_id=info.mfg_id.decode(errors='replace'),
+                    model=info.model_name.decode(errors='replace'),
+                    serial=info.sn.decode(errors='replace'),
+                    vcp_version=f"{info.vcp_version.major}.{info.vcp_version.minor}",
+                    handle=handle,
+                )
+        finally:
+            self._lib.ddca_free_display_info_list(dlist)
+        
+        for dispno, display in self.displays.items():
+            if found.get(dispno) is not display:
+                self._close(display)
+        self.displays = found
+        return sorted(found.values(), key=lambda d: d.dispno)
+    
+    @staticmethod
+    def _identity(info: _DisplayInfo) -> Tuple:
+        return (info.path.path, info.mfg_id.decode(errors='replace'),
+                info.model_name.decode(errors='replace'), info.sn.decode(errors='replace'))
+    
+    @staticmethod
+    def _identity_of(display: LibDisplay) -> Tuple:
+        return (display.bus, display.mfg_id, display.model, display.serial)
+    
+    def get_vcp(self, dispno: int, code: int) -> Tuple[int, int]:
+        """
+        Read a non-table VCP feature
+        
+        Returns:
+            (current, maximum)
+        
+        Raises:
+            LibUnsupportedVCPError: If the display does not support the code
+            LibDDCError: If the read failed
+        """
+        display = self._display(dispno)
+        value = _NonTableValue()
+        with METRICS.timed('libddcutil.getvcp') as timer:
+            rc = self._lib.ddca_get_non_table_vcp_value(display.handle, code, ctypes.byref(value))
+            timer.error = rc != 0
+        self._check(rc, f"getvcp 0x{code:02x} on display {dispno}")
+        return (value.sh << 8) | value.sl, (value.mh << 8) | value.ml
+    
+    def set_vcp(self, dispno: int, code: int, value: int):
+        """Write a non-table VCP feature"""
+        display = self._display(dispno)
+        with METRICS.timed('libddcutil.setvcp') as timer:
+            rc = self._lib.ddca_set_non_table_vcp_value(display.handle, code,
+                                                        (value >> 8) & 0xFF, value & 0xFF)
+            timer.error = rc != 0
+        self._check(rc, f"setvcp 0x{code:02x} on display {dispno}")
+    
+    def _display(self, dispno: int) -> LibDisplay:
+        display = self.displays.get(dispno)
+        if display is None:
+            raise LibDDCError(f"Display {dispno} not open")
+        return display
+    
+    def _close(self, display: LibDisplay):
+        rc = self._lib.ddca_close_display(display.handle)
+        if rc != 0:
+            logger.debug("Closing display %s failed: %s", display.dispno, rc)
+    
+    def close(self):
+        """Close all display handles"""
+        for display in self.displays.values():
+            self._close(display)
+        self.displays = {}
@@ -1,16 +1,44 @@
 #!/usr/bin/env python3
 """
 DDC/CI Monitor Control
-External monitor brightness control via ddcutil
+External monitor brightness control via native DDC/CI over I2C,
+libddcutil or the ddcutil CLI (in that order of preference)
+
+Monitors are enumerated from DRM connectors and their EDID; a DDC/CI
+detection runs only when that is not possible. What a probe finds out
+about a monitor is kept per EDID (ddc_profiles), so a monitor is probed
+once, not on every start.
 """
 
 import logging
+import os
+import shutil
 import subprocess
 import re
 import time
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Optional, Set, Tuple
+from dataclasses import dataclass, replace
+from pathlib import Path
+from threading import Condition, Lock, Thread
+
+try:
+    from legion_metrics import METRICS
+    from ddc_i2c import DDCDevice, I2CError, UnsupportedVCPError
+    from ddc_lib import LibDDCError, LibDDCUtil, LibUnsupportedVCPError
+    from ddc_profiles import (PROFILES_PATH, MonitorProfile, MonitorProfileStore, ProfileError,
+                              parse_capabilities)
+    from drm_edid import DRMOutput, EDIDError, list_outputs
+    from legion_uevent import Uevent
+except ImportError:
+    from .legion_metrics import METRICS
+    from .ddc_i2c import DDCDevice, I2CError, UnsupportedVCPError
+    from .ddc_lib import LibDDCError, LibDDCUtil, LibUnsupportedVCPError
+    from .ddc_profiles import (PROFILES_PATH, MonitorProfile, MonitorProfileStore, ProfileError,
+                               parse_capabilities)
+    from .drm_edid import DRMOutput, EDIDError, list_outputs
+    from .legion_uevent import Uevent
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +58,7 @@ class DDCMonitor:
     serial: str  # Serial number
     vcp_version: str  # VCP version (e.g., "2.1")
     supports_brightness: bool = True  # Assumes brightness support
+    edid_key: str = ''  # monitor profile key ('' if not enumerated from DRM)
     
     @property
     def name(self) -> str:
@@ -46,47 +75,167 @@ class DDCMonitor:
             'serial': self.serial,
             'name': self.name,
             'vcp_version': self.vcp_version,
-            'supports_brightness': self.supports_brightness
+            'supports_brightness': self.supports_brightness,
+            'edid_key': self.edid_key
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DDCMonitor':
+        """Create monitor from a dictionary produced by to_dict()"""
+        return cls(
+            id=data['id'],
+            bus=data['bus'],
+            manufacturer=data['manufacturer'],
+            model=data['model'],
+            serial=data['serial'],
+            vcp_version=data['vcp_version'],
+            supports_brightness=data.get('supports_brightness', True),
+            edid_key=data.get('edid_key', '')
+        )
+
+
+@dataclass
+class DisplayHealth:
+    """Circuit breaker state of one display"""
+    failures: int = 0  # consecutive failed commands
+    trips: int = 0  # times the circuit opened since the last success
+    retry_at: float = 0.0  # monotonic time from which a probe is let through
+    probing: bool = False  # a half-open probe command is running
+    
+    @property
+    def state(self) -> str:
+        """'closed' (in use), 'open' (failing fast) or 'half-open' (probing)"""
+        if self.probing:
+            return 'half-open'
+        return 'open' if self.trips else 'closed'
+    
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 if closed or due)"""
+        return max(0.0, self.retry_at - time.monotonic()) if self.trips else 0.0
 
 
 class DDCController:
     """
-    Controller for DDC/CI monitors using ddcutil
+    Controller for DDC/CI monitors
     
     Features:
-    - Detect external monitors
-    - Read/write brightness (VCP code 0x10)
-    - Cache with TTL for performance
+    - Detect external monitors from /sys/class/drm connectors and their
+      EDID, probing DDC/CI only on monitors not seen before (falls back
+      to libddcutil, else the ddcutil CLI)
+    - Read/write brightness (VCP code 0x10) directly on the monitor's
+      /dev/i2c-N once it has been detected; if that is not permitted,
+      through libddcutil's open display handles, and last through the
+      ddcutil CLI
+    - Latest-wins brightness writes per display (request_brightness)
+    - Group brightness writes, one worker per I2C bus (set_brightness_all)
+    - Cache with TTL for performance, or kept until a hotplug event once
+      the caller feeds kernel uevents (enable_hotplug/handle_uevent)
+    - Write-through brightness cache: reads are answered from memory
+      after the first one, refresh_brightness() re-reads the hardware
+    - Batched reads of several VCP features (contrast, volume, input
+      source, power mode...) in one command session (get_vcp_values)
+    - Persistent monitor profiles (capabilities, bus, sleep multiplier)
+      by EDID; optionally learns the shortest reliable protocol delays
+    - Per-display circuit breaker: a monitor that keeps failing is not
+      sent commands (they fail at once) until a probe on a backoff
+      schedule succeeds, so it cannot stall every call with timeouts
     """
     
     CACHE_TTL = 60  # seconds - longer cache to avoid slow detection
     DDCUTIL_TIMEOUT = 3  # seconds per command - shorter timeout
     BRIGHTNESS_VCP_CODE = 0x10
+    VERSION_VCP_CODE = 0xDF
+    # Features read by get_vcp_values() by default
+    FEATURE_CODES = {
+        'brightness': 0x10,
+        'contrast': 0x12,
+        'input_source': 0x60,
+        'volume': 0x62,
+        'power_mode': 0xD6,
+    }
+    LOCK_TIMEOUT = 5  # seconds to wait for another command on the same display
+    BRIGHTNESS_WRITE_ATTEMPTS = 2  # per target that nothing newer replaced
+    # ddcutil --sleep-multiplier at a profile multiplier of 1 (0.1 is too
+    # aggressive for some monitors)
+    CLI_SLEEP_MULTIPLIER = 0.5
+    CIRCUIT_FAILURES = 3  # consecutive failed commands that open a display's circuit
+    CIRCUIT_BACKOFF = (5, 15, 60, 300)  # seconds open before each probe (last repeats)
     
-    def __init__(self):
-        """Initialize DDC controller"""
+    def __init__(self, ddcutil: Optional[str] = None, native: Optional[bool] = None,
+                 root: Optional[str] = None, library: Optional[bool] = None,
+                 profiles: Optional[Path] = None, learn_timing: Optional[bool] = None):
+        """
+        Initialize DDC controller
+        
+        Args:
+            ddcutil: ddcutil executable (default: $LEGION_DDCUTIL or
+                     "ddcutil" from PATH, e.g. a ddc_simulator stub)
+            native: Talk DDC/CI on /dev/i2c-N directly (default: on unless
+                    $LEGION_DDC_NATIVE is "0")
+            root: Filesystem root prefix for /dev (default: $LEGION_POWER_ROOT or /)
+            library: Use libddcutil when it is installed (default: on
+                     unless $LEGION_DDC_LIBRARY is "0")
+            profiles: Monitor profile file (default: PROFILES_PATH below root)
+            learn_timing: Shorten each monitor's protocol delays while its
+                          commands succeed (default: off unless
+                          $LEGION_DDC_LEARN_TIMING is "1")
+        """
+        self._ddcutil = ddcutil or os.environ.get('LEGION_DDCUTIL', 'ddcutil')
+        if native is None:
+            native = os.environ.get('LEGION_DDC_NATIVE', '1') != '0'
+        self._native = native
+        self._root = root or os.environ.get("LEGION_POWER_ROOT", "/")
+        self._devices: Dict[str, DDCDevice] = {}  # open native channels by bus path
+        self._native_unavailable: Set[str] = set()  # buses that could not be opened
         self._monitors_cache: Optional[List[DDCMonitor]] = None
         self._cache_timestamp: float = 0
+        # DDC/CI probe results by (connector, EDID key): the monitor's
+        # profile, or None if it did not answer (profiles are also saved
+        # by EDID key, None is not)
+        self._probed: Dict[Tuple[str, str], Optional[MonitorProfile]] = {}
+        self._profiles = MonitorProfileStore(
+            profiles if profiles is not None else Path(self._root) / PROFILES_PATH.relative_to('/'))
+        if learn_timing is None:
+            learn_timing = os.environ.get('LEGION_DDC_LEARN_TIMING', '0') == '1'
+        self._learn_timing = learn_timing
+        self._hotplug = False  # cache invalidated by uevents instead of the TTL
         self._command_locks: Dict[int, Lock] = {}  # Per-display locks for concurrency control
+        self._locks_guard = Lock()
+        
+        # Brightness write queue: one pending target per display (latest
+        # wins), applied by a per-display worker thread
+        self._writes = Condition()
+        self._pending_brightness: Dict[int, Tuple[int, Optional[Callable]]] = {}
+        self._brightness_workers: Dict[int, Thread] = {}
+        
+        # Last known brightness per display, updated by every successful
+        # read and write, dropped with the monitor cache
+        self._brightness: Dict[int, int] = {}
+        
+        # Circuit breakers of displays that failed (absent: healthy)
+        self._health: Dict[int, DisplayHealth] = {}
+        self._health_lock = Lock()
+        
+        if library is None:
+            library = os.environ.get('LEGION_DDC_LIBRARY', '1') != '0'
+        self._library: Optional[LibDDCUtil] = None
+        self._library_scanned = False
+        if library:
+            try:
+                self._library = LibDDCUtil()
+            except LibDDCError as e:
+                logger.debug("libddcutil not used: %s", e)
         self._check_ddcutil_available()
     
     def _check_ddcutil_available(self):
-        """Check if ddcutil is installed and accessible"""
-        try:
-            result = subprocess.run(
-                ['which', 'ddcutil'],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            if result.returncode != 0:
-                raise DDCError("ddcutil not found. Install with: sudo apt install ddcutil")
-            logger.info("ddcutil found and available")
-        except subprocess.TimeoutExpired:
-            raise DDCError("ddcutil check timed out")
-        except Exception as e:
-            raise DDCError(f"Failed to check ddcutil: {e}")
+        """Check if ddcutil (CLI or library) is installed and accessible"""
+        if self._library is not None:
+            return
+        # PATH lookup only - spawning `which` would cost a fork at startup
+        if shutil.which(self._ddcutil) is None:
+            raise DDCError("ddcutil not found. Install with: sudo apt install ddcutil")
+        logger.info("ddcutil found and available")
     
     def _run_ddcutil(self, args: List[str], timeout: Optional[int] = None, display_id: Optional[int] = None) -> str:
         """
@@ -103,44 +252,465 @@ class DDCController:
         if timeout is None:
             timeout = self.DDCUTIL_TIMEOUT
         
-        # Acquire lock for this display to prevent concurrent commands
-        lock = None
-        if display_id is not None:
-            if display_id not in self._command_locks:
-                self._command_locks[display_id] = Lock()
-            lock = self._command_locks[display_id]
-            
-            # Try to acquire lock, fail fast if another command is running
-            if not lock.acquire(blocking=False):
-                raise DDCError(f"Another DDC command is already running for display {display_id}")
+        with self._display_lock(display_id):
+            return self._exec_ddcutil(args, timeout)
+    
+    @contextmanager
+    def _display_lock(self, display_id: Optional[int]):
+        """Hold a display's command lock, waiting up to LOCK_TIMEOUT for other commands"""
+        if display_id is None:
+            yield
+            return
         
+        with self._locks_guard:
+            lock = self._command_locks.setdefault(display_id, Lock())
+        
+        if not lock.acquire(timeout=self.LOCK_TIMEOUT):
+            raise DDCError(f"Timed out waiting for display {display_id}")
         try:
-            cmd = ['ddcutil'] + args
-            logger.debug(f"Running: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            yield
+        finally:
+            lock.release()
+    
+    @contextmanager
+    def _all_display_locks(self):
+        """
+        Hold every display's command lock, waiting for commands in flight
+        
+        Locks for displays not seen before cannot be created meanwhile,
+        so no command starts until the block ends.
+        """
+        with self._locks_guard:
+            held = []
+            try:
+                for display_id in sorted(self._command_locks):
+                    lock = self._command_locks[display_id]
+                    if not lock.acquire(timeout=self.LOCK_TIMEOUT):
+                        raise DDCError(f"Timed out waiting for display {display_id}")
+                    held.append(lock)
+                yield
+            finally:
+                for lock in reversed(held):
+                    lock.release()
+    
+    def _exec_ddcutil(self, args: List[str], timeout: int) -> str:
+        """Run ddcutil (lock already held)"""
+        try:
+            cmd = [self._ddcutil] + args
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Running: %s", ' '.join(cmd))
+            # Name the operation after the ddcutil subcommand (detect, getvcp...)
+            op = "ddcutil." + next((a for a in args if a.isalpha()), 'other')
+            with METRICS.timed(op) as timer:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+                if result.returncode != 0:
+                    timer.error = True
             
             if result.returncode != 0:
                 error_msg = result.stderr.strip() or result.stdout.strip()
-                logger.warning(f"ddcutil command failed: {error_msg}")
+                logger.warning("ddcutil command failed: %s", error_msg)
                 raise DDCError(f"ddcutil failed: {error_msg}")
             
             return result.stdout
         
         except subprocess.TimeoutExpired:
-            logger.error(f"ddcutil command timed out after {timeout}s")
+            logger.error("ddcutil command timed out after %ss", timeout)
             raise DDCError(f"ddcutil timed out after {timeout}s")
         except Exception as e:
-            logger.error(f"ddcutil command error: {e}")
+            logger.error("ddcutil command error: %s", e)
             raise DDCError(f"ddcutil error: {e}")
-        finally:
-            # Always release lock
-            if lock is not None:
-                lock.release()
+    
+    def _native_device(self, display_id: int) -> Optional[DDCDevice]:
+        """
+        Open (once) the I2C channel of a detected display
+        
+        Only uses the cached monitor list - never triggers detection.
+        
+        Returns:
+            Device, or None if native access is off or not possible
+        """
+        if not self._native or not self._monitors_cache:
+            return None
+        monitor = next((m for m in self._monitors_cache if m.id == display_id), None)
+        if monitor is None or not monitor.bus or monitor.bus in self._native_unavailable:
+            return None
+        
+        device = self._devices.get(monitor.bus)
+        if device is None:
+            path = os.path.join(self._root, monitor.bus.lstrip("/"))
+            profile = self._monitor_profile(monitor)
+            try:
+                device = DDCDevice(path, profile.sleep_multiplier if profile else 1.0)
+            except I2CError as e:
+                logger.info("Native DDC/CI not available for display %s, using ddcutil: %s",
+                            display_id, e)
+                self._native_unavailable.add(monitor.bus)
+                return None
+            self._devices[monitor.bus] = device
+        return device
+    
+    def _native_get(self, display_id: int, code: int) -> Optional[int]:
+        """Read a VCP value natively (None: use ddcutil)"""
+        with self._display_lock(display_id):
+            device = self._native_device(display_id)
+            if device is None:
+                return None
+            failed = device.failed_attempts
+            try:
+                current, _ = device.get_vcp(code)
+                return current
+            except I2CError as e:
+                logger.warning("Native getvcp failed for display %s, trying ddcutil: %s",
+                               display_id, e)
+                return None
+            finally:
+                self._learn(display_id, device.failed_attempts == failed, device)
+    
+    def _native_get_many(self, display_id: int,
+                         codes: List[int]) -> Optional[Dict[int, Tuple[int, int]]]:
+        """Read several VCP features natively in one lock hold (None: use ddcutil)"""
+        with self._display_lock(display_id):
+            device = self._native_device(display_id)
+            if device is None:
+                return None
+            failed = device.failed_attempts
+            values = {}
+            answered = False  # "unsupported" is an answer too
+            for code in codes:
+                try:
+                    values[code] = device.get_vcp(code)
+                    answered = True
+                except UnsupportedVCPError:
+                    answered = True
+                except I2CError as e:
+                    logger.debug("Native getvcp 0x%02x failed for display %s: %s",
+                                 code, display_id, e)
+            self._learn(display_id, device.failed_attempts == failed, device)
+            if codes and not answered:
+                logger.warning("Native getvcp failed for display %s, trying ddcutil", display_id)
+                return None
+            return values
+    
+    def _native_set(self, display_id: int, code: int, value: int) -> bool:
+        """Write a VCP value natively (False: use ddcutil)"""
+        with self._display_lock(display_id):
+            device = self._native_device(display_id)
+            if device is None:
+                return False
+            failed = device.failed_attempts
+            try:
+                device.set_vcp(code, value)
+                return True
+            except I2CError as e:
+                logger.warning("Native setvcp failed for display %s, trying ddcutil: %s",
+                               display_id, e)
+                return False
+            finally:
+                self._learn(display_id, device.failed_attempts == failed, device)
+    
+    def _profile(self, display_id: int) -> Optional[MonitorProfile]:
+        """Profile of a detected display (None if unknown)"""
+        monitor = next((m for m in self._monitors_cache or () if m.id == display_id), None)
+        if monitor is None:
+            return None
+        return self._monitor_profile(monitor)
+    
+    def _monitor_profile(self, monitor: DDCMonitor) -> Optional[MonitorProfile]:
+        """Profile of the output a monitor was enumerated from (None if unknown)"""
+        if not monitor.edid_key:
+            return None
+        return next((profile for (_, key), profile in self._probed.items()
+                     if key == monitor.edid_key and profile is not None
+                     and profile.bus == monitor.bus), None)
+    
+    @staticmethod
+    def _output_key(output: DRMOutput) -> Tuple[str, str]:
+        """Key of per-output state (identical monitors share an EDID key)"""
+        return (output.connector, output.edid.key)
+    
+    def _learn(self, display_id: int, ok: bool, device: Optional[DDCDevice] = None):
+        """
+        Feed one command's outcome to the display's timing profile
+        
+        Args:
+            ok: The command succeeded without a retry
+            device: Native channel to apply a changed multiplier to
+        """
+        if not self._learn_timing:
+            return
+        profile = self._profile(display_id)
+        if profile is None or not profile.record(ok):
+            return
+        if device is not None:
+            device.sleep_multiplier = profile.sleep_multiplier
+        self._profiles.save()
+    
+    def _library_dispno(self, display_id: int) -> Optional[int]:
+        """
+        libddcutil display number of a detected display (None: use the CLI)
+        
+        Matched by I2C bus: our display numbers come from DRM enumeration
+        and need not follow libddcutil's (e.g. when a monitor did not
+        answer our probe, or the library's list is from an older scan).
+        """
+        if self._library is None:
+            return None
+        monitor = next((m for m in self._monitors_cache or () if m.id == display_id), None)
+        if monitor is None or not monitor.bus:
+            return None
+        if not self._library_scanned:
+            # Monitor cache seeded from a snapshot: open handles from the
+            # library's own startup scan (no bus I/O)
+            self._library_detect()
+        bus = int(monitor.bus.rsplit('-', 1)[1])
+        return next((display.dispno for display in self._library.displays.values()
+                     if display.bus == bus), None)
+    
+    def _library_get(self, display_id: int, code: int) -> Optional[int]:
+        """Read a VCP value through libddcutil (None: use the CLI)"""
+        if self._library is None:
+            return None
+        with self._display_lock(display_id):
+            dispno = self._library_dispno(display_id)
+            if dispno is None:
+                return None
+            try:
+                current, _ = self._library.get_vcp(dispno, code)
+                return current
+            except LibDDCError as e:
+                logger.warning("libddcutil getvcp failed for display %s, trying ddcutil: %s",
+                               display_id, e)
+                return None
+    
+    def _library_get_many(self, display_id: int,
+                          codes: List[int]) -> Optional[Dict[int, Tuple[int, int]]]:
+        """Read several VCP features through libddcutil (None: use the CLI)"""
+        if self._library is None:
+            return None
+        with self._display_lock(display_id):
+            dispno = self._library_dispno(display_id)
+            if dispno is None:
+                return None
+            values = {}
+            answered = False  # "unsupported" is an answer too
+            for code in codes:
+                try:
+                    values[code] = self._library.get_vcp(dispno, code)
+                    answered = True
+                except LibUnsupportedVCPError:
+                    answered = True
+                except LibDDCError as e:
+                    logger.debug("libddcutil getvcp 0x%02x failed for display %s: %s",
+                                 code, display_id, e)
+            if codes and not answered:
+                logger.warning("libddcutil getvcp failed for display %s, trying ddcutil",
+                               display_id)
+                return None
+            return values
+    
+    def _library_set(self, display_id: int, code: int, value: int) -> bool:
+        """Write a VCP value through libddcutil (False: use the CLI)"""
+        if self._library is None:
+            return False
+        with self._display_lock(display_id):
+            dispno = self._library_dispno(display_id)
+            if dispno is None:
+                return False
+            try:
+                self._library.set_vcp(dispno, code, value)
+                return True
+            except LibDDCError as e:
+                logger.warning("libddcutil setvcp failed for display %s, trying ddcutil: %s",
+                               display_id, e)
+                return False
+    
+    def _library_detect(self) -> Optional[List[DDCMonitor]]:
+        """Detect through libddcutil, (re)opening display handles (None: use the CLI)"""
+        if self._library is None:
+            return None
+        try:
+            if self._library_scanned:
+                # Redetection closes every handle: not while a command
+                # is using one
+                with self._all_display_locks():
+                    displays = self._library.detect(redetect=True)
+            else:
+                # The first detection uses the scan libddcutil did when loaded
+                displays = self._library.detect()
+                self._library_scanned = True
+        except (LibDDCError, DDCError) as e:
+            logger.warning("libddcutil detection failed, trying ddcutil: %s", e)
+            return None
+        return [
+            DDCMonitor(
+                id=display.dispno,
+                bus=f"/dev/i2c-{display.bus}" if display.bus >= 0 else '',
+                manufacturer=display.mfg_id or 'Unknown',
+                model=display.model or 'Unknown',
+                serial=display.serial,
+                vcp_version=display.vcp_version
+            )
+            for display in displays
+        ]
+    
+    def _drm_detect(self) -> Optional[List[DDCMonitor]]:
+        """
+        Enumerate monitors from DRM connectors (None: use a DDC/CI detection)
+        
+        Display numbers follow ddcutil's: DDC/CI capable monitors in I2C
+        bus order.
+        """
+        try:
+            with METRICS.timed('ddc.detect.drm'):
+                outputs = list_outputs(self._root)
+        except EDIDError as e:
+            logger.debug("DRM enumeration not available: %s", e)
+            return None
+        
+        # Known monitors are not probed again. Per-output state is keyed
+        # by connector: identical monitors share an EDID (and its stored
+        # profile) but each needs its own bus and timing.
+        for output in outputs:
+            key = self._output_key(output)
+            if key not in self._probed:
+                profile = self._profiles.get(output.edid.key)
+                if profile is not None:
+                    if any(known is profile for known in self._probed.values()):
+                        profile = replace(profile, features=list(profile.features))
+                    self._probed[key] = profile
+                    METRICS.inc('ddc.detect.profile_hits')
+        
+        buses = {}
+        for output in outputs:
+            key = self._output_key(output)
+            profile = self._probed.get(key)
+            if output.bus is not None:
+                buses[key] = f"/dev/i2c-{output.bus}"
+            elif profile is not None:
+                buses[key] = profile.bus  # where it answered before
+            else:
+                logger.info("Connected output without a known DDC channel, using full detection")
+                return None
+        outputs.sort(key=lambda output: int(buses[self._output_key(output)].rsplit('-', 1)[1]))
+        
+        # New monitors are probed concurrently, one thread per bus
+        new = [output for output in outputs if self._output_key(output) not in self._probed]
+        if new:
+            try:
+                with ThreadPoolExecutor(max_workers=len(new)) as executor:
+                    profiles = list(executor.map(
+                        lambda output: self._probe_ddc(buses[self._output_key(output)], output), new))
+            except DDCError as e:
+                logger.info("Cannot probe DDC/CI, using full detection: %s", e)
+                return None
+            for output, profile in zip(new, profiles):
+                self._probed[self._output_key(output)] = profile
+                if profile is not None:
+                    self._profiles.put(profile)
+            METRICS.inc('ddc.detect.probes', len(new))
+        
+        monitors = []
+        moved = False
+        for output in outputs:
+            key = self._output_key(output)
+            bus = buses[key]
+            profile = self._probed[key]
+            if profile is None:
+                logger.debug("%s on %s does not answer DDC/CI", output.edid.name, bus)
+                continue
+            if profile.bus != bus:
+                profile.bus = bus
+                moved = moved or self._profiles.get(output.edid.key) is profile
+            monitors.append(DDCMonitor(
+                id=len(monitors) + 1,
+                bus=bus,
+                manufacturer=output.edid.manufacturer,
+                model=output.edid.model or 'Unknown',
+                serial=output.edid.serial,
+                vcp_version=profile.vcp_version,
+                supports_brightness=profile.supports(self.BRIGHTNESS_VCP_CODE),
+                edid_key=output.edid.key
+            ))
+        if moved:
+            self._profiles.save()
+        return monitors
+    
+    def _probe_ddc(self, bus: str, output: DRMOutput) -> Optional[MonitorProfile]:
+        """
+        Check whether the monitor on a bus answers DDC/CI and read its
+        capabilities
+        
+        Returns:
+            A new profile for the monitor, or None if it does not answer
+        
+        Raises:
+            DDCError: If the bus cannot be probed (no native access and
+                      no ddcutil CLI)
+        """
+        device = None
+        if self._native and bus not in self._native_unavailable:
+            device = self._devices.get(bus)
+            if device is None:
+                try:
+                    device = DDCDevice(os.path.join(self._root, bus.lstrip("/")))
+                    self._devices[bus] = device
+                except I2CError as e:
+                    logger.info("Native DDC/CI not available on %s: %s", bus, e)
+                    self._native_unavailable.add(bus)
+        
+        profile = MonitorProfile(edid_key=output.edid.key, name=output.edid.name,
+                                 bus=bus, vcp_version='Unknown')
+        if device is not None:
+            try:
+                device.get_vcp(self.BRIGHTNESS_VCP_CODE)
+            except I2CError:
+                return None
+            try:
+                profile.capabilities = device.capabilities()
+                profile.features, profile.vcp_version = parse_capabilities(profile.capabilities)
+            except (I2CError, ProfileError) as e:
+                logger.debug("No capabilities from %s: %s", bus, e)
+            if profile.vcp_version == 'Unknown':
+                try:
+                    version, _ = device.get_vcp(self.VERSION_VCP_CODE)
+                    profile.vcp_version = f"{version >> 8}.{version & 0xFF}"
+                except I2CError:
+                    pass
+            return profile
+        
+        if shutil.which(self._ddcutil) is None:
+            raise DDCError("ddcutil not found")
+        try:
+            report = self._exec_ddcutil(['--bus', bus.rsplit('-', 1)[1], 'capabilities'],
+                                        self.DDCUTIL_TIMEOUT)
+        except DDCError:
+            return None
+        # "MCCS version: 2.1" and one "Feature: 10 (Brightness)" line per code
+        match = re.search(r'MCCS version:\s*(\d+\.\d+)', report)
+        if match:
+            profile.vcp_version = match.group(1)
+        profile.features = [int(code, 16)
+                            for code in re.findall(r'Feature:\s*([0-9A-Fa-f]{2})\b', report)]
+        return profile
+    
+    def _ddcutil_target(self, display_id: int) -> List[str]:
+        """ddcutil arguments selecting a display (by bus when known, skipping its detection)"""
+        monitor = next((m for m in self._monitors_cache or () if m.id == display_id), None)
+        if monitor is not None and monitor.bus:
+            return ['--bus', monitor.bus.rsplit('-', 1)[1]]
+        return ['-d', str(display_id)]
+    
+    def close(self):
+        """Close native I2C channels"""
+        for device in self._devices.values():
+            device.close()
+        self._devices.clear()
+        self._native_unavailable.clear()
     
     def _parse_detect_output(self, output: str) -> List[DDCMonitor]:
         """
@@ -172,7 +742,7 @@ class DDCController:
                         monitor = self._create_monitor_from_dict(current_monitor)
                         monitors.append(monitor)
                     except Exception as e:
-                        logger.warning(f"Failed to parse monitor: {e}")
+                        logger.warning("Failed to parse monitor: %s", e)
                 
                 # Start new monitor
                 match = re.search(r'Display (\d+)', line)
@@ -214,7 +784,7 @@ class DDCController:
                 monitor = self._create_monitor_from_dict(current_monitor)
                 monitors.append(monitor)
             except Exception as e:
-                logger.warning(f"Failed to parse monitor: {e}")
+                logger.warning("Failed to parse monitor: %s", e)
         
         return monitors
     
@@ -242,22 +812,26 @@ class DDCController:
         # Check cache
         if use_cache and self._monitors_cache is not None:
             age = time.time() - self._cache_timestamp
-            if age < self.CACHE_TTL:
-                logger.debug(f"Using cached monitors (age: {age:.1f}s)")
+            if age < self.CACHE_TTL or self._hotplug:
+                logger.debug("Using cached monitors (age: %.1fs)", age)
                 return self._monitors_cache
         
         logger.info("Detecting DDC/CI monitors...")
         
         try:
-            # Run ddcutil detect
-            output = self._run_ddcutil(['detect'], timeout=10)
-            
-            # Parse output
-            monitors = self._parse_detect_output(output)
+            monitors = self._drm_detect()
+            if monitors is None:
+                monitors = self._library_detect()
+            if monitors is None:
+                # Run ddcutil detect
+                output = self._run_ddcutil(['detect'], timeout=10)
+                
+                # Parse output
+                monitors = self._parse_detect_output(output)
             
-            logger.info(f"Detected {len(monitors)} monitor(s)")
+            logger.info("Detected %s monitor(s)", len(monitors))
             for mon in monitors:
-                logger.info(f"  Display {mon.id}: {mon.name} ({mon.bus})")
+                logger.info("  Display %s: %s (%s)", mon.id, mon.name, mon.bus)
             
             # Update cache
             self._monitors_cache = monitors
@@ -266,43 +840,148 @@ class DDCController:
             return monitors
         
         except DDCError as e:
-            logger.error(f"Monitor detection failed: {e}")
+            logger.error("Monitor detection failed: %s", e)
             # Return empty list instead of crashing
             return []
         except Exception as e:
-            logger.error(f"Unexpected error during detection: {e}")
+            logger.error("Unexpected error during detection: %s", e)
             return []
     
-    def get_brightness(self, display_id: int) -> int:
+    def get_brightness(self, display_id: int, force: bool = False) -> int:
         """
         Get monitor brightness (0-100)
         
         Args:
             display_id: Display number (1, 2, 3...)
+            force: Read the monitor even if the value is cached (e.g. to
+                   pick up changes made with the monitor's own buttons)
             
         Returns:
             Brightness value (0-100)
         """
+        if not force:
+            cached = self._brightness.get(display_id)
+            if cached is not None:
+                METRICS.inc('ddc.brightness.cache_hits')
+                return cached
+        
+        brightness = self._read_brightness(display_id)
+        if brightness is not None:
+            self._brightness[display_id] = brightness
+            return brightness
+        return 0
+    
+    def get_vcp_values(self, display_id: int,
+                       codes: Optional[List[int]] = None) -> Dict[int, Tuple[int, int]]:
+        """
+        Read several VCP features of one display at once
+        
+        All codes are read in one session: back to back on the open I2C
+        channel or libddcutil handle, or with a single ddcutil process.
+        Codes the monitor's capabilities do not list are not requested.
+        
+        Args:
+            display_id: Display number (1, 2, 3...)
+            codes: VCP codes (default: FEATURE_CODES)
+        
+        Returns:
+            (current, maximum) by VCP code, for the codes that could be
+            read (maximum is 0 for non-continuous features read through
+            the ddcutil CLI)
+        """
+        if codes is None:
+            codes = list(self.FEATURE_CODES.values())
+        profile = self._profile(display_id)
+        if profile is not None:
+            codes = [code for code in codes if profile.supports(code)]
+        if not codes or not self._circuit_allows(display_id):
+            return {}
+        
         try:
-            # Run: ddcutil -d <id> getvcp 10
-            output = self._run_ddcutil(['-d', str(display_id), 'getvcp', '10'], display_id=display_id)
+            values = self._native_get_many(display_id, codes)
+            if values is None:
+                values = self._library_get_many(display_id, codes)
+            if values is None:
+                # Run: ddcutil --bus <n> --terse getvcp 10 12 60...
+                output = self._run_ddcutil(
+                    self._ddcutil_target(display_id) + ['--terse', 'getvcp']
+                    + [f"{code:02X}" for code in codes],
+                    display_id=display_id)
+                values = self._parse_terse_getvcp(output)
+        except DDCError as e:
+            logger.error("Failed to read VCP features of display %s: %s", display_id, e)
+            self._circuit_record(display_id, False)
+            return {}
+        
+        # The monitor answered (possibly "unsupported" for every code):
+        # only I/O errors and timeouts count against the circuit
+        self._circuit_record(display_id, True)
+        if self.BRIGHTNESS_VCP_CODE in values:
+            self._brightness[display_id] = values[self.BRIGHTNESS_VCP_CODE][0]
+        return values
+    
+    @staticmethod
+    def _parse_terse_getvcp(output: str) -> Dict[int, Tuple[int, int]]:
+        """
+        Parse `ddcutil --terse getvcp` output
+        
+        "VCP 10 C 75 100" for continuous features, "VCP 60 SNC x0f" for
+        simple non-continuous ones; unsupported codes ("VCP 62 ERR") are
+        left out.
+        """
+        values = {}
+        for line in output.splitlines():
+            fields = line.split()
+            if len(fields) < 4 or fields[0] != 'VCP':
+                continue
+            try:
+                code = int(fields[1], 16)
+                if fields[2] == 'C' and len(fields) >= 5:
+                    values[code] = (int(fields[3]), int(fields[4]))
+                elif fields[2] == 'SNC':
+                    values[code] = (int(fields[3].lstrip('x'), 16), 0)
+            except ValueError:
+                logger.debug("Unexpected getvcp line: %s", line)
+        return values
+    
+    def _read_brightness(self, display_id: int) -> Optional[int]:
+        """Read brightness from the monitor (None on failure or while its circuit is open)"""
+        if not self._circuit_allows(display_id):
+            return None
+        brightness = self._read_brightness_ddc(display_id)
+        self._circuit_record(display_id, brightness is not None)
+        return brightness
+    
+    def _read_brightness_ddc(self, display_id: int) -> Optional[int]:
+        """Read brightness natively, through libddcutil or the CLI (None on failure)"""
+        try:
+            brightness = self._native_get(display_id, self.BRIGHTNESS_VCP_CODE)
+            if brightness is None:
+                brightness = self._library_get(display_id, self.BRIGHTNESS_VCP_CODE)
+            if brightness is not None:
+                logger.debug("Display %s brightness: %s", display_id, brightness)
+                return brightness
+            
+            # Run: ddcutil --bus <n> getvcp 10
+            output = self._run_ddcutil(self._ddcutil_target(display_id) + ['getvcp', '10'],
+                                       display_id=display_id)
             
             # Parse output: "VCP code 0x10 (Brightness): current value = 100, max value = 100"
             match = re.search(r'current value\s*=\s*(\d+)', output)
             if match:
                 brightness = int(match.group(1))
-                logger.debug(f"Display {display_id} brightness: {brightness}")
+                logger.debug("Display %s brightness: %s", display_id, brightness)
                 return brightness
             else:
-                logger.warning(f"Could not parse brightness from: {output}")
-                return 0
+                logger.warning("Could not parse brightness from: %s", output)
+                return None
         
         except DDCError as e:
-            logger.error(f"Failed to get brightness for display {display_id}: {e}")
-            return 0
+            logger.error("Failed to get brightness for display %s: %s", display_id, e)
+            return None
         except Exception as e:
-            logger.error(f"Unexpected error getting brightness: {e}")
-            return 0
+            logger.error("Unexpected error getting brightness: %s", e)
+            return None
     
     def set_brightness(self, display_id: int, brightness: int) -> bool:
         """
@@ -313,33 +992,278 @@ class DDCController:
             brightness: Brightness value (0-100)
             
         Returns:
-            True if successful, False otherwise
+            True if successful, False otherwise (also at once while the
+            display's circuit is open)
         """
+        if not self._circuit_allows(display_id):
+            return False
+        success = self._write_brightness(display_id, brightness)
+        self._circuit_record(display_id, success)
+        return success
+    
+    def _write_brightness(self, display_id: int, brightness: int) -> bool:
+        """Write brightness natively, through libddcutil or the CLI"""
         # Clamp brightness to valid range and log if clamped
         original_brightness = brightness
         brightness = max(0, min(100, brightness))
         if brightness != original_brightness:
-            logger.warning(f"Brightness value {original_brightness} clamped to {brightness} (valid range: 0-100)")
+            logger.warning("Brightness value %s clamped to %s (valid range: 0-100)",
+                           original_brightness, brightness)
         
         try:
-            # Run: ddcutil -d <id> setvcp 10 <brightness>
-            # Use --sleep-multiplier 0.5 for reasonable balance between speed and reliability
-            # (0.1 is too aggressive and can cause failures on some monitors)
-            self._run_ddcutil([
-                '-d', str(display_id),
-                '--sleep-multiplier', '.5',
+            if (self._native_set(display_id, self.BRIGHTNESS_VCP_CODE, brightness)
+                    or self._library_set(display_id, self.BRIGHTNESS_VCP_CODE, brightness)):
+                self._brightness[display_id] = brightness
+                logger.info("Display %s brightness set to %s", display_id, brightness)
+                return True
+            
+            # Run: ddcutil --bus <n> --sleep-multiplier <m> setvcp 10 <brightness>
+            profile = self._profile(display_id)
+            multiplier = self.CLI_SLEEP_MULTIPLIER * (profile.sleep_multiplier if profile else 1.0)
+            args = self._ddcutil_target(display_id) + [
+                '--sleep-multiplier', f"{multiplier:.3g}",
                 'setvcp', '10', str(brightness)
-            ], timeout=3, display_id=display_id)
-            logger.info(f"Display {display_id} brightness set to {brightness}")
+            ]
+            # Only the command itself teaches the timing, not waiting for the lock
+            with self._display_lock(display_id):
+                try:
+                    self._exec_ddcutil(args, timeout=3)
+                except DDCError:
+                    self._learn(display_id, False)
+                    raise
+                self._learn(display_id, True)
+            self._brightness[display_id] = brightness
+            logger.info("Display %s brightness set to %s", display_id, brightness)
             return True
         
         except DDCError as e:
-            logger.error(f"Failed to set brightness for display {display_id}: {e}")
+            logger.error("Failed to set brightness for display %s: %s", display_id, e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error setting brightness: {e}")
+            logger.error("Unexpected error setting brightness: %s", e)
             return False
     
+    def request_brightness(self, display_id: int, brightness: int,
+                           on_applied: Optional[Callable[[int, int, bool], None]] = None):
+        """
+        Queue a brightness write and return immediately
+        
+        Each display has one pending target: a request replaces any value
+        not yet being written, so a slider drag skips intermediate values
+        and the last requested value is always written. A write that
+        fails with nothing newer queued is retried.
+        
+        Args:
+            display_id: Display number (1, 2, 3...)
+            brightness: Brightness value (clamped to 0-100)
+            on_applied: Called on the worker thread as
+                        on_applied(display_id, brightness, success) for each
+                        value actually written (not for skipped ones);
+                        success is False for a display that is not detected
+        """
+        brightness = max(0, min(100, brightness))
+        with self._writes:
+            if display_id in self._pending_brightness:
+                METRICS.inc('ddc.brightness.skipped')
+            self._pending_brightness[display_id] = (brightness, on_applied)
+            if display_id not in self._brightness_workers:
+                worker = Thread(
+                    target=self._brightness_worker,
+                    args=(display_id,),
+                    name=f'ddc-brightness-{display_id}',
+                    daemon=True
+                )
+                self._brightness_workers[display_id] = worker
+                worker.start()
+    
+    def _brightness_worker(self, display_id: int):
+        """Write queued targets for one display until none is left"""
+        while True:
+            with self._writes:
+                item = self._pending_brightness.pop(display_id, None)
+                if item is None:
+                    del self._brightness_workers[display_id]
+                    self._writes.notify_all()
+                    return
+            
+            brightness, on_applied = item
+            if self.get_monitor_by_id(display_id) is None:
+                # Queued while the monitor list was invalidated (detected
+                # here, off the caller's thread)
+                logger.warning("Display %s not found, brightness %s not written",
+                               display_id, brightness)
+                success = False
+            else:
+                for _ in range(self.BRIGHTNESS_WRITE_ATTEMPTS):
+                    success = self.set_brightness(display_id, brightness)
+                    if success or display_id in self._pending_brightness:
+                        break
+            
+            if on_applied is not None:
+                try:
+                    on_applied(display_id, brightness, success)
+                except Exception as e:
+                    logger.error("Brightness callback failed: %s", e)
+    
+    def set_brightness_all(self, brightness: int, relative: bool = False,
+                           display_ids: Optional[List[int]] = None) -> Dict[int, Tuple[bool, int]]:
+        """
+        Set the brightness of several monitors at once
+        
+        Monitors on different I2C buses are written concurrently (one
+        worker per bus, monitors sharing a bus in turn), so the call takes
+        as long as the slowest monitor rather than the sum. Queued
+        request_brightness() targets for these displays are superseded,
+        and a write already in progress is waited for, so an older queued
+        value cannot land after the group value.
+        
+        Args:
+            brightness: Target (0-100), or a delta if relative
+            relative: Add brightness to each monitor's current value
+            display_ids: Displays to change (default: all detected)
+        
+        Returns:
+            {display_id: (success, brightness written or attempted)}; the
+            brightness is -1 if a relative target failed to read the
+            current value
+        """
+        monitors = self.detect_monitors(use_cache=True)
+        if display_ids is not None:
+            wanted = set(display_ids)
+            monitors = [m for m in monitors if m.id in wanted]
+            missing = wanted - {m.id for m in monitors}
+            if missing:
+                logger.warning("Unknown display(s) %s", sorted(missing))
+        if not monitors:
+            return {}
+        
+        ids = {monitor.id for monitor in monitors}
+        with self._writes:
+            for display_id in ids:
+                if self._pending_brightness.pop(display_id, None) is not None:
+                    METRICS.inc('ddc.brightness.skipped')
+            # Workers with nothing left to write exit after their current one
+            if not self._writes.wait_for(lambda: not ids & self._brightness_workers.keys(),
+                                         self.LOCK_TIMEOUT + self.DDCUTIL_TIMEOUT):
+                logger.warning("Queued brightness writes still running, setting brightness anyway")
+        
+        buses: Dict[str, List[DDCMonitor]] = {}
+        for monitor in monitors:
+            # Monitors without a known bus get a worker each
+            buses.setdefault(monitor.bus or f"display-{monitor.id}", []).append(monitor)
+        
+        def apply_bus(bus_monitors: List[DDCMonitor]) -> Dict[int, Tuple[bool, int]]:
+            results = {}
+            for monitor in bus_monitors:
+                target = brightness
+                if relative:
+                    current = self._brightness.get(monitor.id)
+                    if current is None:
+                        current = self._read_brightness(monitor.id)
+                    if current is None:
+                        results[monitor.id] = (False, -1)
+                        continue
+                    target += current
+                target = max(0, min(100, target))
+                results[monitor.id] = (self.set_brightness(monitor.id, target), target)
+            return results
+        
+        results: Dict[int, Tuple[bool, int]] = {}
+        with METRICS.timed('ddc.brightness.set_all'):
+            with ThreadPoolExecutor(max_workers=len(buses)) as executor:
+                for bus_results in executor.map(apply_bus, buses.values()):
+                    results.update(bus_results)
+        return results
+    
+    def wait_for_writes(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all queued brightness writes are done
+        
+        Returns:
+            False if writes were still running after timeout
+        """
+        with self._writes:
+            return self._writes.wait_for(lambda: not self._brightness_workers, timeout)
+    
+    def refresh_brightness(self) -> Dict[int, int]:
+        """
+        Re-read the brightness of every cached display
+        
+        Displays with a queued write are skipped (the write will update
+        the cache). Blocks on DDC; call it off the main loop.
+        
+        Returns:
+            {display_id: brightness} for values that changed
+        """
+        changed = {}
+        for display_id, cached in list(self._brightness.items()):
+            if self._writing(display_id):
+                continue
+            brightness = self._read_brightness(display_id)
+            # A write queued meanwhile owns the cache entry
+            if brightness is None or self._writing(display_id):
+                continue
+            self._brightness[display_id] = brightness
+            if brightness != cached:
+                changed[display_id] = brightness
+        if changed:
+            logger.debug("Brightness changed outside the service: %s", changed)
+        return changed
+    
+    def _circuit_allows(self, display_id: int) -> bool:
+        """
+        Whether a command may be sent to a display
+        
+        While its circuit is open, commands are refused until the
+        backoff delay has passed; then one command goes through as the
+        half-open probe.
+        """
+        with self._health_lock:
+            health = self._health.get(display_id)
+            if health is None or not health.trips:
+                return True
+            if health.probing or time.monotonic() < health.retry_at:
+                METRICS.inc('ddc.circuit.rejected')
+                return False
+            health.probing = True
+        logger.info("Display %s: probing after %s failed command(s)", display_id, health.failures)
+        return True
+    
+    def _circuit_record(self, display_id: int, ok: bool):
+        """Count a command's outcome towards the display's circuit breaker"""
+        with self._health_lock:
+            health = self._health.get(display_id)
+            if ok:
+                if health is not None:
+                    del self._health[display_id]
+                    if health.trips:
+                        logger.info("Display %s answers again, circuit closed", display_id)
+                return
+            
+            if health is None:
+                health = self._health[display_id] = DisplayHealth()
+            health.failures += 1
+            if health.trips and not health.probing:
+                return  # started before the circuit opened
+            if not health.probing and health.failures < self.CIRCUIT_FAILURES:
+                return
+            delay = self.CIRCUIT_BACKOFF[min(health.trips, len(self.CIRCUIT_BACKOFF) - 1)]
+            health.trips += 1
+            health.probing = False
+            health.retry_at = time.monotonic() + delay
+        METRICS.inc('ddc.circuit.opened')
+        logger.warning("Display %s failed %s time(s) in a row, circuit open for %ss",
+                       display_id, health.failures, delay)
+    
+    def get_health(self) -> Dict[int, DisplayHealth]:
+        """Circuit breaker state by display (displays not listed are healthy)"""
+        with self._health_lock:
+            return {display_id: replace(health) for display_id, health in self._health.items()}
+    
+    def _writing(self, display_id: int) -> bool:
+        with self._writes:
+            return display_id in self._brightness_workers
+    
     def get_monitor_by_id(self, display_id: int) -> Optional[DDCMonitor]:
         """Get monitor info by display ID"""
         monitors = self.detect_monitors(use_cache=True)
@@ -348,10 +1272,108 @@ class DDCController:
                 return monitor
         return None
     
+    def seed_cache(self, monitors: List[DDCMonitor]):
+        """
+        Populate monitor cache without running detection
+        
+        Used to rehydrate from a warm state snapshot.
+        """
+        self._monitors_cache = list(monitors)
+        self._cache_timestamp = time.time()
+        logger.debug("Monitor cache seeded with %s monitor(s)", len(monitors))
+    
+    def get_cached_monitors(self) -> Optional[List[DDCMonitor]]:
+        """Get cached monitor list without detecting (None if not cached)"""
+        return self._monitors_cache
+    
+    def enable_hotplug(self):
+        """Keep the monitor cache until refresh_monitors() instead of expiring it"""
+        self._hotplug = True
+    
+    def handle_uevent(self, event: Uevent) -> bool:
+        """
+        Look at a drm/i2c uevent
+        
+        Closes the channel of a removed I2C adapter right away.
+        
+        Returns:
+            True if the monitors should be refreshed (refresh_monitors)
+        """
+        if event.subsystem == 'drm':
+            return True
+        if event.subsystem == 'i2c' and event.name.startswith('i2c-'):
+            if event.action == 'remove':
+                device = self._devices.pop(f"/dev/{event.name}", None)
+                if device is not None:
+                    device.close()
+            return event.action in ('add', 'remove')
+        return event.devpath == ''  # dropped events
+    
+    def refresh_monitors(self) -> bool:
+        """
+        Re-enumerate monitors after a hotplug event
+        
+        Monitors that are still connected to the same bus keep their open
+        channel and cached brightness (also if their display number
+        changed); only new monitors, and monitors that did not answer
+        before (often still powering up at the last event), are probed.
+        Blocks on DDC for these; call it off the main loop.
+        
+        Returns:
+            True if the monitor list changed
+        """
+        previous = list(self._monitors_cache or [])
+        self._probed = {key: profile for key, profile in self._probed.items() if profile}
+        monitors = self._drm_detect()
+        if monitors is None:
+            self.invalidate_cache()
+            return self.detect_monitors(use_cache=False) != previous
+        
+        old_ids = {self._identity(m): m.id for m in previous}
+        brightness = {}
+        health = {}
+        for monitor in monitors:
+            old_id = old_ids.get(self._identity(monitor))
+            if old_id in self._brightness:
+                brightness[monitor.id] = self._brightness[old_id]
+            if old_id in self._health:
+                health[monitor.id] = self._health[old_id]
+        self._brightness = brightness
+        # Monitors that were (re)connected start with a closed circuit
+        with self._health_lock:
+            self._health = health
+        
+        buses = {monitor.bus for monitor in monitors}
+        for bus in list(self._devices):
+            if bus not in buses:
+                self._devices.pop(bus).close()
+        self._native_unavailable &= buses
+        
+        self._monitors_cache = monitors
+        self._cache_timestamp = time.time()
+        if monitors == previous:
+            return False
+        
+        if self._library is not None and self._library_scanned:
+            self._library_detect()  # reopen handles for the new set
+        logger.info("Monitors changed: %s", ', '.join(
+            f"{m.id}: {m.name} ({m.bus})" for m in monitors) or "none")
+        return True
+    
+    @staticmethod
+    def _identity(monitor: DDCMonitor) -> Tuple:
+        return (monitor.bus, monitor.manufacturer, monitor.model, monitor.serial)
+    
     def invalidate_cache(self):
         """Force cache refresh on next detect"""
         self._monitors_cache = None
         self._cache_timestamp = 0
+        self._brightness.clear()  # display numbers may now be other monitors
+        with self._health_lock:
+            self._health.clear()
+        # Probe monitors that did not answer again (they may have been busy)
+        self._probed = {key: version for key, version in self._probed.items() if version}
+        self.close()  # bus numbers may change with the next detection
         logger.debug("Monitor cache invalidated")
 
 
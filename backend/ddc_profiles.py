@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+DDC/CI Monitor Profiles
+Persistent per-monitor capability and timing data, keyed by EDID
+
+A monitor's MCCS capabilities and how fast it can be driven do not
+change, so they are probed once and kept across restarts in a small
+JSON file (/var/cache/legion-power/monitors.json). Monitors with a
+profile are not probed again on startup or hotplug.
+
+Each profile also carries a learned sleep multiplier: the scale applied
+to the DDC/CI protocol delays. It starts at 1 (the spec's delays) and,
+in learning mode, shrinks while commands keep succeeding and backs off
+when one fails, without going below what already failed.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILES_PATH = Path("/var/cache/legion-power/monitors.json")
+
+
+class ProfileError(Exception):
+    """Raised for unusable capability strings"""
+    pass
+
+
+def parse_capabilities(text: str) -> Tuple[List[int], str]:
+    """
+    Parse an MCCS capabilities string
+    
+    Example: (prot(monitor)type(lcd)model(X)cmds(01 02 03 0C E3 F3)
+    vcp(02 04 10 12 14(05 08 0B) 60(0F 11) DF)mccs_ver(2.1))
+    
+    Returns:
+        (VCP codes listed in vcp(...), MCCS version or 'Unknown')
+    
+    Raises:
+        ProfileError: If there is no vcp(...) section
+    """
+    start = text.find("vcp(")
+    if start < 0:
+        raise ProfileError("No vcp() section in capabilities")
+    
+    features = []
+    depth = 0
+    token = ''
+    for char in text[start + 4:]:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0:
+            if char.isspace():
+                token = ''
+                continue
+            token += char
+            # Codes are two hex digits, sometimes not separated by spaces
+            if len(token) == 2:
+                try:
+                    features.append(int(token, 16))
+                except ValueError:
+                    pass
+                token = ''
+    
+    match = re.search(r"mccs_ver\(\s*(\d+\.\d+)\s*\)", text)
+    return features, match.group(1) if match else 'Unknown'
+
+
+@dataclass
+class MonitorProfile:
+    """What is known about one monitor (by EDID)"""
+    edid_key: str
+    name: str
+    bus: str  # I2C bus it last answered on
+    vcp_version: str
+    capabilities: str = ''  # raw MCCS string ('' if read through ddcutil)
+    features: List[int] = field(default_factory=list)  # supported VCP codes
+    sleep_multiplier: float = 1.0  # learned protocol delay scale
+    failed_multiplier: float = 0.0  # highest scale seen failing (0: none)
+    streak: int = 0  # commands in a row without a retry
+    
+    # Learning mode
+    LEARN_SUCCESSES = 20   # clean commands before trying shorter delays
+    LEARN_DECREASE = 0.85
+    LEARN_BACKOFF = 1.5
+    FAILED_MARGIN = 1.1    # stay this far above a scale that failed
+    FORGET_FAILURE = 10    # streaks at the margin before retrying below it
+    MIN_MULTIPLIER = 0.3
+    MAX_MULTIPLIER = 2.0
+    
+    def supports(self, code: int) -> bool:
+        """Whether a VCP code is supported (True if features are unknown)"""
+        return not self.features or code in self.features
+    
+    def record(self, ok: bool) -> bool:
+        """
+        Learn from one command
+        
+        Args:
+            ok: The command succeeded without retries
+        
+        Returns:
+            True if the sleep multiplier changed
+        """
+        if not ok:
+            failed = self.sleep_multiplier
+            # Everything up to the highest failing scale is unsafe
+            self.failed_multiplier = max(self.failed_multiplier, failed)
+            self.sleep_multiplier = round(min(self.MAX_MULTIPLIER, failed * self.LEARN_BACKOFF), 3)
+            self.streak = 0
+            logger.info("%s: command failed at sleep multiplier %s, backing off to %s",
+                        self.name, failed, self.sleep_multiplier)
+            return True
+        
+        self.streak += 1
+        if self.streak % self.LEARN_SUCCESSES:
+            return False
+        
+        floor = self.MIN_MULTIPLIER
+        if self.failed_multiplier:
+            if self.streak >= self.LEARN_SUCCESSES * self.FORGET_FAILURE:
+                self.failed_multiplier = 0.0  # was probably a transient error
+            else:
+                floor = max(floor, self.failed_multiplier * self.FAILED_MARGIN)
+        shorter = round(max(floor, self.sleep_multiplier * self.LEARN_DECREASE), 3)
+        if shorter >= self.sleep_multiplier:
+            return False
+        logger.debug("%s: sleep multiplier %s -> %s", self.name, self.sleep_multiplier, shorter)
+        self.sleep_multiplier = shorter
+        return True
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MonitorProfile':
+        known = {name for name in cls.__dataclass_fields__}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class MonitorProfileStore:
+    """JSON file of monitor profiles"""
+    
+    VERSION = 1
+    
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Load profiles
+        
+        Args:
+            path: Profile file (default: PROFILES_PATH)
+        """
+        self.path = Path(path) if path is not None else PROFILES_PATH
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, MonitorProfile] = {}
+        self._load()
+    
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning("Ignoring unreadable monitor profiles %s: %s", self.path, e)
+            return
+        if data.get('version') != self.VERSION:
+            logger.debug("Ignoring monitor profiles from another version")
+            return
+        for entry in data.get('monitors', []):
+            try:
+                profile = MonitorProfile.from_dict(entry)
+            except TypeError as e:
+                logger.debug("Skipping bad monitor profile: %s", e)
+                continue
+            self._profiles[profile.edid_key] = profile
+        logger.debug("Loaded %s monitor profile(s)", len(self._profiles))
+    
+    def get(self, edid_key: str) -> Optional[MonitorProfile]:
+        return self._profiles.get(edid_key)
+    
+    def put(self, profile: MonitorProfile):
+        """Add or replace a profile and save"""
+        with self._lock:
+            self._profiles[profile.edid_key] = profile
+        self.save()
+    
+    def __len__(self) -> int:
+        return len(self._profiles)
+    
+    def save(self):
+        """Atomically write all profiles"""
+        with self._lock:
+            data = {
+                'version': self.VERSION,
+                'saved_at': time.time(),
+                'monitors': [p.to_dict() for p in self._profiles.values()],
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning("Failed to save monitor profiles: %s", e)
@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+DDC/CI Bus Simulator
+Simulated external monitors behind a stub ddcutil executable
+
+DDCBusSimulator writes a JSON state file (monitors, VCP values, latency,
+failure rate) and a small `ddcutil` wrapper script that runs this module
+as a ddcutil look-alike against that state:
+    
+    with DDCBusSimulator(monitors=2, failure_rate=0.05) as sim:
+        controller = DDCController(ddcutil=sim.ddcutil_path)
+        controller.set_brightness(1, 40)
+
+Each command sleeps for its configured latency (scaled by
+--sleep-multiplier, like ddcutil's DDC/CI waits) while holding an
+exclusive lock on the simulated I2C bus, so concurrent commands to one
+display serialize the way they do on real hardware.
+
+The directory also holds a sysfs tree for DRM enumeration
+(<directory>/sys/class/drm: one connected DisplayPort connector with an
+EDID per monitor, plus the laptop panel and an empty HDMI port).
+unplug() and plug() toggle a monitor's connector and send a drm hotplug
+uevent to uevent_path (a legion_uevent.UeventListener bound there).
+
+With i2c=True the simulator also serves each monitor's bus at
+<directory>/dev/i2c-N (an I2CResponder socket) for the native ddc_i2c
+backend (Get/Set VCP and the Capabilities request); use the directory as
+the controller's root, which also keeps its monitor profiles there:
+    
+    with DDCBusSimulator(monitors=2, i2c=True) as sim:
+        controller = DDCController(ddcutil=sim.ddcutil_path, root=sim.directory)
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import random
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from ddc_i2c import (CAPABILITIES, CAPABILITIES_REPLY, CAPS_FRAGMENT, DEST_ADDR, GET_VCP,
+                         GET_VCP_REPLY, HOST_ADDR, REPLY_SEED, SET_VCP,
+                         SIM_ACK, SIM_NACK, SIM_READ, SIM_WRITE, checksum)
+except ImportError:
+    from .ddc_i2c import (CAPABILITIES, CAPABILITIES_REPLY, CAPS_FRAGMENT, DEST_ADDR, GET_VCP,
+                          GET_VCP_REPLY, HOST_ADDR, REPLY_SEED, SET_VCP,
+                          SIM_ACK, SIM_NACK, SIM_READ, SIM_WRITE, checksum)
+
+STATE_FILE = "ddc_state.json"
+
+# Base command latency in ms at --sleep-multiplier 1
+DEFAULT_LATENCY_MS = {
+    'detect': 400,   # per probed bus
+    'getvcp': 45,
+    'setvcp': 55,
+    'capabilities': 450,
+}
+
+# What a simulated display needs on the native I2C path, in ms: time from
+# a Get VCP request until its reply is ready, minimum gap after a command
+# before it accepts the next, and bus time per transfer
+DEFAULT_I2C_TIMING_MS = {
+    'reply': 30,
+    'interval': 35,
+    'transfer': 1,
+}
+
+VCP_NAMES = {
+    0x10: "Brightness",
+    0x12: "Contrast",
+    0x60: "Input Source",
+    0x62: "Audio speaker volume",
+    0xD6: "Power mode",
+}
+
+# Simple non-continuous features (a value from a list, no maximum)
+NON_CONTINUOUS = (0x60, 0xD6)
+
+MONITOR_MODELS = (
+    ("IVM", "Iiyama North America", "PL2745Q", 26267),
+    ("DEL", "Dell Inc.", "DELL U2720Q", 41393),
+    ("GSM", "Goldstar Company Ltd", "LG ULTRAGEAR", 23353),
+    ("AUS", "Asustek Computer Inc", "VG27A", 10134),
+)
+
+
+class DDCBusSimulator:
+    """
+    Simulated multi-monitor DDC/CI setup
+    
+    State lives in a JSON file so the stub ddcutil processes and the
+    benchmark process share it.
+    """
+    
+    def __init__(self, directory: Optional[Path] = None, monitors: int = 2,
+                 latency_ms: Optional[Dict[str, float]] = None,
+                 failure_rate: float = 0.0, jitter: float = 0.2, i2c: bool = False):
+        """
+        Initialize simulator (call start() to write the state and stub)
+        
+        Args:
+            directory: Directory for the state file and stub (default:
+                       temporary directory, removed by stop())
+            monitors: Number of simulated monitors
+            latency_ms: Per-command base latency overrides (see DEFAULT_LATENCY_MS)
+            failure_rate: Probability that a command fails (0-1)
+            jitter: Relative random latency variation (0.2 = +-20%)
+            i2c: Also serve simulated /dev/i2c-N buses for the native backend
+        """
+        self._owns_directory = directory is None
+        self.directory = Path(directory) if directory is not None else None
+        self.monitors = monitors
+        self.latency_ms = dict(DEFAULT_LATENCY_MS, **(latency_ms or {}))
+        self.failure_rate = failure_rate
+        self.jitter = jitter
+        self.i2c = i2c
+        self._responders: List['I2CResponder'] = []
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+    
+    @property
+    def state_path(self) -> Path:
+        return self.directory / STATE_FILE
+    
+    @property
+    def ddcutil_path(self) -> str:
+        """Path of the stub ddcutil executable"""
+        return str(self.directory / "ddcutil")
+    
+    def start(self):
+        """Write the initial state file and the stub executable"""
+        if self.directory is None:
+            self.directory = Path(tempfile.mkdtemp(prefix="ddc-sim-"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        
+        monitors = []
+        for i in range(self.monitors):
+            code, _, model, product = MONITOR_MODELS[i % len(MONITOR_MODELS)]
+            monitors.append({
+                'id': i + 1,
+                'bus': i + 5,
+                'mfg': code,
+                'model': model,
+                'product_code': product,
+                'serial': f"SIM{i + 1:06d}",
+                'vcp_version': "2.1",
+                'vcp': {'16': [75, 100], '18': [50, 100], '96': [15, 255],
+                        '98': [30, 100], '214': [1, 5], '223': [0x0201, 0]},
+            })
+        self._write_state({
+            'monitors': monitors,
+            'latency_ms': self.latency_ms,
+            'failure_rate': self.failure_rate,
+            'jitter': self.jitter,
+            'commands': 0,
+        })
+        
+        stub = Path(self.ddcutil_path)
+        stub.write_text(
+            "#!/bin/sh\n"
+            f'exec "{sys.executable}" "{Path(__file__).resolve()}" '
+            f'--state "{self.state_path}" "$@"\n'
+        )
+        stub.chmod(0o755)
+        
+        self._write_drm(monitors)
+        
+        if self.i2c:
+            (self.directory / "dev").mkdir(exist_ok=True)
+            for monitor in monitors:
+                responder = I2CResponder(self.state_path, monitor['bus'],
+                                         self.directory / "dev" / f"i2c-{monitor['bus']}")
+                responder.start()
+                self._responders.append(responder)
+    
+    def stop(self):
+        """Stop the I2C responders and remove the state directory if it was created here"""
+        for responder in self._responders:
+            responder.stop()
+        self._responders = []
+        if self._owns_directory and self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+    
+    def configure(self, latency_ms: Optional[Dict[str, float]] = None,
+                  failure_rate: Optional[float] = None):
+        """Change latency or failure rate of subsequent commands"""
+        with _locked_state(self.state_path) as state:
+            if latency_ms:
+                state['latency_ms'].update(latency_ms)
+            if failure_rate is not None:
+                state['failure_rate'] = failure_rate
+    
+    def get_vcp(self, display_id: int, code: int = 0x10) -> int:
+        """Current VCP value of a simulated display"""
+        with _locked_state(self.state_path) as state:
+            return _find_display(state, display_id)['vcp'][str(code)][0]
+    
+    def _write_drm(self, monitors: List[Dict]):
+        """Create /sys/class/drm connectors and /sys/bus/i2c adapters"""
+        self._write_connector("card1-eDP-1", "connected", build_edid("BOE", 2455, "", "", 0), bus=1)
+        self._write_connector("card1-HDMI-A-1", "disconnected", b"")
+        for monitor in monitors:
+            self._write_monitor_connector(monitor, connected=True)
+    
+    def _write_connector(self, name: str, status: str, edid: bytes, bus: Optional[int] = None):
+        path = self.directory / "sys" / "class" / "drm" / name
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "status").write_text(status + "\n")
+        (path / "edid").write_bytes(edid)
+        if bus is not None:
+            adapter = self.directory / "sys" / "bus" / "i2c" / "devices" / f"i2c-{bus}"
+            adapter.mkdir(parents=True, exist_ok=True)
+            ddc = path / "ddc"
+            if not ddc.is_symlink():
+                ddc.symlink_to(adapter)
+    
+    def _write_monitor_connector(self, monitor: Dict, connected: bool):
+        """DisplayPort connector of a simulated monitor (card1-DP-<id>)"""
+        edid = build_edid(monitor['mfg'], monitor['product_code'], monitor['model'],
+                          monitor['serial'], 1000 + monitor['id'])
+        self._write_connector(f"card1-DP-{monitor['id']}",
+                              "connected" if connected else "disconnected",
+                              edid if connected else b"", bus=monitor['bus'])
+    
+    @property
+    def uevent_path(self) -> str:
+        """Socket that unplug()/plug() send uevents to (legion_uevent's simulated source)"""
+        return str(self.directory / "uevent.sock")
+    
+    def unplug(self, display_id: int):
+        """Disconnect a monitor and send a drm hotplug uevent"""
+        with _locked_state(self.state_path) as state:
+            monitor = _find_display(state, display_id)
+            state['monitors'].remove(monitor)
+            state.setdefault('unplugged', []).append(monitor)
+        self._write_monitor_connector(monitor, connected=False)
+        self._send_hotplug()
+    
+    def plug(self, display_id: int):
+        """Reconnect a monitor removed with unplug() and send a drm hotplug uevent"""
+        with _locked_state(self.state_path) as state:
+            monitor = _find_display({'monitors': state.get('unplugged', [])}, display_id)
+            state['unplugged'].remove(monitor)
+            state['monitors'].append(monitor)
+            state['monitors'].sort(key=lambda m: m['id'])
+        self._write_monitor_connector(monitor, connected=True)
+        self._send_hotplug()
+    
+    def _send_hotplug(self):
+        devpath = "/devices/pci0000:00/0000:01:00.0/drm/card1"
+        message = (f"change@{devpath}\0ACTION=change\0DEVPATH={devpath}\0"
+                   "SUBSYSTEM=drm\0HOTPLUG=1\0").encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            try:
+                sock.sendto(message, self.uevent_path)
+            except OSError:
+                pass  # nobody listening
+    
+    def set_vcp(self, display_id: int, value: int, code: int = 0x10):
+        """Change a VCP value behind the host's back (the monitor's own buttons)"""
+        with _locked_state(self.state_path) as state:
+            _find_display(state, display_id)['vcp'][str(code)][0] = value
+    
+    def command_count(self) -> int:
+        """Number of ddcutil commands executed so far"""
+        with _locked_state(self.state_path) as state:
+            return state['commands']
+    
+    def i2c_transfer_count(self) -> int:
+        """Number of native I2C reads and writes served so far"""
+        return sum(responder.transfers for responder in self._responders)
+    
+    def _write_state(self, state: Dict):
+        tmp = self.state_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+
+def build_edid(mfg: str, product_code: int, model: str, serial: str,
+               serial_number: int) -> bytes:
+    """Minimal EDID 1.4 base block (identity and name/serial descriptors)"""
+    mfg_id = 0
+    for letter in mfg:
+        mfg_id = (mfg_id << 5) | (ord(letter) - ord('A') + 1)
+    block = bytearray(128)
+    block[0:8] = b"\x00\xff\xff\xff\xff\xff\xff\x00"
+    block[8:16] = struct.pack(">H", mfg_id) + struct.pack("<HI", product_code, serial_number)
+    block[16:20] = bytes([1, 33, 1, 4])  # week, year - 1990, EDID 1.4
+    descriptors = ((0xFC, model), (0xFF, serial))
+    for offset, (tag, text) in zip((72, 90), descriptors):
+        if text:
+            block[offset:offset + 5] = bytes([0, 0, 0, tag, 0])
+            block[offset + 5:offset + 18] = (text.encode()[:13] + b"\n").ljust(13, b" ")[:13]
+    block[127] = -sum(block) % 256
+    return bytes(block)
+
+
+@contextmanager
+def _locked_state(path: Path):
+    """Read-modify-write the state file under an exclusive lock"""
+    with open(path.with_suffix('.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        with open(path, 'r') as f:
+            state = json.load(f)
+        before = json.dumps(state, sort_keys=True)
+        yield state
+        if json.dumps(state, sort_keys=True) != before:
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp, path)
+
+
+@contextmanager
+def _bus_lock(state_path: Path, bus: int):
+    """Hold the simulated I2C bus exclusively"""
+    with open(state_path.parent / f"i2c-{bus}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+class I2CResponder:
+    """
+    Display side of one simulated DDC/CI bus
+    
+    Listens on a SOCK_SEQPACKET socket that ddc_i2c.DDCDevice opens in
+    place of /dev/i2c-N. VCP values come from the shared state file, and
+    transfers hold the same bus lock as the stub ddcutil. Like a real
+    display it NACKs commands that arrive too soon after the previous
+    one and answers reads with a null message until a reply is ready.
+    """
+    
+    def __init__(self, state_path: Path, bus: int, socket_path: Path,
+                 timing_ms: Optional[Dict[str, float]] = None):
+        self._state_path = state_path
+        self.bus = bus
+        self.socket_path = socket_path
+        self.timing_ms = dict(DEFAULT_I2C_TIMING_MS, **(timing_ms or {}))
+        self.transfers = 0
+        self._listener: Optional[socket.socket] = None
+        self._ready_at = 0.0
+        self._pending: Optional[tuple] = None  # (command, vcp code or offset, requested at)
+    
+    def start(self):
+        """Listen on the bus socket"""
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._listener.bind(str(self.socket_path))
+        self._listener.listen()
+        threading.Thread(target=self._accept, name=f"i2c-{self.bus}", daemon=True).start()
+    
+    def stop(self):
+        """Stop listening"""
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+    
+    def _accept(self):
+        listener = self._listener
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+    
+    def _serve(self, conn: socket.socket):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv(64)
+                except OSError:
+                    return
+                if not message:
+                    return
+                with _bus_lock(self._state_path, self.bus):
+                    time.sleep(self.timing_ms['transfer'] / 1000)
+                    self.transfers += 1
+                    if message[:1] == SIM_WRITE:
+                        response = SIM_ACK if self._write(message[1:]) else SIM_NACK
+                    else:
+                        response = self._read(message[1])
+                conn.send(response)
+    
+    def _write(self, data: bytes) -> bool:
+        """Handle a host -> display packet; False means NACK"""
+        now = time.monotonic()
+        if now < self._ready_at:
+            return False
+        if (len(data) < 4 or data[0] != HOST_ADDR or len(data) != (data[1] & 0x7F) + 3
+                or checksum(DEST_ADDR, data[:-1]) != data[-1]):
+            return False
+        
+        self._ready_at = now + self.timing_ms['interval'] / 1000
+        payload = data[2:-1]
+        with _locked_state(self._state_path) as state:
+            if random.random() < state['failure_rate']:
+                return False
+            try:
+                vcp = _find_display(state, bus=self.bus)['vcp']
+            except LookupError:
+                return False  # monitor unplugged
+            if payload[0] == GET_VCP:
+                self._pending = (GET_VCP, payload[1], now)
+            elif payload[0] == CAPABILITIES and len(payload) == 3:
+                self._pending = (CAPABILITIES, struct.unpack(">H", payload[1:3])[0], now)
+            elif payload[0] == SET_VCP and len(payload) == 4:
+                key = str(payload[1])
+                if key in vcp:
+                    value = struct.unpack(">H", payload[2:4])[0]
+                    vcp[key][0] = max(0, min(vcp[key][1], value))
+        return True
+    
+    def _read(self, length: int) -> bytes:
+        """Handle a read of length bytes"""
+        now = time.monotonic()
+        pending, self._pending = self._pending, None
+        self._ready_at = max(self._ready_at, now + self.timing_ms['interval'] / 1000)
+        
+        if pending is None or now - pending[2] < self.timing_ms['reply'] / 1000:
+            reply = bytes([DEST_ADDR, 0x80])
+            reply += bytes([checksum(REPLY_SEED, reply)])
+            return reply.ljust(length, b"\0")
+        
+        command, code = pending[:2]
+        with _locked_state(self._state_path) as state:
+            monitor = _find_display(state, bus=self.bus)
+            vcp = monitor['vcp']
+            corrupt = random.random() < state['failure_rate']
+        
+        if command == CAPABILITIES:
+            fragment = _capabilities(monitor).encode()[code:code + CAPS_FRAGMENT]
+            reply = (bytes([DEST_ADDR, 0x80 | (len(fragment) + 3), CAPABILITIES_REPLY])
+                     + struct.pack(">H", code) + fragment)
+            reply += bytes([checksum(REPLY_SEED, reply) ^ (0xFF if corrupt else 0)])
+            return reply.ljust(length, b"\0")
+        
+        current, maximum = vcp.get(str(code), (0, 0))
+        result = 0 if str(code) in vcp else 1
+        reply = (bytes([DEST_ADDR, 0x88, GET_VCP_REPLY, result, code, 0x00])
+                 + struct.pack(">HH", maximum, current))
+        reply += bytes([checksum(REPLY_SEED, reply) ^ (0xFF if corrupt else 0)])
+        return reply.ljust(length, b"\0")
+
+
+def _capabilities(monitor: Dict) -> str:
+    """MCCS capabilities string of a simulated monitor"""
+    codes = ' '.join(f"{int(code):02X}" for code in sorted(monitor['vcp'], key=int))
+    return (f"(prot(monitor)type(lcd)model({monitor['model']})cmds(01 02 03 0C E3 F3)"
+            f"vcp({codes})mccs_ver({monitor['vcp_version']}))")
+
+
+def _find_display(state: Dict, display_id: Optional[int] = None,
+                  bus: Optional[int] = None) -> Dict:
+    for monitor in state['monitors']:
+        if display_id is not None and monitor['id'] == display_id:
+            return monitor
+        if bus is not None and monitor['bus'] == bus:
+            return monitor
+    raise LookupError
+
+
+def _delay(state: Dict, command: str, multiplier: float, count: int = 1):
+    """Sleep for a command's simulated latency"""
+    base = state['latency_ms'].get(command, 50) * count
+    jitter = state.get('jitter', 0)
+    time.sleep(base * multiplier * random.uniform(1 - jitter, 1 + jitter) / 1000)
+
+
+def _format_detect(monitors: List[Dict]) -> str:
+    blocks = []
+    for monitor in monitors:
+        name = next((m[1] for m in MONITOR_MODELS if m[0] == monitor['mfg']), "Unknown")
+        blocks.append(
+            f"Display {monitor['id']}\n"
+            f"   I2C bus:  /dev/i2c-{monitor['bus']}\n"
+            f"   DRM connector:           card1-DP-{monitor['id']}\n"
+            f"   EDID synopsis:\n"
+            f"      Mfg id:               {monitor['mfg']} - {name}\n"
+            f"      Model:                {monitor['model']}\n"
+            f"      Product code:         {monitor['product_code']}  "
+            f"(0x{monitor['product_code']:04x})\n"
+            f"      Serial number:        {monitor['serial']}\n"
+            f"      Manufacture year:     2023,  Week: 43\n"
+            f"   VCP version:         {monitor['vcp_version']}\n"
+        )
+    return "\n".join(blocks)
+
+
+def run_ddcutil(argv: List[str]) -> int:
+    """
+    ddcutil look-alike entry point
+    
+    Supports: detect, getvcp <code>..., setvcp <code> <value>...,
+    capabilities, with -d/--display, -b/--bus, --sleep-multiplier,
+    -t/--terse, --brief, --noverify and --maxtries.
+    
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog='ddcutil', add_help=False)
+    parser.add_argument('--state', type=Path, required=True)
+    parser.add_argument('-d', '--display', type=int)
+    parser.add_argument('-b', '--bus', type=int)
+    parser.add_argument('--sleep-multiplier', type=float, default=1.0)
+    parser.add_argument('-t', '--terse', action='store_true')
+    parser.add_argument('--brief', action='store_true')
+    parser.add_argument('--noverify', action='store_true')
+    parser.add_argument('--maxtries')
+    parser.add_argument('command')
+    parser.add_argument('args', nargs='*')
+    args = parser.parse_args(argv)
+    
+    with _locked_state(args.state) as state:
+        state['commands'] += 1
+        config = {k: state[k] for k in ('latency_ms', 'failure_rate', 'jitter')}
+        monitors = state['monitors']
+    
+    multiplier = args.sleep_multiplier
+    
+    if args.command == 'detect':
+        for monitor in monitors:
+            with _bus_lock(args.state, monitor['bus']):
+                _delay(config, 'detect', multiplier)
+        print(_format_detect(monitors))
+        return 0
+    
+    display = args.display if args.display is not None or args.bus is not None else 1
+    try:
+        monitor = _find_display({'monitors': monitors}, display, args.bus)
+    except LookupError:
+        print("Display not found", file=sys.stderr)
+        return 1
+    
+    with _bus_lock(args.state, monitor['bus']):
+        if args.command == 'getvcp':
+            codes = [int(code, 16) for code in args.args]
+            _delay(config, 'getvcp', multiplier, len(codes))
+            failed = random.random() < config['failure_rate']
+            if failed:
+                print("Error Getting VCP: DDCRC_RETRIES(-3007): maximum retries exceeded",
+                      file=sys.stderr)
+                return 1
+            with _locked_state(args.state) as state:
+                vcp = _find_display(state, monitor['id'])['vcp']
+            for code in codes:
+                if str(code) not in vcp:
+                    print(f"VCP code 0x{code:02x} ({VCP_NAMES.get(code, 'Unknown feature')}):"
+                          " Unsupported feature code (Null response)")
+                    continue
+                current, maximum = vcp[str(code)]
+                if args.terse and code in NON_CONTINUOUS:
+                    print(f"VCP {code:02X} SNC x{current:02x}")
+                elif args.terse:
+                    print(f"VCP {code:02X} C {current} {maximum}")
+                else:
+                    print(f"VCP code 0x{code:02x} ({VCP_NAMES.get(code, 'Unknown feature'):<28}):"
+                          f" current value = {current:5d}, max value = {maximum:5d}")
+            return 0
+        
+        if args.command == 'setvcp':
+            pairs = list(zip(args.args[0::2], args.args[1::2]))
+            _delay(config, 'setvcp', multiplier, len(pairs))
+            if random.random() < config['failure_rate']:
+                print("Error setting VCP: DDCRC_RETRIES(-3007): maximum retries exceeded",
+                      file=sys.stderr)
+                return 1
+            with _locked_state(args.state) as state:
+                vcp = _find_display(state, monitor['id'])['vcp']
+                for code, value in pairs:
+                    key = str(int(code, 16))
+                    if key in vcp:
+                        vcp[key][0] = max(0, min(vcp[key][1], int(value)))
+            return 0
+        
+        if args.command == 'capabilities':
+            _delay(config, 'capabilities', multiplier)
+            print(f"Model: {monitor['model']}\nMCCS version: {monitor['vcp_version']}\n"
+                  "VCP Features:\n" + "\n".join(
+                      f"   Feature: {code:02X} ({VCP_NAMES.get(code, 'Unknown feature')})"
+                      for code in sorted(int(c) for c in monitor['vcp'])))
+            return 0
+    
+    print(f"Unrecognized command: {args.command}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_ddcutil(sys.argv[1:]))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+DRM Connector Enumeration
+Connected outputs and their EDID from /sys/class/drm, without DDC/CI
+
+The kernel already knows which outputs have a monitor attached and has
+read each monitor's EDID, so listing them costs a few sysfs reads instead
+of ddcutil's bus-by-bus probe (hundreds of ms per bus). Each connector's
+DDC channel is found through its `ddc` symlink (HDMI/DVI/VGA) or the
+`i2c-N` adapter of its DisplayPort AUX channel.
+
+EDID base block layout (VESA E-EDID 1.4) used here:
+    
+    0-7     header 00 FF FF FF FF FF FF 00
+    8-9     manufacturer ID (three 5-bit letters, big endian)
+    10-11   product code (little endian)
+    12-15   serial number (little endian)
+    17      year of manufacture - 1990
+    54-125  four 18-byte descriptors (0xFC name, 0xFF serial string)
+    127     checksum (all 128 bytes sum to 0 mod 256)
+"""
+
+import hashlib
+import logging
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+DRM_CLASS = "sys/class/drm"
+
+EDID_HEADER = b"\x00\xff\xff\xff\xff\xff\xff\x00"
+EDID_BLOCK_SIZE = 128
+DESCRIPTOR_OFFSETS = (54, 72, 90, 108)
+DESCRIPTOR_NAME = 0xFC
+DESCRIPTOR_SERIAL = 0xFF
+
+# Built-in panels are not DDC/CI monitors
+INTERNAL_CONNECTORS = ("eDP", "LVDS", "DSI")
+
+
+class EDIDError(Exception):
+    """Raised for EDID data that cannot be parsed"""
+    pass
+
+
+@dataclass
+class EDIDInfo:
+    """Monitor identity from an EDID base block"""
+    manufacturer: str  # three-letter PNP ID (e.g. "DEL")
+    product_code: int
+    serial_number: int  # binary serial (0 if unset)
+    model: str  # display name descriptor ('' if absent)
+    serial: str  # serial string descriptor ('' if absent)
+    year: int
+    key: str  # stable identity: hash of the base block
+    
+    @property
+    def name(self) -> str:
+        return f"{self.manufacturer} {self.model}".strip()
+
+
+@dataclass
+class DRMOutput:
+    """A connected external output"""
+    connector: str  # e.g. "card1-DP-1"
+    bus: Optional[int]  # I2C bus number of its DDC channel
+    edid: EDIDInfo
+
+
+def parse_edid(data: bytes) -> EDIDInfo:
+    """
+    Parse an EDID base block
+    
+    Args:
+        data: EDID bytes (extension blocks are ignored)
+    
+    Returns:
+        Parsed identity
+    
+    Raises:
+        EDIDError: If the header or checksum is wrong
+    """
+    block = bytes(data[:EDID_BLOCK_SIZE])
+    if len(block) < EDID_BLOCK_SIZE or block[:8] != EDID_HEADER:
+        raise EDIDError("Not an EDID base block")
+    if sum(block) % 256:
+        raise EDIDError("EDID checksum mismatch")
+    
+    (mfg,) = struct.unpack(">H", block[8:10])
+    manufacturer = ''.join(chr(((mfg >> shift) & 0x1F) + ord('A') - 1) for shift in (10, 5, 0))
+    product_code, serial_number = struct.unpack("<HI", block[10:16])
+    
+    descriptors = {}
+    for offset in DESCRIPTOR_OFFSETS:
+        descriptor = block[offset:offset + 18]
+        # Display descriptors start with 00 00 00 <tag>; others are timings
+        if descriptor[:3] == b"\x00\x00\x00" and descriptor[3] in (DESCRIPTOR_NAME, DESCRIPTOR_SERIAL):
+            text = descriptor[5:18].split(b"\n", 1)[0]
+            descriptors[descriptor[3]] = text.decode('cp437', errors='replace').strip()
+    
+    return EDIDInfo(
+        manufacturer=manufacturer,
+        product_code=product_code,
+        serial_number=serial_number,
+        model=descriptors.get(DESCRIPTOR_NAME, ''),
+        serial=descriptors.get(DESCRIPTOR_SERIAL, ''),
+        year=block[17] + 1990,
+        key=hashlib.sha1(block).hexdigest(),
+    )
+
+
+def _connector_bus(connector: Path) -> Optional[int]:
+    """I2C bus number of a connector's DDC channel (None if unknown)"""
+    ddc = connector / "ddc"
+    names = [os.readlink(ddc)] if ddc.is_symlink() else []
+    # DisplayPort: the AUX channel's I2C adapter is a child of the connector
+    names += sorted(entry.name for entry in connector.glob("i2c-*"))
+    for name in names:
+        name = os.path.basename(name)
+        if name.startswith("i2c-") and name[4:].isdigit():
+            return int(name[4:])
+    return None
+
+
+def list_outputs(root: str = "/") -> List[DRMOutput]:
+    """
+    List connected external outputs with a readable EDID
+    
+    Args:
+        root: Filesystem root prefix
+    
+    Returns:
+        Outputs sorted by I2C bus (unknown buses last)
+    
+    Raises:
+        EDIDError: If the DRM class directory does not exist
+    """
+    drm = Path(root) / DRM_CLASS
+    if not drm.is_dir():
+        raise EDIDError(f"{drm} not found")
+    
+    outputs = []
+    for connector in sorted(drm.glob("card*-*")):
+        kind = connector.name.split('-', 1)[1]
+        if kind.startswith(INTERNAL_CONNECTORS):
+            continue
+        try:
+            if (connector / "status").read_text().strip() != "connected":
+                continue
+            edid = parse_edid((connector / "edid").read_bytes())
+        except (OSError, EDIDError) as e:
+            logger.debug("Skipping %s: %s", connector.name, e)
+            continue
+        outputs.append(DRMOutput(connector=connector.name, bus=_connector_bus(connector), edid=edid))
+    
+    outputs.sort(key=lambda o: (o.bus is None, o.bus or 0))
+    return outputs
+
+
+if __name__ == "__main__":
+    for output in list_outputs(os.environ.get("LEGION_POWER_ROOT", "/")):
+        bus = f"/dev/i2c-{output.bus}" if output.bus is not None else "no DDC channel"
+        print(f"{output.connector}: {output.edid.name} ({output.edid.serial or output.edid.serial_number}) {bus}")
@@ -6,8 +6,14 @@ Handles ACPI calls for Lenovo Legion 5 15ARH05
 
 import os
 import logging
+import threading
 from typing import Optional
 
+try:
+    from legion_metrics import METRICS
+except ImportError:
+    from .legion_metrics import METRICS
+
 logger = logging.getLogger(__name__)
 
 ACPI_CALL_PATH = "/proc/acpi/call"
@@ -45,21 +51,38 @@ class LegionACPI:
     DYTC_BALANCED = "0x000FB001"       # Intelligent Cooling
     DYTC_PERFORMANCE = "0x0012B001"    # Extreme Performance
     
-    def __init__(self):
-        """Initialize ACPI interface"""
+    # DYTC query (DYTC_CMD_GET): bits 8-11 = function, bits 12-15 = mode
+    DYTC_GET = "0x0002"
+    DYTC_FUNCTION_MMC = 0xB
+    DYTC_MODE_QUIET = 0x3
+    DYTC_MODE_PERFORMANCE = 0x2
+    DYTC_MODE_BALANCED = 0xF
+    
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize ACPI interface
+        
+        Args:
+            root: Filesystem root prefix (default: $LEGION_POWER_ROOT or /)
+        """
+        root = root or os.environ.get("LEGION_POWER_ROOT", "/")
+        self._call_path = os.path.join(root, ACPI_CALL_PATH.lstrip("/"))
         self._check_acpi_call_available()
+        # acpi_call is a write-then-read pair on a single file, so calls
+        # from different threads must not interleave
+        self._call_lock = threading.Lock()
     
     def _check_acpi_call_available(self):
         """Check if acpi_call module is loaded"""
-        if not os.path.exists(ACPI_CALL_PATH):
+        if not os.path.exists(self._call_path):
             raise ACPIError(
                 f"acpi_call module not loaded. "
                 f"Run: sudo modprobe acpi_call"
             )
         
-        if not os.access(ACPI_CALL_PATH, os.W_OK):
+        if not os.access(self._call_path, os.W_OK):
             raise ACPIError(
-                f"No write permission to {ACPI_CALL_PATH}. "
+                f"No write permission to {self._call_path}. "
                 f"Check udev rules or run with appropriate permissions."
             )
     
@@ -84,17 +107,19 @@ class LegionACPI:
             else:
                 call_str = method
             
-            logger.debug(f"ACPI call: {call_str}")
+            logger.debug("ACPI call: %s", call_str)
             
-            # Write to acpi_call
-            with open(ACPI_CALL_PATH, 'w') as f:
-                f.write(call_str)
+            op = "acpi." + method.rsplit('.', 1)[-1]
+            with self._call_lock, METRICS.timed(op):
+                # Write to acpi_call
+                with open(self._call_path, 'w') as f:
+                    f.write(call_str)
+                
+                # Read result
+                with open(self._call_path, 'r') as f:
+                    result = f.read().strip().rstrip('\x00')
             
-            # Read result
-            with open(ACPI_CALL_PATH, 'r') as f:
-                result = f.read().strip().rstrip('\x00')
-            
-            logger.debug(f"ACPI result: {result}")
+            logger.debug("ACPI result: %s", result)
             return result
             
         except PermissionError as e:
@@ -114,7 +139,7 @@ class LegionACPI:
             # Result is "0x0" (off) or "0x1" (on)
             return result == "0x1"
         except ACPIError as e:
-            logger.error(f"Failed to get conservation mode: {e}")
+            logger.error("Failed to get conservation mode: %s", e)
             raise
     
     def set_conservation_mode(self, enable: bool) -> None:
@@ -127,9 +152,9 @@ class LegionACPI:
         try:
             param = self.CONSERVATION_ON if enable else self.CONSERVATION_OFF
             self._execute_acpi_call(self.SBMC_METHOD, param)
-            logger.info(f"Conservation mode {'enabled' if enable else 'disabled'}")
+            logger.info("Conservation mode %s", 'enabled' if enable else 'disabled')
         except ACPIError as e:
-            logger.error(f"Failed to set conservation mode: {e}")
+            logger.error("Failed to set conservation mode: %s", e)
             raise
     
     def get_rapid_charge(self) -> bool:
@@ -144,7 +169,7 @@ class LegionACPI:
             # Result is "0x0" (off) or "0x1" (on)
             return result == "0x1"
         except ACPIError as e:
-            logger.error(f"Failed to get rapid charge: {e}")
+            logger.error("Failed to get rapid charge: %s", e)
             raise
     
     def set_rapid_charge(self, enable: bool) -> None:
@@ -157,9 +182,9 @@ class LegionACPI:
         try:
             param = self.RAPID_CHARGE_ON if enable else self.RAPID_CHARGE_OFF
             self._execute_acpi_call(self.SBMC_METHOD, param)
-            logger.info(f"Rapid charge {'enabled' if enable else 'disabled'}")
+            logger.info("Rapid charge %s", 'enabled' if enable else 'disabled')
         except ACPIError as e:
-            logger.error(f"Failed to set rapid charge: {e}")
+            logger.error("Failed to set rapid charge: %s", e)
             raise
     
     def set_power_profile(self, profile: str) -> None:
@@ -188,11 +213,44 @@ class LegionACPI:
         try:
             param = profile_map[profile]
             self._execute_acpi_call(self.DYTC_METHOD, param)
-            logger.info(f"Power profile set to: {profile}")
+            logger.info("Power profile set to: %s", profile)
         except ACPIError as e:
-            logger.error(f"Failed to set power profile: {e}")
+            logger.error("Failed to set power profile: %s", e)
             raise
     
+    def get_power_profile(self) -> str:
+        """
+        Get current power profile via DYTC query
+        
+        Returns:
+            One of "quiet", "balanced", "performance"
+        
+        Raises:
+            ACPIError: If ACPI call fails or the result cannot be parsed
+        """
+        try:
+            result = self._execute_acpi_call(self.DYTC_METHOD, self.DYTC_GET)
+            value = int(result, 16)
+        except ValueError:
+            raise ACPIError(f"Unexpected DYTC result: {result}")
+        except ACPIError as e:
+            logger.error("Failed to get power profile: %s", e)
+            raise
+        
+        function = (value >> 8) & 0xF
+        mode = (value >> 12) & 0xF
+        
+        # Anything other than MMC (e.g. STD) is the firmware's balanced mode
+        if function != self.DYTC_FUNCTION_MMC:
+            return "balanced"
+        
+        mode_map = {
+            self.DYTC_MODE_QUIET: "quiet",
+            self.DYTC_MODE_BALANCED: "balanced",
+            self.DYTC_MODE_PERFORMANCE: "performance",
+        }
+        return mode_map.get(mode, "balanced")
+    
     def test_acpi_methods(self) -> dict:
         """
         Test all ACPI methods (read-only operations)
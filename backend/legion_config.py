@@ -10,6 +10,11 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 import os
 
+try:
+    from legion_metrics import METRICS
+except ImportError:
+    from .legion_metrics import METRICS
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,8 +75,18 @@ class LegionConfig:
         'last_tab': 'battery',
     }
     
-    def __init__(self):
-        """Initialize configuration manager"""
+    def __init__(self, config_dir: Optional[Path] = None):
+        """
+        Initialize configuration manager
+        
+        Args:
+            config_dir: Directory for settings.json and state.json
+                        (default: ~/.config/legion-power)
+        """
+        if config_dir is not None:
+            self.CONFIG_DIR = Path(config_dir)
+            self.CONFIG_FILE = self.CONFIG_DIR / "settings.json"
+            self.STATE_FILE = self.CONFIG_DIR / "state.json"
         self._ensure_config_dir()
         self._config = self._load_config()
         self._state = self._load_state()
@@ -80,7 +95,7 @@ class LegionConfig:
         """Ensure configuration directory exists"""
         try:
             self.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-            logger.debug(f"Config directory: {self.CONFIG_DIR}")
+            logger.debug("Config directory: %s", self.CONFIG_DIR)
         except Exception as e:
             raise ConfigError(f"Failed to create config directory: {e}")
     
@@ -98,15 +113,15 @@ class LegionConfig:
             config = self.DEFAULT_CONFIG.copy()
             config.update(user_config)
             
-            logger.info(f"Loaded configuration from {self.CONFIG_FILE}")
+            logger.info("Loaded configuration from %s", self.CONFIG_FILE)
             return config
             
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in config file: {e}")
+            logger.error("Invalid JSON in config file: %s", e)
             logger.info("Using default configuration")
             return self.DEFAULT_CONFIG.copy()
         except Exception as e:
-            logger.error(f"Failed to load config: {e}")
+            logger.error("Failed to load config: %s", e)
             return self.DEFAULT_CONFIG.copy()
     
     def _load_state(self) -> Dict[str, Any]:
@@ -120,15 +135,15 @@ class LegionConfig:
             logger.debug("Loaded state file")
             return state
         except Exception as e:
-            logger.debug(f"Failed to load state: {e}")
+            logger.debug("Failed to load state: %s", e)
             return {}
     
     def save_config(self):
         """Save configuration to file"""
         try:
-            with open(self.CONFIG_FILE, 'w') as f:
+            with METRICS.timed('config.save'), open(self.CONFIG_FILE, 'w') as f:
                 json.dump(self._config, f, indent=2)
-            logger.info(f"Saved configuration to {self.CONFIG_FILE}")
+            logger.info("Saved configuration to %s", self.CONFIG_FILE)
         except Exception as e:
             raise ConfigError(f"Failed to save config: {e}")
     
@@ -139,7 +154,7 @@ class LegionConfig:
                 json.dump(self._state, f, indent=2)
             logger.debug("Saved state file")
         except Exception as e:
-            logger.warning(f"Failed to save state: {e}")
+            logger.warning("Failed to save state: %s", e)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -164,7 +179,7 @@ class LegionConfig:
             save: Whether to save immediately
         """
         self._config[key] = value
-        logger.debug(f"Set config: {key} = {value}")
+        logger.debug("Set config: %s = %s", key, value)
         
         if save:
             self.save_config()
@@ -195,7 +210,7 @@ class LegionConfig:
         try:
             with open(path, 'w') as f:
                 json.dump(self._config, f, indent=2)
-            logger.info(f"Exported configuration to {path}")
+            logger.info("Exported configuration to %s", path)
         except Exception as e:
             raise ConfigError(f"Failed to export config: {e}")
     
@@ -211,7 +226,7 @@ class LegionConfig:
             
             self._config = config
             self.save_config()
-            logger.info(f"Imported configuration from {path}")
+            logger.info("Imported configuration from %s", path)
         except Exception as e:
             raise ConfigError(f"Failed to import config: {e}")
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Legion Textfile Exporter
+Writes battery, thermal and service metrics as an OpenMetrics .prom file
+for the node-exporter textfile collector
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from legion_metrics import METRICS, LatencyHistogram, ServiceMetrics
+    from legion_sampler import TelemetrySampler
+except ImportError:
+    from .legion_metrics import METRICS, LatencyHistogram, ServiceMetrics
+    from .legion_sampler import TelemetrySampler
+
+logger = logging.getLogger(__name__)
+
+
+POWER_PROFILES = ("quiet", "balanced", "performance")
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value"""
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(**labels) -> str:
+    """Format a label set ({} omitted when empty)"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value"""
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class TextfileExporter:
+    """
+    OpenMetrics textfile exporter
+    
+    Renders the sampler's cached state (never fresh hardware reads) plus
+    service latency histograms, and atomically replaces the .prom file on
+    a fixed cadence. Counter families are named without the _total
+    suffix their samples carry, as OpenMetrics requires.
+    """
+    
+    def __init__(self, sampler: TelemetrySampler, path: Path, interval: float = 15.0,
+                 metrics: Optional[ServiceMetrics] = None):
+        """
+        Initialize exporter
+        
+        Args:
+            sampler: Sampler providing cached telemetry
+            path: Output file (e.g. /var/lib/node_exporter/textfile/legion_power.prom)
+            interval: Seconds between writes
+            metrics: Service metrics registry (default: METRICS)
+        """
+        self._sampler = sampler
+        self.path = Path(path)
+        self.interval = interval
+        self._metrics = metrics if metrics is not None else METRICS
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start writing on a background thread"""
+        if self._thread is not None:
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='legion-exporter',
+            daemon=True
+        )
+        self._thread.start()
+        logger.info("Textfile exporter writing %s every %ss", self.path, self.interval)
+    
+    def stop(self):
+        """Stop background writing"""
+        if self._thread is None:
+            return
+        
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+    
+    def _run(self):
+        """Exporter thread main loop"""
+        while not self._stop.wait(self.interval):
+            self.write()
+    
+    def write(self):
+        """Render and atomically replace the output file"""
+        try:
+            text = self.render()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{self.path.name}.", dir=self.path.parent
+            )
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(text)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning("Failed to write %s: %s", self.path, e)
+    
+    def render(self) -> str:
+        """Render the current cached state as OpenMetrics text"""
+        lines: List[str] = []
+        sample = self._sampler.latest()
+        
+        self._render_battery(lines, sample.get('battery') or {})
+        self._render_telemetry(lines, sample)
+        self._render_service(lines)
+        
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+    
+    @staticmethod
+    def _family(lines: List[str], name: str, metric_type: str, help_text: str,
+                samples: List[tuple]):
+        """Append one metric family (skipped when it has no samples)"""
+        if not samples:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_labels(**labels)} {_format_value(value)}")
+    
+    def _render_battery(self, lines: List[str], battery: Dict[str, Any]):
+        """Battery gauges"""
+        if not battery:
+            return
+        
+        gauges = (
+            ('legion_battery_capacity_percent', 'capacity', "Battery charge level"),
+            ('legion_battery_power_watts', 'power_now', "Battery charge/discharge power"),
+            ('legion_battery_voltage_volts', 'voltage', "Battery voltage"),
+            ('legion_battery_energy_watthours', 'energy_now', "Remaining battery energy"),
+            ('legion_battery_health_percent', 'health', "Full capacity vs design capacity"),
+            ('legion_battery_cycles', 'cycle_count', "Battery charge cycle count"),
+        )
+        for name, key, help_text in gauges:
+            if key in battery:
+                self._family(lines, name, 'gauge', help_text, [('', {}, battery[key])])
+        
+        self._family(lines, 'legion_battery_info', 'gauge', "Battery state and identity", [
+            ('', {
+                'state': battery.get('state', ''),
+                'manufacturer': battery.get('manufacturer', ''),
+                'model': battery.get('model_name', ''),
+            }, 1),
+        ])
+    
+    def _render_telemetry(self, lines: List[str], sample: Dict[str, Any]):
+        """Thermal, fan, AC and profile gauges"""
+        temps = sample.get('temperatures') or {}
+        self._family(lines, 'legion_temperature_celsius', 'gauge', "Sensor temperature", [
+            ('', {'sensor': sensor}, value) for sensor, value in sorted(temps.items())
+        ])
+        
+        fans = sample.get('fans') or {}
+        self._family(lines, 'legion_fan_speed_rpm', 'gauge', "Fan speed", [
+            ('', {'fan': fan}, rpm) for fan, rpm in sorted(fans.items())
+        ])
+        
+        if sample.get('ac_online') is not None:
+            self._family(lines, 'legion_ac_online', 'gauge', "AC adapter connected", [
+                ('', {}, int(bool(sample['ac_online']))),
+            ])
+        
+        profile = sample.get('power_profile')
+        if profile:
+            self._family(lines, 'legion_power_profile', 'gauge', "Active power profile (1 = active)", [
+                ('', {'profile': p}, int(p == profile)) for p in POWER_PROFILES
+            ])
+        
+        if sample.get('timestamp'):
+            self._family(lines, 'legion_sample_timestamp_seconds', 'gauge',
+                         "Unix time of the telemetry sample", [('', {}, sample['timestamp'])])
+    
+    def _render_service(self, lines: List[str]):
+        """Service latency histograms, errors and gauges"""
+        histograms = self._metrics.histograms()
+        
+        samples = []
+        for op in sorted(histograms):
+            samples.extend(self._histogram_samples(op, histograms[op]))
+        self._family(lines, 'legion_operation_duration_seconds', 'histogram',
+                     "Latency of D-Bus methods and hardware I/O", samples)
+        
+        self._family(lines, 'legion_operation_errors', 'counter',
+                     "Failed D-Bus methods and hardware I/O operations", [
+                         ('_total', {'op': op}, histograms[op].errors) for op in sorted(histograms)
+                     ])
+        
+        snapshot = self._metrics.snapshot()
+        self._family(lines, 'legion_service_gauge', 'gauge', "Service gauges", [
+            ('', {'name': name}, value) for name, value in sorted(snapshot['gauges'].items())
+        ])
+        self._family(lines, 'legion_service_events', 'counter', "Service event counters", [
+            ('_total', {'name': name}, value) for name, value in sorted(snapshot['counters'].items())
+        ])
+    
+    @staticmethod
+    def _histogram_samples(op: str, histogram: LatencyHistogram) -> List[tuple]:
+        """Cumulative bucket, count and sum samples of one histogram (seconds)"""
+        samples = []
+        cumulative = 0
+        for upper_ms, count in zip(histogram.BUCKETS_MS, histogram.counts):
+            cumulative += count
+            samples.append(('_bucket', {'op': op, 'le': repr(upper_ms / 1000)}, cumulative))
+        samples.append(('_bucket', {'op': op, 'le': '+Inf'}, histogram.count))
+        samples.append(('_count', {'op': op}, histogram.count))
+        samples.append(('_sum', {'op': op}, histogram.sum_ms / 1000))
+        return samples
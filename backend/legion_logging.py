@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Legion Logging
+Non-blocking queue-based logging with rotation and rate limiting
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Collapses repeated identical warnings
+    
+    The first occurrence of a message is logged; identical messages
+    within `interval` seconds are counted and dropped. The next
+    occurrence after the interval is logged with the number of
+    suppressed repeats appended. Records below `min_level` pass through.
+    """
+    
+    MAX_TRACKED = 256  # distinct messages remembered
+    
+    def __init__(self, interval: float = 60.0, min_level: int = logging.WARNING):
+        """
+        Initialize filter
+        
+        Args:
+            interval: Seconds during which repeats are suppressed
+            min_level: Lowest level that is rate limited
+        """
+        super().__init__()
+        self.interval = interval
+        self.min_level = min_level
+        self._lock = threading.Lock()
+        # (logger, level, message) -> [window start, suppressed count]
+        self._seen: "OrderedDict[tuple, list]" = OrderedDict()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return False
+            
+            suppressed = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.MAX_TRACKED:
+                self._seen.popitem(last=False)
+        
+        if suppressed:
+            record.msg = f"{record.getMessage()} (repeated {suppressed} more times)"
+            record.args = None
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(log_file: Optional[Path] = None, level: int = logging.INFO,
+                      max_bytes: int = 1024 * 1024, backup_count: int = 3,
+                      queue_size: int = 10000, rate_limit_interval: float = 60.0):
+    """
+    Route all logging through a queue drained by a background listener
+    
+    Callers only format and enqueue a record; file and console I/O happen
+    on the listener thread. The log file rotates by size, so it never
+    grows beyond max_bytes * (backup_count + 1).
+    
+    Args:
+        log_file: Log file path (None for console only)
+        level: Root log level
+        max_bytes: Rotate the log file at this size
+        backup_count: Rotated files to keep
+        queue_size: Records buffered before new ones are dropped
+        rate_limit_interval: Seconds to suppress repeated identical warnings
+    """
+    global _listener
+    
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    
+    if log_file is not None:
+        log_file = Path(log_file)
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    handlers.append(stream_handler)
+    
+    if _listener is None:
+        atexit.register(stop_logging)
+    stop_logging()
+    
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_limit_interval))
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Legion Service Metrics
+Lightweight in-process counters, gauges and latency histograms
+for Legion Power Service
+"""
+
+import functools
+import inspect
+import logging
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from legion_trace import TRACER
+except ImportError:
+    from .legion_trace import TRACER
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram
+    
+    Buckets follow a 1-2.5-5 series from 10 us to 30 s, which keeps
+    percentile estimates within one bucket width for both sysfs reads
+    (microseconds) and ddcutil calls (seconds). Not thread-safe on its
+    own - ServiceMetrics serializes access.
+    """
+    
+    # Upper bounds in milliseconds; the last (implicit) bucket is +Inf
+    BUCKETS_MS = (
+        0.01, 0.025, 0.05,
+        0.1, 0.25, 0.5,
+        1, 2.5, 5,
+        10, 25, 50,
+        100, 250, 500,
+        1000, 2500, 5000,
+        10000, 30000,
+    )
+    
+    def __init__(self):
+        """Initialize empty histogram"""
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+    
+    def observe(self, duration_ms: float, error: bool = False):
+        """Record one operation"""
+        self.counts[bisect_left(self.BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.sum_ms += duration_ms
+        if duration_ms < self.min_ms:
+            self.min_ms = duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        if error:
+            self.errors += 1
+    
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile by interpolating inside its bucket
+        
+        Args:
+            q: Percentile in range 0-100
+        
+        Returns:
+            Estimated latency in milliseconds (0 if empty)
+        """
+        if self.count == 0:
+            return 0.0
+        
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else self.max_ms
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min_ms), self.max_ms)
+            seen += bucket_count
+        return self.max_ms
+    
+    def summary(self) -> Dict[str, float]:
+        """Get count, errors, mean and p50/p95/p99/max in milliseconds"""
+        return {
+            'count': float(self.count),
+            'errors': float(self.errors),
+            'mean_ms': self.sum_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+        }
+    
+    def copy(self) -> 'LatencyHistogram':
+        """Get an independent copy"""
+        other = LatencyHistogram()
+        other.counts = list(self.counts)
+        other.count = self.count
+        other.errors = self.errors
+        other.sum_ms = self.sum_ms
+        other.min_ms = self.min_ms
+        other.max_ms = self.max_ms
+        return other
+
+
+class _OperationTimer:
+    """
+    Context manager timing one operation into a ServiceMetrics histogram
+    
+    Also records a trace span (category = operation prefix) while
+    tracing is enabled. Set `error` inside the block to count a failure
+    that is reported without raising (e.g. a non-zero exit status).
+    """
+    
+    __slots__ = ('_metrics', '_op', '_start', '_span', 'error')
+    
+    def __init__(self, metrics: 'ServiceMetrics', op: str):
+        self._metrics = metrics
+        self._op = op
+        self.error = False
+    
+    def __enter__(self):
+        if TRACER.enabled:
+            self._span = TRACER.span(self._op, self._op.split('.', 1)[0])
+            self._span.__enter__()
+        else:
+            self._span = None
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        if self._span is not None:
+            self._span.__exit__(exc_type, exc, tb)
+        self._metrics.observe(self._op, duration_ms,
+                              error=self.error or exc_type is not None)
+        return False
+
+
+class ServiceMetrics:
+    """
+    Thread-safe registry of service metrics
+    
+    Holds:
+    - Gauges (last observed value, e.g. resume-to-restored time)
+    - Counters (monotonically increasing event counts)
+    - Latency histograms per operation (D-Bus methods, hardware I/O)
+    """
+    
+    def __init__(self):
+        """Initialize empty metrics registry"""
+        self._lock = Lock()
+        self._gauges: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+    
+    def set_gauge(self, name: str, value: float):
+        """
+        Set gauge to a value
+        
+        Args:
+            name: Gauge name (e.g., "resume.last_restore_ms")
+            value: Current value
+        """
+        with self._lock:
+            self._gauges[name] = float(value)
+    
+    def inc(self, name: str, amount: int = 1):
+        """
+        Increment counter
+        
+        Args:
+            name: Counter name (e.g., "resume.count")
+            amount: Increment
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+    
+    def observe(self, op: str, duration_ms: float, error: bool = False):
+        """
+        Record duration of one operation
+        
+        Args:
+            op: Operation name (e.g., "dbus.SetFanMode", "acpi.DYTC")
+            duration_ms: Duration in milliseconds
+            error: Whether the operation failed
+        """
+        with self._lock:
+            histogram = self._histograms.get(op)
+            if histogram is None:
+                histogram = self._histograms[op] = LatencyHistogram()
+            histogram.observe(duration_ms, error)
+    
+    def timed(self, op: str) -> _OperationTimer:
+        """
+        Time a block of code
+        
+        Example:
+            with METRICS.timed('sysfs.vpc_read'):
+                value = f.read()
+        
+        An exception leaving the block is counted as an error.
+        """
+        return _OperationTimer(self, op)
+    
+    def get_gauge(self, name: str, default: float = 0.0) -> float:
+        """Get current gauge value"""
+        with self._lock:
+            return self._gauges.get(name, default)
+    
+    def get_counter(self, name: str) -> int:
+        """Get current counter value"""
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def histograms(self) -> Dict[str, LatencyHistogram]:
+        """Get copies of all latency histograms"""
+        with self._lock:
+            return {op: h.copy() for op, h in self._histograms.items()}
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Get a consistent copy of all metrics
+        
+        Returns:
+            Dictionary with 'gauges', 'counters' and 'operations'
+            (per-operation histogram summaries)
+        """
+        with self._lock:
+            return {
+                'gauges': dict(self._gauges),
+                'counters': dict(self._counters),
+                'operations': {
+                    op: h.summary() for op, h in self._histograms.items()
+                },
+            }
+    
+    def reset(self):
+        """Clear all metrics"""
+        with self._lock:
+            self._gauges.clear()
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class StartupTimer:
+    """
+    Records startup milestones relative to a start time
+    
+    Each milestone is stored as a gauge named "<prefix><name>_ms" so it is
+    visible through GetMetrics as well as in the logged report.
+    """
+    
+    def __init__(self, metrics: ServiceMetrics, start: Optional[float] = None,
+                 prefix: str = 'startup.'):
+        """
+        Initialize startup timer
+        
+        Args:
+            metrics: Registry to record milestones in
+            start: time.monotonic() value of process start (default: now)
+            prefix: Gauge name prefix
+        """
+        self._metrics = metrics
+        self._start = start if start is not None else time.monotonic()
+        self._prefix = prefix
+        self._marks: List[Tuple[str, float]] = []
+        self._lock = Lock()
+    
+    def mark(self, name: str) -> float:
+        """
+        Record a milestone
+        
+        Args:
+            name: Milestone name (e.g., "name_claimed")
+        
+        Returns:
+            Milliseconds since start
+        """
+        elapsed_ms = (time.monotonic() - self._start) * 1000
+        with self._lock:
+            self._marks.append((name, elapsed_ms))
+        self._metrics.set_gauge(f"{self._prefix}{name}_ms", elapsed_ms)
+        return elapsed_ms
+    
+    def record(self, name: str, duration_ms: float):
+        """Record a duration that is not relative to start (e.g. one component)"""
+        self._metrics.set_gauge(f"{self._prefix}{name}_ms", duration_ms)
+    
+    def report(self) -> str:
+        """Format milestones as a single log line"""
+        with self._lock:
+            marks = list(self._marks)
+        return ", ".join(f"{name} {ms:.1f} ms" for name, ms in marks)
+
+
+# Process-wide registry shared by the service and hardware modules
+METRICS = ServiceMetrics()
+
+
+def instrumented(prefix: str = 'dbus.') -> Callable:
+    """
+    Decorator timing every call of a D-Bus method into METRICS
+    
+    Place it below @dbus.service.method. The wrapper keeps the original
+    signature, which dbus-python inspects for argument names and
+    sender/async keywords. Placed above @dbus.service.signal (with
+    prefix 'signal.') it times signal emission instead.
+    
+    Args:
+        prefix: Operation name prefix, the method name is appended
+    """
+    def decorator(func):
+        op = prefix + func.__name__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.timed(op):
+                return func(*args, **kwargs)
+        
+        wrapper.__signature__ = inspect.signature(func)
+        return wrapper
+    return decorator
+
+
+def format_metrics(snapshot: Dict[str, Dict]) -> str:
+    """
+    Format a metrics snapshot as a human-readable table
+    
+    Args:
+        snapshot: Output of ServiceMetrics.snapshot() (or GetMetrics)
+    """
+    lines = []
+    
+    operations = snapshot.get('operations', {})
+    if operations:
+        lines.append(f"{'operation':<36} {'count':>8} {'errors':>7} "
+                     f"{'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+        for op in sorted(operations):
+            s = operations[op]
+            lines.append(
+                f"{op:<36} {int(s['count']):>8} {int(s['errors']):>7} "
+                f"{s['p50_ms']:>8.2f}ms {s['p95_ms']:>8.2f}ms "
+                f"{s['p99_ms']:>8.2f}ms {s['max_ms']:>8.2f}ms"
+            )
+    
+    gauges = snapshot.get('gauges', {})
+    if gauges:
+        lines.append("")
+        for name in sorted(gauges):
+            lines.append(f"{name:<36} {gauges[name]:>12.2f}")
+    
+    counters = snapshot.get('counters', {})
+    if counters:
+        lines.append("")
+        for name in sorted(counters):
+            lines.append(f"{name:<36} {counters[name]:>12}")
+    
+    return "\n".join(lines)
@@ -5,10 +5,16 @@ Battery, temperature, and fan monitoring for Lenovo Legion 5
 """
 
 import logging
+import os
 from typing import Dict, Optional
 from pathlib import Path
 import re
 
+try:
+    from legion_metrics import METRICS
+except ImportError:
+    from .legion_metrics import METRICS
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,15 +29,25 @@ class LegionMonitor:
     
     Uses:
     - /sys/class/power_supply/BAT0/ for battery
-    - /sys/class/hwmon/ for temperatures
-    - ACPI for fan speed (if available)
+    - /sys/class/hwmon/ for temperatures and fan speed
     """
     
     BATTERY_PATH = Path("/sys/class/power_supply/BAT0")
+    AC_PATH = Path("/sys/class/power_supply/ADP0")
     HWMON_BASE = Path("/sys/class/hwmon")
     
-    def __init__(self):
-        """Initialize monitor"""
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize monitor
+        
+        Args:
+            root: Filesystem root prefix (default: $LEGION_POWER_ROOT or /)
+        """
+        root = Path(root or os.environ.get("LEGION_POWER_ROOT", "/"))
+        if root != Path("/"):
+            self.BATTERY_PATH = root / self.BATTERY_PATH.relative_to("/")
+            self.AC_PATH = root / self.AC_PATH.relative_to("/")
+            self.HWMON_BASE = root / self.HWMON_BASE.relative_to("/")
         self._check_battery_available()
     
     def _check_battery_available(self):
@@ -42,10 +58,10 @@ class LegionMonitor:
     def _read_sysfs_value(self, path: Path) -> str:
         """Read value from sysfs file"""
         try:
-            with open(path, 'r') as f:
+            with METRICS.timed('sysfs.monitor_read'), open(path, 'r') as f:
                 return f.read().strip()
         except Exception as e:
-            logger.debug(f"Failed to read {path}: {e}")
+            logger.debug("Failed to read %s: %s", path, e)
             return ""
     
     def get_battery_status(self) -> Dict:
@@ -200,7 +216,7 @@ class LegionMonitor:
                         
                         temps[label] = temp_celsius
                 except Exception as e:
-                    logger.debug(f"Failed to read {temp_input}: {e}")
+                    logger.debug("Failed to read %s: %s", temp_input, e)
         
         # Try to identify CPU/GPU temps
         result = {}
@@ -215,6 +231,50 @@ class LegionMonitor:
         
         return result
     
+    def get_fan_speeds(self) -> Dict[str, int]:
+        """
+        Get fan speeds reported by hwmon devices
+        
+        Returns:
+            Dictionary with fan speeds in RPM, keyed by hwmon device name
+            and fan label (e.g., {"legion_hwmon_Fan 1": 2400})
+        """
+        fans = {}
+        
+        if not self.HWMON_BASE.exists():
+            return fans
+        
+        for hwmon_dir in self.HWMON_BASE.iterdir():
+            if not hwmon_dir.is_dir():
+                continue
+            
+            # Fan numbers restart per device (fan1 on amdgpu and the EC)
+            name_file = hwmon_dir / "name"
+            if name_file.exists():
+                device_name = self._read_sysfs_value(name_file)
+            else:
+                device_name = hwmon_dir.name
+            
+            for fan_input in hwmon_dir.glob("fan*_input"):
+                rpm = self._read_sysfs_value(fan_input)
+                if not rpm:
+                    continue
+                
+                fan_label_file = fan_input.parent / fan_input.name.replace(
+                    "_input", "_label"
+                )
+                if fan_label_file.exists():
+                    label = self._read_sysfs_value(fan_label_file)
+                else:
+                    label = fan_input.name.replace("_input", "")
+                
+                try:
+                    fans[f"{device_name}_{label}"] = int(rpm)
+                except ValueError:
+                    logger.debug("Invalid fan speed in %s: %s", fan_input, rpm)
+        
+        return fans
+    
     def get_ac_adapter_online(self) -> bool:
         """
         Check if AC adapter is connected
@@ -222,7 +282,7 @@ class LegionMonitor:
         Returns:
             True if AC is connected, False otherwise
         """
-        ac_path = Path("/sys/class/power_supply/ADP0/online")
+        ac_path = self.AC_PATH / "online"
         if not ac_path.exists():
             # Fallback: check battery state
             status = self.get_battery_status()
@@ -4,22 +4,44 @@ Legion Power D-Bus Service
 Main daemon providing D-Bus interface for Legion Power Manager
 """
 
+import time
+_PROCESS_START = time.monotonic()
+
 import dbus
+import dbus.lowlevel
 import dbus.service
 import dbus.mainloop.glib
 try:
     from gi.repository import GLib
 except ImportError:
     import gobject as GLib
+import argparse
 import logging
+import os
+import signal
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from legion_acpi import LegionACPI, ACPIError
 from legion_sysfs import LegionSysfs, SysfsError
 from legion_monitor import LegionMonitor, MonitorError
 from legion_config import LegionConfig, ConfigError
-from ddc_monitor import DDCController, DDCError
+from ddc_monitor import DDCController, DDCError, DDCMonitor, DisplayHealth
+from legion_metrics import METRICS, StartupTimer, format_metrics, instrumented
+from legion_snapshot import StateSnapshot
+from legion_sampler import TelemetrySampler
+from legion_subscriptions import Subscription, SubscriptionError, SubscriptionManager
+from legion_exporter import TextfileExporter
+from legion_shm import SHM_PATH, TelemetryShmWriter
+from legion_socket import OWNER_PREFIX, SOCKET_PATH, ControlSocketServer
+from legion_trace import TRACER
+from legion_uevent import UeventError, UeventListener
+from legion_logging import configure_logging
+
+STARTUP = StartupTimer(METRICS, start=_PROCESS_START)
 
 logger = logging.getLogger(__name__)
 
@@ -33,86 +55,767 @@ class LegionPowerService(dbus.service.Object):
     Interface: com.legion.Power.Manager
     """
     
-    def __init__(self, bus_name):
-        """Initialize the service"""
+    LOGIN1_BUS_NAME = 'org.freedesktop.login1'
+    LOGIN1_PATH = '/org/freedesktop/login1'
+    LOGIN1_INTERFACE = 'org.freedesktop.login1.Manager'
+    
+    # Resume handling
+    RESUME_BUDGET_MS = 250  # warn if resume-to-restored takes longer
+    RESUME_RECHECK_DELAY = 2  # seconds - catch late firmware resets
+    
+    # Idle exit
+    IDLE_CHECK_INTERVAL = 30  # seconds
+    
+    # External monitor brightness cache refresh (catches changes made
+    # with the monitor's own buttons)
+    BRIGHTNESS_REFRESH_INTERVAL = 300  # seconds
+    
+    # Monitor hotplug: wait for a burst of uevents (docking) to settle
+    HOTPLUG_SETTLE_MS = 500
+    
+    # Main-loop stall monitor
+    HEARTBEAT_INTERVAL_MS = 100
+    STALL_THRESHOLD_MS = 50  # heartbeat lateness counted as a stall
+    
+    def __init__(self, bus_name, idle_timeout: int = 0,
+                 snapshot: Optional[StateSnapshot] = None,
+                 config_dir: Optional[Path] = None):
+        """
+        Initialize the service
+        
+        Args:
+            bus_name: Claimed dbus.service.BusName (None to stay unexported)
+            idle_timeout: Exit after this many idle seconds (0 disables)
+            snapshot: Warm state snapshot store (default: StateSnapshot())
+            config_dir: Settings directory (default: ~/.config/legion-power)
+        """
         super().__init__(bus_name, '/com/legion/Power')
         
-        # Initialize components
+        self._bus = bus_name.get_bus() if bus_name is not None else None
+        self._sleep_snapshot: Dict[str, Any] = {}
+        self._sleep_inhibitor = None
+        
+        # Components are created on first use (or by the background
+        # warm-up), so the bus name answers calls before hardware is probed
+        self._components: Dict[str, Any] = {}
+        self._component_locks = {name: threading.Lock() for name in self.COMPONENTS}
+        self._answered_first_call = False
+        self._component_options: Dict[str, Dict[str, Any]] = {}
+        if config_dir is not None:
+            self._component_options['config'] = {'config_dir': config_dir}
+        
+        # Idle exit / warm restart
+        self._idle_timeout = idle_timeout
+        self._idle_exit_callback = None
+        self._last_activity = time.monotonic()
+        self._init_done = False
+        self._snapshot = snapshot if snapshot is not None else StateSnapshot()
+        
+        # Shared telemetry sampler, started on demand by its consumers
+        # (subscribers set per-source rates, the exporter a base interval)
+        self.sampler = TelemetrySampler(self._telemetry_sources(), interval=None)
+        self._exporter: Optional[TextfileExporter] = None
+        self._shm_writer: Optional[TelemetryShmWriter] = None
+        self._socket_server: Optional[ControlSocketServer] = None
+        self.subscriptions = SubscriptionManager(self.sampler, self._deliver_telemetry)
+        self._subscriber_watches: Dict[str, Any] = {}
+        self._brightness_refreshing = False
+        self._uevents: Optional[UeventListener] = None
+        self._hotplug_timer = 0
+        self._monitor_refresh_lock = threading.Lock()
+        
+        logger.info("Legion Power Service initialized")
+    
+    # ========================================
+    # Lazy Component Initialization
+    # ========================================
+    
+    # name -> (factory, expected error, description)
+    COMPONENTS = {
+        'acpi': (LegionACPI, ACPIError, "ACPI interface"),
+        'sysfs': (LegionSysfs, SysfsError, "Sysfs interface"),
+        'monitor': (LegionMonitor, MonitorError, "Monitor"),
+        'config': (LegionConfig, ConfigError, "Config manager"),
+        'ddc': (DDCController, DDCError, "DDC monitor controller"),
+    }
+    
+    def _get_component(self, name: str) -> Optional[Any]:
+        """
+        Get a component, creating it on first use
+        
+        Returns:
+            Component instance, or None if it is not available
+        """
         try:
-            self.acpi = LegionACPI()
-            logger.info("ACPI interface initialized")
-        except ACPIError as e:
-            logger.error(f"ACPI initialization failed: {e}")
-            self.acpi = None
+            return self._components[name]
+        except KeyError:
+            pass
+        
+        with self._component_locks[name]:
+            if name in self._components:
+                return self._components[name]
+            
+            factory, error_type, description = self.COMPONENTS[name]
+            start = time.monotonic()
+            try:
+                component = factory(**self._component_options.get(name, {}))
+                logger.info("%s initialized", description)
+            except error_type as e:
+                if name == 'ddc':
+                    logger.warning("DDC monitor control not available: %s", e)
+                else:
+                    logger.error("%s initialization failed: %s", description, e)
+                component = None
+            except Exception as e:
+                if name != 'ddc':
+                    raise
+                logger.warning("DDC initialization failed: %s", e)
+                component = None
+            
+            STARTUP.record(f"init_{name}", (time.monotonic() - start) * 1000)
+            self._components[name] = component
+            return component
+    
+    @property
+    def acpi(self) -> Optional[LegionACPI]:
+        """ACPI interface (None if unavailable)"""
+        return self._get_component('acpi')
+    
+    @property
+    def sysfs(self) -> Optional[LegionSysfs]:
+        """Sysfs interface (None if unavailable)"""
+        return self._get_component('sysfs')
+    
+    @property
+    def monitor(self) -> Optional[LegionMonitor]:
+        """Battery/temperature monitor (None if unavailable)"""
+        return self._get_component('monitor')
+    
+    @property
+    def config(self) -> Optional[LegionConfig]:
+        """Config manager (None if unavailable)"""
+        return self._get_component('config')
+    
+    @property
+    def ddc(self) -> Optional[DDCController]:
+        """DDC/CI monitor controller (None if unavailable)"""
+        return self._get_component('ddc')
+    
+    def start_background_init(self):
+        """
+        Probe all components in parallel, then restore settings
+        
+        Meant to run from the main loop once the bus name is claimed.
+        """
+        threading.Thread(
+            target=self._background_init,
+            name='legion-init',
+            daemon=True
+        ).start()
+        return False  # one-shot GLib idle callback
+    
+    def _background_init(self):
+        """Worker for start_background_init"""
+        self.initialize()
+        GLib.idle_add(self._finish_background_init)
+    
+    def initialize(self):
+        """
+        Bring all components up and restore settings (blocking)
+        
+        Rehydrates from a warm state snapshot when one is available for
+        this boot, skipping probes and the hardware restore.
+        """
+        warm = self._snapshot.load()
+        if warm:
+            self._snapshot.discard()
+            self._rehydrate(warm['state'])
+        
+        with ThreadPoolExecutor(max_workers=len(self.COMPONENTS)) as executor:
+            list(executor.map(self._get_component, self.COMPONENTS))
+        STARTUP.mark('components_ready')
+        
+        if warm and not warm['slept']:
+            logger.info("Warm start: hardware state unchanged since snapshot, skipping restore")
+        elif warm:
+            # Suspended while we were not running - nobody reapplied state
+            logger.info("Warm start after suspend, verifying hardware state")
+            self._sleep_snapshot = warm['state'].get('hardware', {})
+            self._reapply_after_resume(time.monotonic())
+        elif self.config:
+            # Restore settings on startup
+            if self.config.get('restore_on_boot', True):
+                self._restore_settings()
+        STARTUP.mark('warm_start' if warm else 'cold_start')
         
+        self._init_done = True
+    
+    def _rehydrate(self, state: Dict[str, Any]):
+        """Seed components from a warm state snapshot instead of probing"""
+        # Components known to be missing on this machine are not probed again
+        for name, available in state.get('components', {}).items():
+            if name in self.COMPONENTS and not available:
+                self._components[name] = None
+        
+        monitors = state.get('monitors')
+        if monitors is not None and self.ddc:
+            try:
+                self.ddc.seed_cache([DDCMonitor.from_dict(m) for m in monitors])
+            except Exception as e:
+                logger.debug("Could not seed monitor cache: %s", e)
+        
+        logger.info("Rehydrated from warm state snapshot")
+    
+    def _collect_snapshot(self) -> Dict[str, Any]:
+        """Collect compact service state for the warm state snapshot"""
+        state = {
+            'components': {
+                name: component is not None
+                for name, component in self._components.items()
+            },
+            'hardware': self._read_hardware_state(),
+        }
+        
+        ddc = self._components.get('ddc')
+        if ddc:
+            monitors = ddc.get_cached_monitors()
+            if monitors is not None:
+                state['monitors'] = [m.to_dict() for m in monitors]
+        
+        return state
+    
+    # ========================================
+    # Telemetry
+    # ========================================
+    
+    def _telemetry_sources(self) -> Dict[str, Any]:
+        """Telemetry sources read by the shared sampler"""
+        return {
+            'battery': lambda: self.monitor.get_battery_status() if self.monitor else None,
+            'temperatures': lambda: self.monitor.get_temperatures() if self.monitor else None,
+            'fans': lambda: self.monitor.get_fan_speeds() if self.monitor else None,
+            'ac_online': lambda: self.monitor.get_ac_adapter_online() if self.monitor else None,
+            'power_profile': lambda: self.config.get('power_profile', 'balanced') if self.config else None,
+        }
+    
+    def enable_textfile_exporter(self, path: Path, interval: float):
+        """
+        Write an OpenMetrics textfile from cached sampler state
+        
+        Args:
+            path: Output .prom file
+            interval: Seconds between writes (the sampler ticks at least as often)
+        """
+        current = self.sampler.interval
+        self.sampler.interval = interval if current is None else min(current, interval)
+        self.sampler.start()
+        self._exporter = TextfileExporter(self.sampler, path, interval)
+        self._exporter.start()
+    
+    def enable_shm_export(self, path: Path, interval: float):
+        """
+        Publish every sampler tick into a shared-memory segment
+        
+        Args:
+            path: Segment file under /dev/shm (see legion_shm)
+            interval: Seconds between samples (the sampler ticks at least as often)
+        """
+        current = self.sampler.interval
+        self.sampler.interval = interval if current is None else min(current, interval)
+        self._shm_writer = TelemetryShmWriter(path)
+        self.sampler.add_listener(self._shm_writer.write)
+        self.sampler.start()
+        logger.info("Publishing telemetry to %s every %ss", path, interval)
+    
+    def enable_control_socket(self, path: Path):
+        """
+        Serve D-Bus methods and telemetry subscriptions as NDJSON on a
+        Unix socket (see legion_socket)
+        
+        Args:
+            path: Socket path
+        """
+        self._socket_server = ControlSocketServer(path, self._execute_socket_batch,
+                                                  self.subscriptions,
+                                                  on_subscribe=self._on_socket_subscribe)
+        self._socket_server.start()
+    
+    def _on_socket_subscribe(self):
+        """Start the sampler for a socket subscription, like Subscribe does (socket thread)"""
+        GLib.idle_add(self._start_sampler)
+    
+    def _start_sampler(self):
+        self.sampler.start()
+        return False  # one-shot GLib idle callback
+    
+    def _execute_socket_batch(self, commands) -> Future:
+        """Run socket commands on the main loop (called from the socket thread)"""
+        future = Future()
+        GLib.idle_add(self._run_socket_batch, commands, future)
+        return future
+    
+    def _run_socket_batch(self, commands, future: Future):
+        """Main-loop part of _execute_socket_batch: one turn for the whole batch"""
+        self._last_activity = time.monotonic()
+        results = []
+        for method, params in commands:
+            with TRACER.span('dispatch', 'socket', member=method):
+                results.append(self._call_local(method, params))
+        future.set_result(results)
+        return False
+    
+    def _call_local(self, method: str, params: list):
+        """
+        Call a D-Bus method of this object directly
+        
+        Returns:
+            (True, JSON-compatible result) or (False, error message)
+        """
+        func = getattr(type(self), method, None)
+        if (not getattr(func, '_dbus_is_method', False)
+                or func._dbus_sender_keyword or func._dbus_async_callbacks):
+            return False, f"Unknown method: {method}"
         try:
-            self.sysfs = LegionSysfs()
-            logger.info("Sysfs interface initialized")
-        except SysfsError as e:
-            logger.error(f"Sysfs initialization failed: {e}")
-            self.sysfs = None
+            return True, _from_dbus(func(self, *params))
+        except dbus.exceptions.DBusException as e:
+            return False, e.get_dbus_message()
+        except TypeError as e:
+            return False, f"Invalid params for {method}: {e}"
+        except Exception as e:
+            logger.error("Socket call %s failed: %s", method, e)
+            return False, str(e)
+    
+    def _deliver_telemetry(self, subscription: Subscription, payload: Dict[str, Any]):
+        """Hand a subscription update to its transport (sampler thread)"""
+        if subscription.owner.startswith(OWNER_PREFIX):
+            if self._socket_server is not None:
+                self._socket_server.deliver(subscription, payload)
+            return
+        GLib.idle_add(self._send_telemetry, subscription.owner, subscription.handle, payload)
+    
+    def _send_telemetry(self, owner: str, handle: int, payload: Dict[str, Any]):
+        """Send TelemetryUpdate to one subscriber only (unicast signal)"""
+        if self._bus is None:
+            return False
         
+        with METRICS.timed('signal.TelemetryUpdate'):
+            message = dbus.lowlevel.SignalMessage(
+                '/com/legion/Power', 'com.legion.Power.Manager', 'TelemetryUpdate'
+            )
+            message.set_destination(owner)
+            message.append(dbus.UInt32(handle), _to_variant_dict(payload),
+                           signature='ua{sv}')
+            self._bus.send_message(message)
+        return False
+    
+    def _watch_subscriber(self, owner: str):
+        """Drop an owner's subscriptions once its bus name vanishes"""
+        if self._bus is None or owner in self._subscriber_watches:
+            return
+        
+        def on_owner_changed(new_owner):
+            if not new_owner:
+                self._on_subscriber_vanished(owner)
+        
+        self._subscriber_watches[owner] = self._bus.watch_name_owner(owner, on_owner_changed)
+    
+    def _unwatch_subscriber(self, owner: str):
+        """Stop watching a bus name that has no subscriptions left"""
+        watch = self._subscriber_watches.pop(owner, None)
+        if watch is not None:
+            watch.cancel()
+    
+    def _on_subscriber_vanished(self, owner: str):
+        """NameOwnerChanged: the subscriber disconnected"""
+        dropped = self.subscriptions.drop_owner(owner)
+        self._unwatch_subscriber(owner)
+        if dropped:
+            METRICS.inc('subscriptions.dropped', dropped)
+    
+    # ========================================
+    # Idle Exit
+    # ========================================
+    
+    def enable_idle_exit(self, callback):
+        """
+        Start idle tracking
+        
+        Args:
+            callback: Called on the main loop once the service decides to
+                exit (after the snapshot has been written)
+        """
+        if self._idle_timeout <= 0:
+            return
+        
+        self._idle_exit_callback = callback
+        interval = max(1, min(self.IDLE_CHECK_INTERVAL, self._idle_timeout // 2))
+        GLib.timeout_add_seconds(interval, self._check_idle)
+        logger.info("Idle exit enabled after %ss without calls", self._idle_timeout)
+    
+    def enable_stall_monitor(self):
+        """
+        Measure main-loop stalls with a heartbeat timer
+        
+        A GLib timeout fires every HEARTBEAT_INTERVAL_MS; how late it fires
+        is how long the loop was blocked (e.g. by a hardware call in a
+        D-Bus handler). Lateness goes to the 'mainloop.stall' histogram and
+        stalls over STALL_THRESHOLD_MS to the 'mainloop.stalls' counter.
+        Opt-in, since the heartbeat keeps waking the CPU.
+        """
+        self._heartbeat_due = time.monotonic() + self.HEARTBEAT_INTERVAL_MS / 1000
+        GLib.timeout_add(self.HEARTBEAT_INTERVAL_MS, self._heartbeat)
+        logger.info("Main-loop stall monitor enabled")
+    
+    def _heartbeat(self):
+        """Stall monitor tick (GLib timeout)"""
+        now = time.monotonic()
+        lateness_ms = max(0.0, (now - self._heartbeat_due) * 1000)
+        METRICS.observe('mainloop.stall', lateness_ms)
+        if lateness_ms > self.STALL_THRESHOLD_MS:
+            METRICS.inc('mainloop.stalls')
+        self._heartbeat_due = now + self.HEARTBEAT_INTERVAL_MS / 1000
+        return True
+    
+    def _check_idle(self):
+        """Periodic idle check (GLib timeout)"""
+        if not self._init_done:
+            return True
+        
+        # The textfile exporter, shm readers, socket clients and
+        # subscribers are consumers too
+        if (self._exporter is not None or self._shm_writer is not None
+                or (self._socket_server is not None and self._socket_server.client_count)
+                or self.subscriptions.has_subscriptions()):
+            return True
+        
+        idle = time.monotonic() - self._last_activity
+        if idle < self._idle_timeout:
+            return True
+        
+        logger.info("Idle for %.0fs, saving state snapshot and exiting", idle)
+        self._snapshot.save(self._collect_snapshot())
+        self._idle_exit_callback()
+        return False
+    
+    def _finish_background_init(self):
+        """Main-loop part of background init (D-Bus calls to logind)"""
+        self._watch_sleep()
+        if self._components.get('ddc'):
+            GLib.timeout_add_seconds(self.BRIGHTNESS_REFRESH_INTERVAL, self._refresh_brightness)
+            self._watch_hotplug()
+        logger.info("Startup timing: %s", STARTUP.report())
+        return False
+    
+    # ========================================
+    # Monitor Hotplug
+    # ========================================
+    
+    def _watch_hotplug(self):
+        """Follow drm/i2c uevents so the monitor cache no longer expires"""
         try:
-            self.monitor = LegionMonitor()
-            logger.info("Monitor initialized")
-        except MonitorError as e:
-            logger.error(f"Monitor initialization failed: {e}")
-            self.monitor = None
+            # $LEGION_UEVENT_SOCKET: simulated source (DDCBusSimulator.uevent_path)
+            self._uevents = UeventListener(('drm', 'i2c'),
+                                           path=os.environ.get('LEGION_UEVENT_SOCKET'))
+        except UeventError as e:
+            logger.warning("Monitor hotplug events not available, re-detecting periodically: %s", e)
+            return
+        
+        GLib.io_add_watch(self._uevents.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, self._on_uevents)
+        self.ddc.enable_hotplug()
+        logger.info("Watching monitor hotplug events")
+    
+    def _on_uevents(self, fd, condition):
+        """uevent socket readable (GLib io watch)"""
+        events = self._uevents.receive()
+        METRICS.inc('hotplug.uevents', len(events))
+        if [event for event in events if self.ddc.handle_uevent(event)]:
+            # Restart the settle timer with every relevant event
+            if self._hotplug_timer:
+                GLib.source_remove(self._hotplug_timer)
+            self._hotplug_timer = GLib.timeout_add(self.HOTPLUG_SETTLE_MS, self._on_hotplug_settled)
+        return True
+    
+    def _on_hotplug_settled(self):
+        """Refresh monitors once uevents stopped arriving (GLib timeout)"""
+        self._hotplug_timer = 0
+        threading.Thread(
+            target=self._refresh_monitors_worker,
+            name='legion-hotplug',
+            daemon=True
+        ).start()
+        return False
+    
+    def _refresh_monitors_worker(self):
+        """Re-enumerate monitors and announce changes"""
+        with self._monitor_refresh_lock, METRICS.timed('hotplug.refresh'):
+            try:
+                changed = self.ddc.refresh_monitors()
+            except Exception as e:
+                logger.error("Monitor refresh failed: %s", e)
+                return
+        if changed:
+            GLib.idle_add(self._emit_monitors_changed)
+    
+    def _emit_monitors_changed(self):
+        self.MonitorsChanged(_monitors_to_dbus(self.ddc.get_cached_monitors() or [],
+                                               self.ddc.get_health()))
+        return False
+    
+    def _message_cb(self, connection, message):
+        """Dispatch incoming D-Bus method call"""
+        self._last_activity = time.monotonic()
+        with TRACER.span('dispatch', 'dbus', member=message.get_member()):
+            super()._message_cb(connection, message)
+        if not self._answered_first_call:
+            self._answered_first_call = True
+            STARTUP.mark('first_call')
+    
+    # Restore groups: features within a group share hardware state and are
+    # written in order, separate groups are independent and run in parallel
+    RESTORE_GROUPS = (
+        ('conservation_mode',),
+        ('fan_mode', 'power_profile'),
+    )
+    
+    def _read_hardware_state(self) -> Dict[str, Any]:
+        """
+        Read current state of all restorable features once
+        
+        Features that cannot be read are left out, so they always
+        show up in the diff and get written.
+        """
+        state = {}
         
         try:
-            self.config = LegionConfig()
-            logger.info("Config manager initialized")
-        except ConfigError as e:
-            logger.error(f"Config initialization failed: {e}")
-            self.config = None
+            if self.sysfs:
+                state['conservation_mode'] = self.sysfs.get_conservation_mode()
+            elif self.acpi:
+                state['conservation_mode'] = self.acpi.get_conservation_mode()
+        except Exception as e:
+            logger.debug("Could not read conservation mode: %s", e)
         
-        # Initialize DDC/CI monitor controller
         try:
-            self.ddc = DDCController()
-            logger.info("DDC monitor controller initialized")
-        except DDCError as e:
-            logger.warning(f"DDC monitor control not available: {e}")
-            self.ddc = None
+            if self.sysfs:
+                state['fan_mode'] = self.sysfs.get_fan_mode()
         except Exception as e:
-            logger.warning(f"DDC initialization failed: {e}")
-            self.ddc = None
+            logger.debug("Could not read fan mode: %s", e)
         
-        # Restore settings on startup
-        if self.config:
-            if self.config.get('restore_on_boot', True):
-                self._restore_settings()
+        try:
+            if self.acpi:
+                state['power_profile'] = self.acpi.get_power_profile()
+        except Exception as e:
+            logger.debug("Could not read power profile: %s", e)
         
-        logger.info("Legion Power Service initialized")
+        return state
     
-    def _restore_settings(self):
-        """Restore settings from config"""
-        if not self.config:
-            return
-            
-        try:
-            # Restore conservation mode
-            conservation = self.config.get('conservation_mode_enabled', False)
+    def _desired_state(self) -> Dict[str, Any]:
+        """Get restorable feature values from config"""
+        return {
+            'conservation_mode': self.config.get('conservation_mode_enabled', False),
+            'fan_mode': self.config.get('fan_mode', 'auto'),
+            'power_profile': self.config.get('power_profile', 'balanced'),
+        }
+    
+    def _apply_feature(self, feature: str, value: Any):
+        """Write a single restorable feature to hardware"""
+        if feature == 'conservation_mode':
             if self.sysfs:
-                self.sysfs.set_conservation_mode(conservation)
-                logger.info(f"Restored conservation mode: {conservation}")
-            
-            # Restore fan mode
-            fan_mode = self.config.get('fan_mode', 'auto')
+                self.sysfs.set_conservation_mode(value)
+            elif self.acpi:
+                self.acpi.set_conservation_mode(value)
+        elif feature == 'fan_mode':
             if self.sysfs:
-                self.sysfs.set_fan_mode(fan_mode)
-                logger.info(f"Restored fan mode: {fan_mode}")
-            
-            # Restore power profile
-            power_profile = self.config.get('power_profile', 'balanced')
+                self.sysfs.set_fan_mode(value)
+        elif feature == 'power_profile':
             if self.acpi:
+                self.acpi.set_power_profile(value)
+    
+    @staticmethod
+    def _diff_state(desired: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the features whose desired value differs from hardware"""
+        return {k: v for k, v in desired.items() if current.get(k) != v}
+    
+    def _apply_state(self, changes: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write changed features, running independent groups in parallel
+        
+        Args:
+            changes: Feature values to write (see _diff_state)
+            current: Feature values read from hardware, used for logging
+        
+        Returns:
+            Dictionary of features that were written successfully
+        """
+        if not changes:
+            return {}
+        
+        def apply_group(group):
+            applied = {}
+            for feature in group:
+                if feature not in changes:
+                    continue
                 try:
-                    self.acpi.set_power_profile(power_profile)
-                    logger.info(f"Restored power profile: {power_profile}")
-                except:
-                    logger.warning("Failed to restore power profile via ACPI")
-            
+                    self._apply_feature(feature, changes[feature])
+                    applied[feature] = changes[feature]
+                    logger.info("Restored %s: %s (was %s)",
+                                feature, changes[feature], current.get(feature, 'unknown'))
+                except Exception as e:
+                    logger.warning("Failed to restore %s: %s", feature, e)
+            return applied
+        
+        groups = [g for g in self.RESTORE_GROUPS if any(f in changes for f in g)]
+        applied = {}
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            for result in executor.map(apply_group, groups):
+                applied.update(result)
+        return applied
+    
+    def _restore_settings(self) -> Dict[str, Any]:
+        """
+        Restore settings from config, writing only what differs
+        
+        Returns:
+            Dictionary of features that were written
+        """
+        if not self.config:
+            return {}
+        
+        start = time.monotonic()
+        try:
+            desired = self._desired_state()
+            current = self._read_hardware_state()
+            changes = self._diff_state(desired, current)
+            applied = self._apply_state(changes, current)
         except Exception as e:
-            logger.error(f"Failed to restore settings: {e}")
+            logger.error("Failed to restore settings: %s", e)
+            return {}
+        
+        elapsed_ms = (time.monotonic() - start) * 1000
+        METRICS.set_gauge('restore.last_ms', elapsed_ms)
+        logger.info("Settings restored in %.1f ms (%s written, %s failed, %s already in sync)",
+                    elapsed_ms, len(applied), len(changes) - len(applied),
+                    len(desired) - len(changes))
+        return applied
+    
+    # ========================================
+    # Suspend/Resume Handling
+    # ========================================
+    
+    def _watch_sleep(self):
+        """Subscribe to logind PrepareForSleep to reapply state on resume"""
+        if self._bus is None:
+            return
+        
+        try:
+            self._bus.add_signal_receiver(
+                self._on_prepare_for_sleep,
+                signal_name='PrepareForSleep',
+                dbus_interface=self.LOGIN1_INTERFACE,
+                bus_name=self.LOGIN1_BUS_NAME,
+                path=self.LOGIN1_PATH
+            )
+            self._take_sleep_inhibitor()
+            logger.info("Watching logind for suspend/resume")
+        except Exception as e:
+            logger.warning("Could not subscribe to logind sleep signals: %s", e)
+    
+    def _take_sleep_inhibitor(self):
+        """Take a logind delay lock so the pre-sleep snapshot can finish"""
+        if self._sleep_inhibitor is not None:
+            return
+        
+        try:
+            login1 = dbus.Interface(
+                self._bus.get_object(self.LOGIN1_BUS_NAME, self.LOGIN1_PATH),
+                self.LOGIN1_INTERFACE
+            )
+            fd = login1.Inhibit('sleep', 'Legion Power',
+                                'Snapshot power settings before sleep', 'delay')
+            self._sleep_inhibitor = fd.take()
+        except Exception as e:
+            logger.debug("Could not take sleep inhibitor: %s", e)
+    
+    def _release_sleep_inhibitor(self):
+        """Release the logind delay lock, letting the system suspend"""
+        if self._sleep_inhibitor is None:
+            return
+        
+        try:
+            os.close(self._sleep_inhibitor)
+        except OSError:
+            pass
+        self._sleep_inhibitor = None
+    
+    def _on_prepare_for_sleep(self, start):
+        """Handle logind PrepareForSleep (True before sleep, False on resume)"""
+        if start:
+            self._sleep_snapshot = self._read_hardware_state()
+            logger.info("Preparing for sleep, state snapshot: %s", self._sleep_snapshot)
+            self._release_sleep_inhibitor()
+        else:
+            resumed_at = time.monotonic()
+            logger.info("Resumed from sleep, verifying hardware state")
+            threading.Thread(
+                target=self._resume_worker,
+                args=(resumed_at,),
+                name='legion-resume',
+                daemon=True
+            ).start()
+            self._take_sleep_inhibitor()
+    
+    def _resume_worker(self, resumed_at: float):
+        """Reapply state after resume, then recheck once firmware has settled"""
+        self._reapply_after_resume(resumed_at)
+        delay = resumed_at + self.RESUME_RECHECK_DELAY - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._recheck_after_resume()
+    
+    def _resume_target_state(self) -> Dict[str, Any]:
+        """Get state to restore after resume (pre-sleep snapshot over config)"""
+        target = self._desired_state() if self.config else {}
+        target.update(self._sleep_snapshot)
+        return target
+    
+    def _reapply_after_resume(self, resumed_at: float):
+        """Diff hardware against the pre-sleep state and reapply what drifted"""
+        try:
+            target = self._resume_target_state()
+            current = self._read_hardware_state()
+            changes = self._diff_state(target, current)
+            applied = self._apply_state(changes, current)
+        except Exception as e:
+            logger.error("Failed to reapply state after resume: %s", e)
+            METRICS.inc('resume.errors')
+            return
+        
+        elapsed_ms = (time.monotonic() - resumed_at) * 1000
+        METRICS.set_gauge('resume.last_restore_ms', elapsed_ms)
+        METRICS.inc('resume.count')
+        METRICS.inc('resume.features_reapplied', len(applied))
+        
+        if changes:
+            logger.info("Firmware reset %s across suspend, reapplied %s in %.1f ms",
+                        sorted(changes), len(applied), elapsed_ms)
+        else:
+            logger.info("Hardware state intact after resume (checked in %.1f ms)", elapsed_ms)
+        
+        if elapsed_ms > self.RESUME_BUDGET_MS:
+            logger.warning("Resume restore took %.1f ms (budget %s ms)",
+                           elapsed_ms, self.RESUME_BUDGET_MS)
+    
+    def _recheck_after_resume(self):
+        """Second diff-only pass for firmware that resets state late"""
+        try:
+            target = self._resume_target_state()
+            current = self._read_hardware_state()
+            changes = self._diff_state(target, current)
+            if changes:
+                logger.info("Late firmware reset of %s after resume, reapplying", sorted(changes))
+                self._apply_state(changes, current)
+                METRICS.inc('resume.late_resets')
+        except Exception as e:
+            logger.error("Resume recheck failed: %s", e)
     
     # ========================================
     # Battery Management Methods
@@ -120,6 +823,7 @@ class LegionPowerService(dbus.service.Object):
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='b')
+    @instrumented()
     def GetConservationMode(self):
         """Get conservation mode status"""
         try:
@@ -129,11 +833,12 @@ class LegionPowerService(dbus.service.Object):
                 return self.acpi.get_conservation_mode()
             return False
         except Exception as e:
-            logger.error(f"GetConservationMode failed: {e}")
+            logger.error("GetConservationMode failed: %s", e)
             return False
     
     @dbus.service.method('com.legion.Power.Manager',
                          in_signature='b')
+    @instrumented()
     def SetConservationMode(self, enable):
         """Set conservation mode"""
         try:
@@ -154,14 +859,15 @@ class LegionPowerService(dbus.service.Object):
             
             # Emit signal
             self.ConservationModeChanged(enable)
-            logger.info(f"Conservation mode set to: {enable}")
+            logger.info("Conservation mode set to: %s", enable)
             
         except Exception as e:
-            logger.error(f"SetConservationMode failed: {e}")
+            logger.error("SetConservationMode failed: %s", e)
             raise dbus.exceptions.DBusException(f"Failed to set conservation mode: {e}")
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='b')
+    @instrumented()
     def GetRapidCharge(self):
         """Get rapid charge status"""
         try:
@@ -169,11 +875,12 @@ class LegionPowerService(dbus.service.Object):
                 return self.acpi.get_rapid_charge()
             return False
         except Exception as e:
-            logger.error(f"GetRapidCharge failed: {e}")
+            logger.error("GetRapidCharge failed: %s", e)
             return False
     
     @dbus.service.method('com.legion.Power.Manager',
                          in_signature='b')
+    @instrumented()
     def SetRapidCharge(self, enable):
         """Set rapid charge"""
         try:
@@ -191,10 +898,10 @@ class LegionPowerService(dbus.service.Object):
             
             # Emit signal
             self.RapidChargeChanged(enable)
-            logger.info(f"Rapid charge set to: {enable}")
+            logger.info("Rapid charge set to: %s", enable)
             
         except Exception as e:
-            logger.error(f"SetRapidCharge failed: {e}")
+            logger.error("SetRapidCharge failed: %s", e)
             raise dbus.exceptions.DBusException(f"Failed to set rapid charge: {e}")
     
     # ========================================
@@ -203,6 +910,7 @@ class LegionPowerService(dbus.service.Object):
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='s')
+    @instrumented()
     def GetFanMode(self):
         """Get fan mode"""
         try:
@@ -210,11 +918,12 @@ class LegionPowerService(dbus.service.Object):
                 return self.sysfs.get_fan_mode()
             return 'auto'
         except Exception as e:
-            logger.error(f"GetFanMode failed: {e}")
+            logger.error("GetFanMode failed: %s", e)
             return 'auto'
     
     @dbus.service.method('com.legion.Power.Manager',
                          in_signature='s')
+    @instrumented()
     def SetFanMode(self, mode):
         """Set fan mode (and power profile as they are linked)"""
         try:
@@ -232,14 +941,14 @@ class LegionPowerService(dbus.service.Object):
                 try:
                     self.sysfs.set_fan_mode(mode)
                 except Exception as e:
-                    logger.warning(f"Sysfs fan control failed (ignoring): {e}")
+                    logger.warning("Sysfs fan control failed (ignoring): %s", e)
             
             # 2. Set Power Profile via ACPI (Main method for Legion 5)
             # This corresponds to Fn+Q behavior
             if self.acpi:
                 profile = profile_map.get(mode, 'balanced')
                 self.acpi.set_power_profile(profile)
-                logger.info(f"Syncing fan mode '{mode}' to power profile '{profile}'")
+                logger.info("Syncing fan mode '%s' to power profile '%s'", mode, profile)
             
             # Save to config
             if self.config:
@@ -250,18 +959,24 @@ class LegionPowerService(dbus.service.Object):
             self.FanModeChanged(mode)
             self.PowerProfileChanged(profile_map.get(mode, 'balanced'))
             
-            logger.info(f"Fan mode set to: {mode}")
+            logger.info("Fan mode set to: %s", mode)
             
         except Exception as e:
-            logger.error(f"SetFanMode failed: {e}")
+            logger.error("SetFanMode failed: %s", e)
             raise dbus.exceptions.DBusException(f"Failed to set fan mode: {e}")
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='i')
+    @instrumented()
     def GetFanSpeed(self):
-        """Get fan speed in RPM (not implemented yet)"""
-        # TODO: Implement fan speed reading via EC
-        return 0
+        """Get fan speed in RPM (fastest fan reported by hwmon)"""
+        try:
+            if self.monitor:
+                return max(self.monitor.get_fan_speeds().values(), default=0)
+            return 0
+        except Exception as e:
+            logger.error("GetFanSpeed failed: %s", e)
+            return 0
     
     # ========================================
     # Power Profile Methods
@@ -269,6 +984,7 @@ class LegionPowerService(dbus.service.Object):
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='s')
+    @instrumented()
     def GetPowerProfile(self):
         """Get current power profile"""
         if self.config:
@@ -277,6 +993,7 @@ class LegionPowerService(dbus.service.Object):
     
     @dbus.service.method('com.legion.Power.Manager',
                          in_signature='s')
+    @instrumented()
     def SetPowerProfile(self, profile):
         """Set power profile"""
         try:
@@ -289,10 +1006,10 @@ class LegionPowerService(dbus.service.Object):
             
             # Emit signal
             self.PowerProfileChanged(profile)
-            logger.info(f"Power profile set to: {profile}")
+            logger.info("Power profile set to: %s", profile)
             
         except Exception as e:
-            logger.error(f"SetPowerProfile failed: {e}")
+            logger.error("SetPowerProfile failed: %s", e)
             raise dbus.exceptions.DBusException(f"Failed to set power profile: {e}")
     
     # ========================================
@@ -301,6 +1018,7 @@ class LegionPowerService(dbus.service.Object):
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='a{sv}')
+    @instrumented()
     def GetBatteryStatus(self):
         """Get battery status"""
         try:
@@ -320,11 +1038,12 @@ class LegionPowerService(dbus.service.Object):
                 }, signature='sv')
             return dbus.Dictionary({}, signature='sv')
         except Exception as e:
-            logger.error(f"GetBatteryStatus failed: {e}")
+            logger.error("GetBatteryStatus failed: %s", e)
             return dbus.Dictionary({}, signature='sv')
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='a{sd}')
+    @instrumented()
     def GetTemperatures(self):
         """Get system temperatures"""
         try:
@@ -336,11 +1055,12 @@ class LegionPowerService(dbus.service.Object):
                 )
             return dbus.Dictionary({}, signature='sd')
         except Exception as e:
-            logger.error(f"GetTemperatures failed: {e}")
+            logger.error("GetTemperatures failed: %s", e)
             return dbus.Dictionary({}, signature='sd')
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='b')
+    @instrumented()
     def GetACAdapterOnline(self):
         """Check if AC adapter is connected"""
         try:
@@ -348,7 +1068,7 @@ class LegionPowerService(dbus.service.Object):
                 return self.monitor.get_ac_adapter_online()
             return False
         except Exception as e:
-            logger.error(f"GetACAdapterOnline failed: {e}")
+            logger.error("GetACAdapterOnline failed: %s", e)
             return False
     
     # ========================================
@@ -357,6 +1077,7 @@ class LegionPowerService(dbus.service.Object):
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='a{sv}')
+    @instrumented()
     def GetSettings(self):
         """Get all settings"""
         try:
@@ -369,19 +1090,20 @@ class LegionPowerService(dbus.service.Object):
                 )
             return dbus.Dictionary({}, signature='sv')
         except Exception as e:
-            logger.error(f"GetSettings failed: {e}")
+            logger.error("GetSettings failed: %s", e)
             return dbus.Dictionary({}, signature='sv')
     
     @dbus.service.method('com.legion.Power.Manager',
                          in_signature='sv')
+    @instrumented()
     def SetSetting(self, key, value):
         """Set a setting"""
         try:
             if self.config:
                 self.config.set(key, value)
-            logger.info(f"Setting updated: {key} = {value}")
+            logger.info("Setting updated: %s = %s", key, value)
         except Exception as e:
-            logger.error(f"SetSetting failed: {e}")
+            logger.error("SetSetting failed: %s", e)
             raise dbus.exceptions.DBusException(f"Failed to set setting: {e}")
     
     # ========================================
@@ -390,6 +1112,7 @@ class LegionPowerService(dbus.service.Object):
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='aa{sv}')
+    @instrumented()
     def GetExternalMonitors(self):
         """Get list of external DDC/CI monitors"""
         try:
@@ -399,72 +1122,239 @@ class LegionPowerService(dbus.service.Object):
             
             monitors = self.ddc.detect_monitors(use_cache=True)
             
-            # Convert to D-Bus format
-            result = []
-            for mon in monitors:
-                monitor_dict = dbus.Dictionary({
-                    'id': dbus.Int32(mon.id),
-                    'bus': dbus.String(mon.bus),
-                    'manufacturer': dbus.String(mon.manufacturer),
-                    'model': dbus.String(mon.model),
-                    'serial': dbus.String(mon.serial),
-                    'name': dbus.String(mon.name),
-                    'vcp_version': dbus.String(mon.vcp_version),
-                    'supports_brightness': dbus.Boolean(mon.supports_brightness)
-                }, signature='sv')
-                result.append(monitor_dict)
-            
-            logger.debug(f"Returning {len(result)} external monitor(s)")
-            return dbus.Array(result, signature='a{sv}')
+            logger.debug("Returning %s external monitor(s)", len(monitors))
+            return _monitors_to_dbus(monitors, self.ddc.get_health())
         
         except Exception as e:
-            logger.error(f"GetExternalMonitors failed: {e}")
+            logger.error("GetExternalMonitors failed: %s", e)
             return dbus.Array([], signature='a{sv}')
     
     @dbus.service.method('com.legion.Power.Manager',
                          in_signature='i', out_signature='i')
+    @instrumented()
     def GetMonitorBrightness(self, display_id):
-        """Get external monitor brightness (0-100)"""
+        """
+        Get external monitor brightness (0-100)
+        
+        Answered from the brightness cache once the display has been read
+        or written; only the first call per display touches DDC.
+        """
+        return self._get_monitor_brightness(display_id, False)
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         in_signature='ib', out_signature='i')
+    @instrumented()
+    def GetMonitorBrightnessEx(self, display_id, force):
+        """
+        Get external monitor brightness (0-100)
+        
+        Args:
+            display_id: Display number
+            force: Read the monitor instead of the cache (blocks on DDC)
+        """
+        return self._get_monitor_brightness(display_id, bool(force))
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         in_signature='i', out_signature='a{sv}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    @instrumented()
+    def GetMonitorFeatures(self, display_id, reply_handler=None, error_handler=None):
+        """
+        Read a monitor's picture/audio/power settings in one call
+        
+        Reads brightness, contrast, input_source, volume and power_mode
+        in one DDC session on a worker thread (the reply comes when the
+        monitor answered, the main loop keeps running meanwhile).
+        
+        Returns:
+            {name: current, name + '_max': maximum} for each feature the
+            monitor answered (maximum is 0 for input_source/power_mode
+            when read through the ddcutil CLI)
+        """
+        if not self.ddc:
+            logger.warning("DDC controller not available")
+            raise dbus.exceptions.DBusException("DDC controller not available")
+        
+        threading.Thread(
+            target=self._get_features_worker,
+            args=(int(display_id), reply_handler, error_handler),
+            name='legion-monitor-features',
+            daemon=True
+        ).start()
+    
+    def _get_features_worker(self, display_id: int, reply_handler: Callable,
+                             error_handler: Callable):
+        """Read a monitor's features and reply from the main loop"""
+        try:
+            values = self.ddc.get_vcp_values(display_id)
+        except Exception as e:
+            logger.error("GetMonitorFeatures failed: %s", e)
+            GLib.idle_add(self._reply_error, error_handler,
+                          f"Failed to read monitor features: {e}")
+            return
+        GLib.idle_add(self._finish_get_features, values, reply_handler)
+    
+    def _finish_get_features(self, values: Dict[int, Tuple[int, int]], reply_handler: Callable):
+        """Send the feature reply (main loop)"""
+        features = {}
+        for name, code in DDCController.FEATURE_CODES.items():
+            if code in values:
+                current, maximum = values[code]
+                features[name] = dbus.Int32(current)
+                features[name + '_max'] = dbus.Int32(maximum)
+        reply_handler(dbus.Dictionary(features, signature='sv'))
+        return False
+    
+    def _get_monitor_brightness(self, display_id: int, force: bool):
         try:
             if not self.ddc:
                 logger.debug("DDC controller not available")
                 return dbus.Int32(0)
             
-            brightness = self.ddc.get_brightness(display_id)
-            logger.debug(f"Display {display_id} brightness: {brightness}")
+            brightness = self.ddc.get_brightness(int(display_id), force=force)
+            logger.debug("Display %s brightness: %s", display_id, brightness)
             return dbus.Int32(brightness)
         
         except Exception as e:
-            logger.error(f"GetMonitorBrightness failed for display {display_id}: {e}")
+            logger.error("GetMonitorBrightness failed for display %s: %s", display_id, e)
             return dbus.Int32(0)
     
+    def _refresh_brightness(self):
+        """Periodic brightness cache refresh (GLib timeout)"""
+        if not self._brightness_refreshing:
+            self._brightness_refreshing = True
+            threading.Thread(
+                target=self._refresh_brightness_worker,
+                name='legion-brightness-refresh',
+                daemon=True
+            ).start()
+        return True
+    
+    def _refresh_brightness_worker(self):
+        """Re-read cached monitor brightness and announce outside changes"""
+        try:
+            for display_id, brightness in self.ddc.refresh_brightness().items():
+                GLib.idle_add(self._emit_brightness_changed, display_id, brightness)
+        except Exception as e:
+            logger.error("Brightness refresh failed: %s", e)
+        finally:
+            self._brightness_refreshing = False
+    
     @dbus.service.method('com.legion.Power.Manager',
                          in_signature='ii')
+    @instrumented()
     def SetMonitorBrightness(self, display_id, brightness):
-        """Set external monitor brightness (0-100)"""
+        """
+        Set external monitor brightness (0-100)
+        
+        Returns once the value is queued. Writes to one display are
+        latest-wins: values superseded before they were written are
+        skipped. MonitorBrightnessChanged is emitted for each value that
+        actually landed, MonitorBrightnessFailed for each that could not
+        be written.
+        
+        Raises:
+            DBusException: For a display that is not among the detected
+                           monitors (while the monitor list is being
+                           refreshed, the write worker checks instead and
+                           reports an unknown display as failed)
+        """
+        if not self.ddc:
+            logger.warning("DDC controller not available")
+            raise dbus.exceptions.DBusException("DDC controller not available")
+        
+        display_id = int(display_id)
+        monitors = self.ddc.get_cached_monitors()
+        if monitors is not None and not any(m.id == display_id for m in monitors):
+            raise dbus.exceptions.DBusException(f"Unknown display {display_id}")
+        
+        self.ddc.request_brightness(display_id, int(brightness), self._on_brightness_applied)
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         in_signature='ibai', out_signature='aa{sv}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    @instrumented()
+    def SetAllMonitorsBrightness(self, brightness, relative, display_ids,
+                                 reply_handler=None, error_handler=None):
+        """
+        Set the brightness of several external monitors concurrently
+        
+        Args:
+            brightness: Target (0-100), or a delta added to each monitor's
+                        current brightness if relative
+            relative: Treat brightness as a delta
+            display_ids: Displays to change (empty: all monitors)
+        
+        Returns:
+            One {'id', 'brightness', 'success'} dict per display; the
+            reply comes when the slowest monitor is done (the writes run
+            on a worker thread, not the main loop)
+        """
+        if not self.ddc:
+            logger.warning("DDC controller not available")
+            raise dbus.exceptions.DBusException("DDC controller not available")
+        
+        threading.Thread(
+            target=self._set_all_brightness_worker,
+            args=(int(brightness), bool(relative), [int(i) for i in display_ids] or None,
+                  reply_handler, error_handler),
+            name='legion-brightness-all',
+            daemon=True
+        ).start()
+    
+    def _set_all_brightness_worker(self, brightness: int, relative: bool,
+                                   display_ids: Optional[List[int]],
+                                   reply_handler: Callable, error_handler: Callable):
+        """Run a group brightness write and reply from the main loop"""
         try:
-            if not self.ddc:
-                logger.warning("DDC controller not available")
-                raise dbus.exceptions.DBusException("DDC controller not available")
-            
-            success = self.ddc.set_brightness(display_id, brightness)
-            
+            results = self.ddc.set_brightness_all(brightness, relative=relative,
+                                                  display_ids=display_ids)
+        except Exception as e:
+            logger.error("SetAllMonitorsBrightness failed: %s", e)
+            GLib.idle_add(self._reply_error, error_handler,
+                          f"Failed to set monitor brightness: {e}")
+            return
+        GLib.idle_add(self._finish_set_all_brightness, results, reply_handler)
+    
+    def _reply_error(self, error_handler: Callable, message: str):
+        error_handler(dbus.exceptions.DBusException(message))
+        return False
+    
+    def _finish_set_all_brightness(self, results: Dict[int, Tuple[bool, int]],
+                                   reply_handler: Callable):
+        """Announce group write results and send the reply (main loop)"""
+        response = []
+        for display_id, (success, value) in sorted(results.items()):
             if success:
-                # Emit signal
-                self.MonitorBrightnessChanged(display_id, brightness)
-                logger.info(f"Display {display_id} brightness set to {brightness}")
+                self.MonitorBrightnessChanged(display_id, value)
             else:
-                raise dbus.exceptions.DBusException(
-                    f"Failed to set brightness for display {display_id}"
-                )
-        
-        except dbus.exceptions.DBusException:
-            raise
-        except Exception as e:
-            logger.error(f"SetMonitorBrightness failed: {e}")
-            raise dbus.exceptions.DBusException(f"Failed to set monitor brightness: {e}")
+                logger.warning("Failed to set brightness for display %s", display_id)
+            response.append(dbus.Dictionary({
+                'id': dbus.Int32(display_id),
+                'brightness': dbus.Int32(value),
+                'success': dbus.Boolean(success)
+            }, signature='sv'))
+        reply_handler(dbus.Array(response, signature='a{sv}'))
+        return False
+    
+    def _on_brightness_applied(self, display_id: int, brightness: int, success: bool):
+        """Brightness write finished (DDC worker thread)"""
+        if success:
+            GLib.idle_add(self._emit_brightness_changed, display_id, brightness)
+        else:
+            logger.warning("Failed to set brightness %s for display %s", brightness, display_id)
+            GLib.idle_add(self._emit_brightness_failed, display_id, brightness)
+    
+    def _emit_brightness_changed(self, display_id: int, brightness: int):
+        self.MonitorBrightnessChanged(display_id, brightness)
+        return False
+    
+    def _emit_brightness_failed(self, display_id: int, brightness: int):
+        self.MonitorBrightnessFailed(display_id, brightness)
+        return False
     
     @dbus.service.method('com.legion.Power.Manager')
+    @instrumented()
     def RefreshExternalMonitors(self):
         """Force refresh of external monitor list (invalidate cache)"""
         try:
@@ -472,73 +1362,349 @@ class LegionPowerService(dbus.service.Object):
                 self.ddc.invalidate_cache()
                 logger.info("External monitor cache invalidated")
         except Exception as e:
-            logger.error(f"RefreshExternalMonitors failed: {e}")
+            logger.error("RefreshExternalMonitors failed: %s", e)
     
     @dbus.service.method('com.legion.Power.Manager',
                          out_signature='b')
+    @instrumented()
     def IsDDCAvailable(self):
         """Check if DDC/CI support is available"""
         return self.ddc is not None
     
+    # ========================================
+    # Service Metrics Methods
+    # ========================================
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         out_signature='a{sv}')
+    @instrumented()
+    def GetMetrics(self):
+        """
+        Get service metrics
+        
+        Returns:
+            Dictionary with 'gauges' (a{sd}), 'counters' (a{sx}) and
+            'operations' (a{sa{sd}}: count, errors, mean/p50/p95/p99/max
+            latency in ms per D-Bus method and hardware I/O primitive)
+        """
+        try:
+            snapshot = METRICS.snapshot()
+            return dbus.Dictionary({
+                'gauges': dbus.Dictionary(snapshot['gauges'], signature='sd'),
+                'counters': dbus.Dictionary(
+                    {k: dbus.Int64(v) for k, v in snapshot['counters'].items()},
+                    signature='sx'
+                ),
+                'operations': dbus.Dictionary(
+                    {op: dbus.Dictionary(summary, signature='sd')
+                     for op, summary in snapshot['operations'].items()},
+                    signature='sa{sd}'
+                ),
+            }, signature='sv')
+        except Exception as e:
+            logger.error("GetMetrics failed: %s", e)
+            return dbus.Dictionary({}, signature='sv')
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         in_signature='b')
+    @instrumented()
+    def SetTracing(self, enable):
+        """Enable or disable span tracing (see DumpTrace)"""
+        TRACER.enable(bool(enable))
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         out_signature='s')
+    @instrumented()
+    def DumpTrace(self):
+        """
+        Write recorded spans as Chrome Trace Event JSON
+        
+        Returns:
+            Path of the written file (under /run/legion-power; only the
+            newest Tracer.KEEP_DUMPS dumps are kept)
+        """
+        try:
+            return str(TRACER.dump())
+        except Exception as e:
+            logger.error("DumpTrace failed: %s", e)
+            raise dbus.exceptions.DBusException(f"Failed to dump trace: {e}")
+    
+    # ========================================
+    # Telemetry Subscriptions
+    # ========================================
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         in_signature='asu', out_signature='u',
+                         sender_keyword='sender')
+    @instrumented()
+    def Subscribe(self, metrics, interval_ms, sender=None):
+        """
+        Subscribe to telemetry updates
+        
+        Updates arrive as TelemetryUpdate signals sent only to the caller.
+        The subscription ends with Unsubscribe or when the caller
+        disconnects from the bus.
+        
+        Args:
+            metrics: Metric names (battery, temperatures, fans,
+                     ac_online, power_profile)
+            interval_ms: Update interval in milliseconds (min 100)
+        
+        Returns:
+            Subscription handle
+        """
+        try:
+            subscription = self.subscriptions.subscribe(
+                str(sender), [str(m) for m in metrics], int(interval_ms)
+            )
+        except SubscriptionError as e:
+            raise dbus.exceptions.DBusException(
+                str(e), name='com.legion.Power.Error.InvalidArgs'
+            )
+        
+        self._watch_subscriber(str(sender))
+        self.sampler.start()
+        METRICS.set_gauge('subscriptions.active', len(self.subscriptions))
+        return dbus.UInt32(subscription.handle)
+    
+    @dbus.service.method('com.legion.Power.Manager',
+                         in_signature='u', out_signature='b',
+                         sender_keyword='sender')
+    @instrumented()
+    def Unsubscribe(self, handle, sender=None):
+        """
+        Cancel a subscription made by the caller
+        
+        Returns:
+            True if the subscription existed
+        """
+        owner = str(sender)
+        removed = self.subscriptions.unsubscribe(int(handle), owner)
+        if not self.subscriptions.has_owner(owner):
+            self._unwatch_subscriber(owner)
+        METRICS.set_gauge('subscriptions.active', len(self.subscriptions))
+        return removed
+    
+    # Declared for introspection only: updates are sent unicast by
+    # _send_telemetry, never broadcast through this method
+    @dbus.service.signal('com.legion.Power.Manager',
+                         signature='ua{sv}')
+    def TelemetryUpdate(self, handle, data):
+        """Signal carrying one subscription's metrics"""
+        pass
+    
     # ========================================
     # Signals
     # ========================================
     
+    @instrumented('signal.')
     @dbus.service.signal('com.legion.Power.Manager',
                          signature='b')
     def ConservationModeChanged(self, enabled):
         """Signal emitted when conservation mode changes"""
         pass
     
+    @instrumented('signal.')
     @dbus.service.signal('com.legion.Power.Manager',
                          signature='b')
     def RapidChargeChanged(self, enabled):
         """Signal emitted when rapid charge changes"""
         pass
     
+    @instrumented('signal.')
     @dbus.service.signal('com.legion.Power.Manager',
                          signature='s')
     def FanModeChanged(self, mode):
         """Signal emitted when fan mode changes"""
         pass
     
+    @instrumented('signal.')
     @dbus.service.signal('com.legion.Power.Manager',
                          signature='s')
     def PowerProfileChanged(self, profile):
         """Signal emitted when power profile changes"""
         pass
     
+    @instrumented('signal.')
     @dbus.service.signal('com.legion.Power.Manager',
                          signature='a{sv}')
     def BatteryStatusChanged(self, status):
         """Signal emitted when battery status changes"""
         pass
     
+    @instrumented('signal.')
     @dbus.service.signal('com.legion.Power.Manager',
                          signature='ii')
     def MonitorBrightnessChanged(self, display_id, brightness):
         """Signal emitted when external monitor brightness changes"""
         pass
+    
+    @instrumented('signal.')
+    @dbus.service.signal('com.legion.Power.Manager',
+                         signature='ii')
+    def MonitorBrightnessFailed(self, display_id, brightness):
+        """Signal emitted when a queued monitor brightness write failed"""
+        pass
+    
+    @instrumented('signal.')
+    @dbus.service.signal('com.legion.Power.Manager',
+                         signature='aa{sv}')
+    def MonitorsChanged(self, monitors):
+        """Signal emitted when external monitors were connected or removed"""
+        pass
+
+
+def _to_variant_dict(values: Dict[str, Any]) -> dbus.Dictionary:
+    """Convert nested telemetry values to an a{sv} dictionary"""
+    converted = {}
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            converted[key] = _to_variant_dict(value)
+        elif isinstance(value, bool):
+            converted[key] = dbus.Boolean(value)
+        elif isinstance(value, int):
+            converted[key] = dbus.Int64(value)
+        elif isinstance(value, float):
+            converted[key] = dbus.Double(value)
+        else:
+            converted[key] = dbus.String(str(value))
+    return dbus.Dictionary(converted, signature='sv')
+
+
+def _monitors_to_dbus(monitors: List[DDCMonitor],
+                      health: Dict[int, DisplayHealth]) -> dbus.Array:
+    """
+    Convert monitors to the aa{sv} form of GetExternalMonitors
+    
+    Besides the monitor's identity each entry has its circuit breaker
+    state: 'circuit' ("closed", "open" or "half-open"), 'failures'
+    (consecutive failed commands) and 'retry_in' (seconds until the
+    next probe of an open circuit).
+    """
+    result = []
+    for mon in monitors:
+        state = health.get(mon.id) or DisplayHealth()
+        result.append(dbus.Dictionary({
+            'id': dbus.Int32(mon.id),
+            'bus': dbus.String(mon.bus),
+            'manufacturer': dbus.String(mon.manufacturer),
+            'model': dbus.String(mon.model),
+            'serial': dbus.String(mon.serial),
+            'name': dbus.String(mon.name),
+            'vcp_version': dbus.String(mon.vcp_version),
+            'supports_brightness': dbus.Boolean(mon.supports_brightness),
+            'circuit': dbus.String(state.state),
+            'failures': dbus.Int32(state.failures),
+            'retry_in': dbus.Double(round(state.retry_in, 1))
+        }, signature='sv'))
+    return dbus.Array(result, signature='a{sv}')
+
+
+def _from_dbus(value: Any) -> Any:
+    """Convert a D-Bus return value to plain JSON-compatible types"""
+    if isinstance(value, dbus.Boolean):
+        return bool(value)
+    if isinstance(value, dict):
+        return {str(k): _from_dbus(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_from_dbus(v) for v in value]
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    if isinstance(value, str):
+        return str(value)
+    return value
 
 
 def setup_logging():
     """Setup logging configuration"""
     log_dir = Path.home() / ".local" / "share" / "legion-power"
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / "service.log"
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
+    configure_logging(log_file=log_dir / "service.log")
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Legion Power D-Bus Service")
+    parser.add_argument(
+        '--idle-exit', type=float, default=0, metavar='MINUTES',
+        help="exit after MINUTES without D-Bus calls; D-Bus activation "
+             "restarts the service from a warm state snapshot (default: off)"
+    )
+    parser.add_argument(
+        '--textfile', type=Path, metavar='PATH',
+        help="write battery, thermal and service metrics to an OpenMetrics "
+             ".prom file for the node-exporter textfile collector"
+    )
+    parser.add_argument(
+        '--textfile-interval', type=float, default=15, metavar='SECONDS',
+        help="seconds between textfile writes (default: 15)"
+    )
+    parser.add_argument(
+        '--shm', type=Path, nargs='?', const=SHM_PATH, metavar='PATH',
+        help=f"publish battery, thermal, fan and profile telemetry to a "
+             f"shared-memory segment for lock-free readers (default: {SHM_PATH})"
+    )
+    parser.add_argument(
+        '--shm-interval', type=float, default=1, metavar='SECONDS',
+        help="seconds between shared-memory updates (default: 1)"
+    )
+    parser.add_argument(
+        '--socket', type=Path, nargs='?', const=SOCKET_PATH, metavar='PATH',
+        help=f"also serve methods and telemetry streams as newline-delimited "
+             f"JSON on a Unix socket (default: {SOCKET_PATH})"
+    )
+    parser.add_argument(
+        '--trace', action='store_true',
+        help="record spans from startup (dump with SIGUSR2 or DumpTrace)"
+    )
+    parser.add_argument(
+        '--root', type=Path, metavar='DIR',
+        help="use DIR as the filesystem root for /sys, /proc/acpi/call, "
+             "settings and the state snapshot (e.g. a legion_simulator tree)"
+    )
+    parser.add_argument(
+        '--session', action='store_true',
+        help="use the session bus instead of the system bus (testing, "
+             "e.g. with --root on a private bus)"
     )
+    parser.add_argument(
+        '--watch-stalls', action='store_true',
+        help="measure main-loop stalls with a 100 ms heartbeat "
+             "(reported by GetMetrics as mainloop.stall)"
+    )
+    parser.add_argument(
+        '--metrics', action='store_true',
+        help="print latency and error metrics of the running service and exit"
+    )
+    return parser.parse_args()
+
+
+def dump_metrics(session: bool = False) -> int:
+    """Print metrics of the running service (--metrics)"""
+    try:
+        bus = dbus.SessionBus() if session else dbus.SystemBus()
+        proxy = bus.get_object('com.legion.Power', '/com/legion/Power')
+        snapshot = proxy.GetMetrics(dbus_interface='com.legion.Power.Manager')
+    except dbus.exceptions.DBusException as e:
+        print(f"Could not get metrics from com.legion.Power: {e}", file=sys.stderr)
+        return 1
+    
+    print(format_metrics(snapshot))
+    return 0
 
 
 def main():
     """Main entry point"""
+    args = parse_args()
+    if args.metrics:
+        sys.exit(dump_metrics(args.session))
+    
+    if args.trace:
+        TRACER.enable()
+    
     setup_logging()
     logger.info("Starting Legion Power Service")
     
@@ -546,7 +1712,8 @@ def main():
     dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
     
     # Get system bus
-    bus = dbus.SystemBus()
+    bus = dbus.SessionBus() if args.session else dbus.SystemBus()
+    STARTUP.mark('bus_connected')
     
     # Request bus name
     try:
@@ -554,20 +1721,60 @@ def main():
     except dbus.exceptions.NameExistsException:
         logger.error("Service already running")
         sys.exit(1)
+    STARTUP.mark('name_claimed')
+    
+    # Create service (cheap - hardware is probed in the background)
+    if args.root:
+        # Hardware modules pick the root up from the environment
+        os.environ['LEGION_POWER_ROOT'] = str(args.root)
+        service = LegionPowerService(
+            bus_name, idle_timeout=int(args.idle_exit * 60),
+            snapshot=StateSnapshot(args.root / StateSnapshot.SNAPSHOT_PATH.relative_to('/')),
+            config_dir=args.root / "config"
+        )
+    else:
+        service = LegionPowerService(bus_name, idle_timeout=int(args.idle_exit * 60))
+    STARTUP.mark('service_ready')
+    GLib.idle_add(service.start_background_init)
     
-    # Create service
-    service = LegionPowerService(bus_name)
+    if args.watch_stalls:
+        service.enable_stall_monitor()
+    
+    if args.textfile:
+        service.enable_textfile_exporter(args.textfile, args.textfile_interval)
+    
+    if args.shm:
+        service.enable_shm_export(args.shm, args.shm_interval)
+    
+    if args.socket:
+        service.enable_control_socket(args.socket)
     
     # Run main loop
     logger.info("Service ready, entering main loop")
     mainloop = GLib.MainLoop()
     
+    def on_idle_exit():
+        # Drop the name first so new calls activate a fresh instance
+        bus.release_name('com.legion.Power')
+        GLib.idle_add(mainloop.quit)
+    
+    service.enable_idle_exit(on_idle_exit)
+    
+    def on_sigusr2():
+        try:
+            TRACER.dump()
+        except Exception as e:
+            logger.error("Failed to dump trace: %s", e)
+        return True  # keep handler installed
+    
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR2, on_sigusr2)
+    
     try:
         mainloop.run()
     except KeyboardInterrupt:
         logger.info("Service stopped by user")
     except Exception as e:
-        logger.error(f"Service crashed: {e}")
+        logger.error("Service crashed: %s", e)
         sys.exit(1)
 
 
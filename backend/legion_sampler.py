@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Legion Telemetry Sampler
+Background sampler that reads telemetry once per tick and caches it
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetrySampler:
+    """
+    Shared telemetry sampler
+    
+    Reads each source at most once per tick on a background thread and
+    keeps the latest values, so consumers (exporters, subscribers) never
+    add EC or sysfs load of their own.
+    
+    Every source is read at the base interval; set_source_intervals()
+    makes individual sources faster. With a base interval of None only
+    sources with their own interval are read, and the thread sleeps
+    until one is due.
+    
+    Sources are plain callables, e.g.:
+        {'battery': monitor.get_battery_status,
+         'temperatures': monitor.get_temperatures}
+    """
+    
+    def __init__(self, sources: Dict[str, Callable[[], Any]],
+                 interval: Optional[float] = 5.0):
+        """
+        Initialize sampler
+        
+        Args:
+            sources: Source name -> callable returning the current value
+            interval: Base seconds between reads of every source (None: only
+                      sources given an interval by set_source_intervals)
+        """
+        self._sources = dict(sources)
+        self._interval = interval
+        self._source_intervals: Dict[str, float] = {}
+        self._next_due: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._latest: Dict[str, Any] = {}
+        self._timestamp: float = 0
+        self._listeners: List[Callable[[Dict[str, Any], Set[str]], None]] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def source_names(self) -> List[str]:
+        """Names of all sources"""
+        return list(self._sources)
+    
+    @property
+    def interval(self) -> Optional[float]:
+        """Base interval in seconds (None: per-source intervals only)"""
+        return self._interval
+    
+    @interval.setter
+    def interval(self, interval: Optional[float]):
+        with self._lock:
+            self._interval = interval
+            self._reschedule()
+    
+    def set_source_intervals(self, intervals: Dict[str, float]):
+        """
+        Set per-source intervals (replaces the previous set)
+        
+        A source is read at the shorter of its own and the base interval.
+        Sources that become faster are read on the next tick.
+        
+        Args:
+            intervals: Source name -> seconds
+        """
+        unknown = set(intervals) - set(self._sources)
+        if unknown:
+            raise KeyError(f"Unknown telemetry source(s): {', '.join(sorted(unknown))}")
+        
+        with self._lock:
+            self._source_intervals = dict(intervals)
+            self._reschedule()
+    
+    def _interval_for(self, name: str) -> Optional[float]:
+        """Effective interval of a source (None if it is not sampled)"""
+        candidates = [i for i in (self._interval, self._source_intervals.get(name))
+                      if i is not None]
+        return min(candidates) if candidates else None
+    
+    def _reschedule(self):
+        """Pull due times in after an interval change (lock held)"""
+        now = time.monotonic()
+        for name in self._sources:
+            interval = self._interval_for(name)
+            if interval is None:
+                self._next_due.pop(name, None)
+            elif self._next_due.get(name, float('inf')) > now + interval:
+                self._next_due[name] = now
+        self._wake.set()
+    
+    def add_listener(self, callback: Callable[[Dict[str, Any], Set[str]], None]):
+        """
+        Register a callback run on the sampler thread after every tick
+        
+        Args:
+            callback: Called with the latest sample (see latest()) and the
+                      names of the sources read in this tick
+        """
+        self._listeners.append(callback)
+    
+    def start(self):
+        """Start background sampling (no-op if already running)"""
+        if self._thread is not None:
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='legion-sampler',
+            daemon=True
+        )
+        self._thread.start()
+        logger.info("Telemetry sampler started (base interval %ss)", self._interval)
+    
+    def stop(self):
+        """Stop background sampling"""
+        if self._thread is None:
+            return
+        
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the sampler thread is running"""
+        return self._thread is not None
+    
+    def _run(self):
+        """Sampler thread main loop"""
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due = [name for name, at in self._next_due.items() if at <= now]
+            if due:
+                self.sample(due)
+            
+            with self._lock:
+                next_at = min(self._next_due.values(), default=None)
+            timeout = None if next_at is None else max(0, next_at - time.monotonic())
+            self._wake.wait(timeout)
+            self._wake.clear()
+    
+    def sample(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Read sources once and notify listeners
+        
+        A failing source keeps its previous value.
+        
+        Args:
+            names: Sources to read (default: all)
+        
+        Returns:
+            Latest sample (see latest())
+        """
+        if names is None:
+            names = list(self._sources)
+        
+        start = time.monotonic()
+        values = {}
+        for name in names:
+            try:
+                values[name] = self._sources[name]()
+            except Exception as e:
+                logger.debug("Telemetry source %s failed: %s", name, e)
+        
+        with self._lock:
+            self._latest.update(values)
+            self._timestamp = time.time()
+            for name in names:
+                interval = self._interval_for(name)
+                if interval is not None:
+                    self._next_due[name] = start + interval
+        
+        sample = self.latest()
+        updated = set(values)
+        for callback in self._listeners:
+            try:
+                callback(sample, updated)
+            except Exception as e:
+                logger.warning("Telemetry listener failed: %s", e)
+        return sample
+    
+    def latest(self) -> Dict[str, Any]:
+        """
+        Get the latest cached sample without touching hardware
+        
+        Returns:
+            Source name -> value, plus 'timestamp' (Unix time of the tick,
+            0 if nothing was sampled yet)
+        """
+        with self._lock:
+            sample = dict(self._latest)
+            sample['timestamp'] = self._timestamp
+        return sample
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Legion Shared-Memory Telemetry
+Seqlock-protected fixed-layout telemetry segment in /dev/shm
+
+The service writes the latest sampler values into a small file under
+/dev/shm; readers mmap it and decode a consistent snapshot without any
+IPC. Layout (little-endian):
+    
+    offset  size  field
+         0     8  magic b"LEGNTEL\\0"
+         8     2  layout version
+        10     2  header size
+        12     4  record size (header + data + trailer)
+        16     8  sequence number (odd while a write is in progress)
+        24    40  reserved
+        64     -  data (DATA_FORMAT)
+       end     8  trailer copy of the sequence number
+
+Writers bump the sequence to an odd value, store the new final sequence
+in the trailer, write the data, then publish the final sequence in the
+header. mmap readers use the classic seqlock check (header before and
+after the copy); readers that get the whole file in one read() (the
+applet helper) check that the header is even and equals the trailer.
+"""
+
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+SHM_PATH = Path("/dev/shm/legion-power-telemetry")
+
+MAGIC = b"LEGNTEL\0"
+VERSION = 2
+
+HEADER_FORMAT = "<8sHHIQ40x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+SEQ_OFFSET = 16
+
+MAX_TEMPS = 8
+MAX_FANS = 4
+LABEL_SIZE = 32
+
+# Battery fields follow LegionMonitor.get_battery_status()
+DATA_FORMAT = (
+    "<d"        # timestamp (Unix time of the sample)
+    "ii"        # capacity, cycle_count
+    "6d"        # voltage, power_now, energy_now, energy_full, energy_full_design, health
+    "ii"        # time_remaining_minutes, time_to_full_minutes (-1 unknown)
+    "4B"        # state, ac_online, power_profile, temperature count
+    f"{MAX_TEMPS * (LABEL_SIZE + 4)}s"  # temperatures: label[32] + float32 celsius
+    "B3x"       # fan count
+    f"{MAX_FANS * (LABEL_SIZE + 4)}s"   # fans: label[32] + uint32 rpm
+)
+DATA_SIZE = struct.calcsize(DATA_FORMAT)
+TRAILER_OFFSET = HEADER_SIZE + DATA_SIZE
+RECORD_SIZE = TRAILER_OFFSET + 8
+
+BATTERY_FLOATS = ('voltage', 'power_now', 'energy_now', 'energy_full',
+                  'energy_full_design', 'health')
+
+STATES = ("Unknown", "Charging", "Discharging", "Not charging", "Full")
+PROFILES = ("unknown", "quiet", "balanced", "performance")
+AC_UNKNOWN = 255
+
+
+class ShmError(Exception):
+    """Raised when the telemetry segment is missing or malformed"""
+    pass
+
+
+def _pack_labeled(entries: Dict[str, float], count: int, value_format: str) -> bytes:
+    """Pack up to count (label, value) pairs into fixed slots"""
+    slot = struct.Struct(f"<{LABEL_SIZE}s{value_format}")
+    data = bytearray(count * slot.size)
+    for i, (label, value) in enumerate(list(entries.items())[:count]):
+        slot.pack_into(data, i * slot.size, str(label).encode()[:LABEL_SIZE - 1], value)
+    return bytes(data)
+
+
+def _unpack_labeled(data: bytes, count: int, value_format: str) -> Dict[str, Any]:
+    slot = struct.Struct(f"<{LABEL_SIZE}s{value_format}")
+    entries = {}
+    for i in range(count):
+        label, value = slot.unpack_from(data, i * slot.size)
+        entries[label.rstrip(b"\0").decode(errors='replace')] = value
+    return entries
+
+
+def encode(sample: Dict[str, Any]) -> bytes:
+    """
+    Encode a sampler sample into the fixed data layout
+    
+    Args:
+        sample: TelemetrySampler.latest() dictionary
+    
+    Returns:
+        DATA_SIZE bytes
+    """
+    battery = sample.get('battery') or {}
+    temps = sample.get('temperatures') or {}
+    fans = sample.get('fans') or {}
+    state = battery.get('state', "Unknown")
+    profile = sample.get('power_profile') or "unknown"
+    ac_online = sample.get('ac_online')
+    
+    return struct.pack(
+        DATA_FORMAT,
+        sample.get('timestamp', 0.0),
+        int(battery.get('capacity', 0)),
+        int(battery.get('cycle_count', 0)),
+        *(float(battery.get(key, 0.0)) for key in BATTERY_FLOATS),
+        int(battery.get('time_remaining_minutes', -1)),
+        int(battery.get('time_to_full_minutes', -1)),
+        STATES.index(state) if state in STATES else 0,
+        AC_UNKNOWN if ac_online is None else int(bool(ac_online)),
+        PROFILES.index(profile) if profile in PROFILES else 0,
+        min(len(temps), MAX_TEMPS),
+        _pack_labeled(temps, MAX_TEMPS, "f"),
+        min(len(fans), MAX_FANS),
+        _pack_labeled(fans, MAX_FANS, "I"),
+    )
+
+
+def decode(buffer, offset: int = HEADER_SIZE) -> Dict[str, Any]:
+    """
+    Decode the data area
+    
+    Returns:
+        Dictionary with 'timestamp', 'battery' (LegionMonitor field names),
+        'temperatures', 'fans', 'ac_online' and 'power_profile'
+    """
+    values = struct.unpack_from(DATA_FORMAT, buffer, offset)
+    timestamp, capacity, cycle_count = values[0:3]
+    floats = values[3:9]
+    (time_remaining, time_to_full, state, ac_online, profile,
+     n_temps, temps, n_fans, fans) = values[9:]
+    
+    battery = {'capacity': capacity, 'cycle_count': cycle_count,
+               'state': STATES[state] if state < len(STATES) else "Unknown"}
+    battery.update(zip(BATTERY_FLOATS, floats))
+    if time_remaining >= 0:
+        battery['time_remaining_minutes'] = time_remaining
+        battery['time_remaining_hours'] = time_remaining / 60
+    if time_to_full >= 0:
+        battery['time_to_full_minutes'] = time_to_full
+        battery['time_to_full_hours'] = time_to_full / 60
+    
+    return {
+        'timestamp': timestamp,
+        'battery': battery,
+        'temperatures': {k: round(v, 3) for k, v in _unpack_labeled(temps, n_temps, "f").items()},
+        'fans': _unpack_labeled(fans, n_fans, "I"),
+        'ac_online': None if ac_online == AC_UNKNOWN else bool(ac_online),
+        'power_profile': PROFILES[profile] if 0 < profile < len(PROFILES) else None,
+    }
+
+
+class TelemetryShmWriter:
+    """
+    Writer side of the telemetry segment (single writer)
+    
+    Can be registered directly as a TelemetrySampler listener.
+    """
+    
+    def __init__(self, path: Path = SHM_PATH):
+        """
+        Create the segment, replacing any existing file
+        
+        /dev/shm is world-writable, so a file already at the path (or a
+        symlink planted there) is unlinked, never opened; the segment is
+        always a new file of our own.
+        
+        Args:
+            path: Segment file (default: SHM_PATH)
+        
+        Raises:
+            OSError: If the segment cannot be created (e.g. the path was
+                     taken again between unlink and create)
+        """
+        self.path = Path(path)
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o644)
+        try:
+            os.fchmod(fd, 0o644)
+            os.ftruncate(fd, RECORD_SIZE)
+            self._map = mmap.mmap(fd, RECORD_SIZE, mmap.MAP_SHARED, mmap.PROT_WRITE | mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        
+        self._seq = 0
+        self._map[:RECORD_SIZE] = bytes(RECORD_SIZE)
+        struct.pack_into(HEADER_FORMAT, self._map, 0, MAGIC, VERSION, HEADER_SIZE, RECORD_SIZE, 0)
+    
+    def write(self, sample: Dict[str, Any], updated=None):
+        """
+        Publish a sample
+        
+        Args:
+            sample: TelemetrySampler.latest() dictionary
+            updated: Ignored (sampler listener signature)
+        """
+        data = encode(sample)
+        seq = self._seq
+        struct.pack_into("<Q", self._map, SEQ_OFFSET, seq + 1)
+        struct.pack_into("<Q", self._map, TRAILER_OFFSET, seq + 2)
+        self._map[HEADER_SIZE:TRAILER_OFFSET] = data
+        struct.pack_into("<Q", self._map, SEQ_OFFSET, seq + 2)
+        self._seq = seq + 2
+    
+    def close(self, unlink: bool = True):
+        """Unmap the segment (and remove it so readers see the writer is gone)"""
+        self._map.close()
+        if unlink:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class TelemetryShmReader:
+    """
+    Reader side of the telemetry segment
+    
+    Example:
+        with TelemetryShmReader() as reader:
+            snapshot = reader.read()
+            print(snapshot['battery']['capacity'], snapshot['temperatures'])
+    """
+    
+    READ_TIMEOUT = 0.1  # seconds to keep retrying a torn read
+    
+    def __init__(self, path: Path = SHM_PATH):
+        """
+        Map the segment read-only
+        
+        Raises:
+            ShmError: If the segment does not exist or has another layout
+        """
+        self.path = Path(path)
+        try:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, mmap.MAP_SHARED, mmap.PROT_READ)
+        except (OSError, ValueError) as e:
+            raise ShmError(f"Telemetry segment not available at {self.path}: {e}")
+        
+        magic, version, header_size, record_size, _ = struct.unpack_from(HEADER_FORMAT, self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self._map.close()
+            raise ShmError(f"Unsupported telemetry segment layout in {self.path}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    @property
+    def sequence(self) -> int:
+        """Current sequence number (changes on every published sample)"""
+        return struct.unpack_from("<Q", self._map, SEQ_OFFSET)[0]
+    
+    def read(self) -> Optional[Dict[str, Any]]:
+        """
+        Read a consistent snapshot
+        
+        Returns:
+            Decoded sample (see decode()), or None if nothing was published yet
+        
+        Raises:
+            ShmError: If no consistent snapshot could be read
+        """
+        deadline = time.monotonic() + self.READ_TIMEOUT
+        while True:
+            before = struct.unpack_from("<Q", self._map, SEQ_OFFSET)[0]
+            if not before & 1:
+                data = self._map[HEADER_SIZE:TRAILER_OFFSET]
+                if struct.unpack_from("<Q", self._map, SEQ_OFFSET)[0] == before:
+                    return decode(data, 0) if before else None
+            if time.monotonic() > deadline:
+                break
+            # Let the writer finish (it may be a thread waiting for the GIL)
+            time.sleep(0)
+        raise ShmError("Telemetry segment kept changing while reading")
+    
+    def close(self):
+        """Unmap the segment"""
+        self._map.close()
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    
+    try:
+        with TelemetryShmReader(Path(sys.argv[1]) if len(sys.argv) > 1 else SHM_PATH) as reader:
+            print(json.dumps(reader.read(), indent=2))
+    except ShmError as e:
+        print(f"❌ {e}")
+        exit(1)
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Legion Hardware Simulator
+Builds a fake Legion 5 sysfs/procfs tree for tests and benchmarks
+
+The tree mirrors the paths the backend reads (VPC2004 attributes, BAT0,
+ADP0, hwmon devices) and serves /proc/acpi/call from a FIFO, so the
+backend can run unmodified on any Linux machine:
+    
+    python3 legion_simulator.py --root /dev/shm/legion-sim &
+    LEGION_POWER_ROOT=/dev/shm/legion-sim python3 legion_monitor.py
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import signal
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatorError(Exception):
+    """Raised when the simulated tree cannot be built"""
+    pass
+
+
+class LegionSimulator:
+    """
+    Simulated Legion 5 hardware
+    
+    Keeps conservation mode, rapid charge and the DYTC power profile in
+    sync between the ACPI responder and the VPC2004 attributes, and runs
+    a battery/thermal model on a background thread:
+    - on battery, energy drains at a load set by the power profile
+    - on AC, the battery charges (faster with rapid charge) up to 100%,
+      or holds at 60% with conservation mode
+    - temperatures follow the load, fan speeds follow temperature and fan_mode
+    """
+    
+    VPC_PATH = "sys/devices/pci0000:00/0000:00:14.3/PNP0C09:00/VPC2004:00"
+    BATTERY_PATH = "sys/class/power_supply/BAT0"
+    AC_PATH = "sys/class/power_supply/ADP0"
+    HWMON_BASE = "sys/class/hwmon"
+    ACPI_CALL_PATH = "proc/acpi/call"
+    
+    # Battery (µWh)
+    ENERGY_FULL_DESIGN = 80000000
+    ENERGY_FULL = 76000000
+    CONSERVATION_LIMIT = 60  # percent
+    
+    # System load in watts per DYTC mode
+    PROFILE_LOAD = {'quiet': 9.0, 'balanced': 16.0, 'performance': 32.0}
+    CHARGE_POWER = 35.0
+    RAPID_CHARGE_POWER = 60.0
+    
+    DYTC_MODES = {0x3: 'quiet', 0xF: 'balanced', 0x2: 'performance'}
+    
+    def __init__(self, root: Optional[Path] = None, tick: float = 1.0,
+                 time_scale: float = 1.0, capacity: float = 80.0,
+                 ac_online: bool = False, seed: Optional[int] = None):
+        """
+        Initialize simulator (call start() to build the tree)
+        
+        Args:
+            root: Tree root (default: new directory in /dev/shm or /tmp,
+                  removed again by stop())
+            tick: Seconds between model updates
+            time_scale: Simulated seconds per real second
+            capacity: Initial charge in percent
+            ac_online: Whether the AC adapter starts connected
+            seed: Random seed for load jitter
+        """
+        self._owns_root = root is None
+        self.root = Path(root) if root is not None else None
+        self.tick = tick
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        
+        self._energy = self.ENERGY_FULL * capacity / 100
+        self._ac_online = ac_online
+        self._rapid_charge = False
+        self._profile = 'balanced'
+        self._load_offset = 0.0
+        self._cpu_temp = 42.0
+        self.acpi_calls = 0
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+    
+    def start(self):
+        """Build the tree and start the ACPI responder and model threads"""
+        if self.root is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            self.root = Path(tempfile.mkdtemp(prefix="legion-sim-", dir=base))
+        
+        self._stop.clear()
+        self._build_tree()
+        self._update_model(0)
+        
+        for target, name in ((self._serve_acpi_calls, 'legion-sim-acpi'),
+                             (self._run_model, 'legion-sim-model')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        
+        logger.info("Simulated hardware at %s", self.root)
+    
+    def stop(self):
+        """Stop background threads (and remove the tree if it was created here)"""
+        self._stop.set()
+        self._wake_acpi_responder()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        
+        if self._owns_root and self.root is not None:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
+    
+    # Controls
+    
+    def set_ac_online(self, online: bool):
+        """Connect or disconnect the simulated AC adapter"""
+        with self._lock:
+            self._ac_online = online
+        self._update_model(0)
+    
+    def set_capacity(self, capacity: float):
+        """Set the battery charge in percent"""
+        with self._lock:
+            self._energy = self.ENERGY_FULL * capacity / 100
+        self._update_model(0)
+    
+    def set_load(self, watts: float):
+        """Add extra system load on top of the power profile's base load"""
+        with self._lock:
+            self._load_offset = watts
+    
+    # Tree
+    
+    def _path(self, relative: str) -> Path:
+        return self.root / relative
+    
+    def _write(self, path: Path, value):
+        """Replace an attribute atomically (readers never see a partial value)"""
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, 'w') as f:
+            f.write(f"{value}\n")
+        os.replace(tmp, path)
+    
+    def _read(self, relative: str) -> str:
+        with open(self._path(relative), 'r') as f:
+            return f.read().strip()
+    
+    def _build_tree(self):
+        """Create static attributes, hwmon devices and the acpi_call FIFO"""
+        vpc = self._path(self.VPC_PATH)
+        vpc.mkdir(parents=True, exist_ok=True)
+        for attribute, value in (('conservation_mode', 0), ('fan_mode', 0),
+                                 ('camera_power', 1), ('usb_charging', 0),
+                                 ('fn_lock', 0)):
+            self._write(vpc / attribute, value)
+        
+        battery = self._path(self.BATTERY_PATH)
+        battery.mkdir(parents=True, exist_ok=True)
+        for attribute, value in (('type', 'Battery'), ('present', 1),
+                                 ('technology', 'Li-poly'), ('manufacturer', 'Celxpert'),
+                                 ('model_name', 'L19C4PC1'), ('cycle_count', 127),
+                                 ('energy_full_design', self.ENERGY_FULL_DESIGN),
+                                 ('energy_full', self.ENERGY_FULL)):
+            self._write(battery / attribute, value)
+        
+        ac = self._path(self.AC_PATH)
+        ac.mkdir(parents=True, exist_ok=True)
+        self._write(ac / 'type', 'Mains')
+        
+        # name, {temp index: label or None}, fan count
+        hwmon_devices = (
+            ('acpitz', {1: None}, 0),
+            ('k10temp', {1: 'Tctl'}, 0),
+            ('amdgpu', {1: 'edge'}, 0),
+            ('nvme', {1: 'Composite'}, 0),
+            ('legion_hwmon', {}, 2),
+        )
+        for index, (name, temps, fans) in enumerate(hwmon_devices):
+            device = self._path(self.HWMON_BASE) / f"hwmon{index}"
+            device.mkdir(parents=True, exist_ok=True)
+            self._write(device / 'name', name)
+            for temp, label in temps.items():
+                if label:
+                    self._write(device / f"temp{temp}_label", label)
+            for fan in range(1, fans + 1):
+                self._write(device / f"fan{fan}_label", f"Fan {fan}")
+        
+        call = self._path(self.ACPI_CALL_PATH)
+        call.parent.mkdir(parents=True, exist_ok=True)
+        if call.exists() and not stat.S_ISFIFO(call.stat().st_mode):
+            raise SimulatorError(f"{call} exists and is not a FIFO")
+        if not call.exists():
+            os.mkfifo(call, 0o666)
+    
+    # ACPI responder
+    
+    def _serve_acpi_calls(self):
+        """
+        Answer acpi_call requests
+        
+        A client writes "<method> [param]" and closes, then opens the file
+        again to read the result, the same protocol as the acpi_call
+        module. Clients must serialize their write/read pairs (LegionACPI
+        does this with its call lock).
+        """
+        call = self._path(self.ACPI_CALL_PATH)
+        while not self._stop.is_set():
+            try:
+                with open(call, 'r') as f:
+                    request = f.read().strip()
+                if self._stop.is_set():
+                    break
+                if not request:
+                    continue
+                
+                result = self.handle_acpi_call(request)
+                with open(call, 'w') as f:
+                    f.write(result + '\x00')
+            except OSError as e:
+                if not self._stop.is_set():
+                    logger.warning("ACPI responder error: %s", e)
+                    time.sleep(0.1)
+    
+    def _wake_acpi_responder(self):
+        """Unblock the responder thread from a blocking FIFO open"""
+        if self.root is None:
+            return
+        call = self._path(self.ACPI_CALL_PATH)
+        for flags in (os.O_WRONLY | os.O_NONBLOCK, os.O_RDONLY | os.O_NONBLOCK):
+            try:
+                os.close(os.open(call, flags))
+            except OSError:
+                pass
+    
+    def handle_acpi_call(self, request: str) -> str:
+        """
+        Execute one ACPI call against the simulated EC
+        
+        Args:
+            request: Method path and optional parameter
+        
+        Returns:
+            Result string as acpi_call would report it
+        """
+        parts = request.split()
+        method = parts[0].rsplit('.', 1)[-1]
+        try:
+            param = int(parts[1], 16) if len(parts) > 1 else None
+        except ValueError:
+            return "Error: AE_BAD_PARAMETER"
+        
+        with self._lock:
+            self.acpi_calls += 1
+        
+        vpc = self._path(self.VPC_PATH)
+        if method == 'BTSG':
+            return "0x1" if self._read(f"{self.VPC_PATH}/conservation_mode") == "1" else "0x0"
+        
+        if method == 'FCGM':
+            return "0x1" if self._rapid_charge else "0x0"
+        
+        if method == 'SBMC':
+            # Conservation mode and rapid charge exclude each other
+            if param == 0x03:
+                self._write(vpc / 'conservation_mode', 1)
+                self._rapid_charge = False
+            elif param == 0x05:
+                self._write(vpc / 'conservation_mode', 0)
+            elif param == 0x07:
+                self._rapid_charge = True
+                self._write(vpc / 'conservation_mode', 0)
+            elif param == 0x08:
+                self._rapid_charge = False
+            else:
+                return "Error: AE_BAD_PARAMETER"
+            return "0x0"
+        
+        if method == 'DYTC':
+            if param is None:
+                return "Error: AE_AML_UNINITIALIZED_ARG"
+            command = param & 0xFF
+            if command == 0x02:
+                # DYTC_CMD_GET: bits 8-11 function (MMC), bits 12-15 mode
+                mode = next(m for m, p in self.DYTC_MODES.items() if p == self._profile)
+                return hex((mode << 12) | (0xB << 8) | 0x1)
+            if command == 0x01:
+                mode = (param >> 16) & 0xF
+                if mode not in self.DYTC_MODES:
+                    return "Error: AE_BAD_PARAMETER"
+                with self._lock:
+                    self._profile = self.DYTC_MODES[mode]
+                return "0x0"
+            return "Error: AE_BAD_PARAMETER"
+        
+        return "Error: AE_NOT_FOUND"
+    
+    # Battery and thermal model
+    
+    def _run_model(self):
+        """Model thread main loop"""
+        last = time.monotonic()
+        while not self._stop.wait(self.tick):
+            now = time.monotonic()
+            self._update_model((now - last) * self.time_scale)
+            last = now
+    
+    def _update_model(self, elapsed: float):
+        """
+        Advance the model and rewrite BAT0, ADP0 and hwmon attributes
+        
+        Args:
+            elapsed: Simulated seconds since the last update
+        """
+        try:
+            conservation = self._read(f"{self.VPC_PATH}/conservation_mode") == "1"
+            fan_mode = int(self._read(f"{self.VPC_PATH}/fan_mode") or 0)
+        except (OSError, ValueError):
+            conservation, fan_mode = False, 0
+        
+        with self._lock:
+            load = self.PROFILE_LOAD[self._profile] + self._load_offset
+            load *= self._random.uniform(0.9, 1.1)
+            capacity = self._energy / self.ENERGY_FULL * 100
+            
+            if not self._ac_online:
+                state = "Discharging"
+                power = load
+                self._energy -= power * 1e6 * elapsed / 3600
+            elif conservation and capacity >= self.CONSERVATION_LIMIT:
+                state = "Not charging"
+                power = 0.0
+            elif capacity >= 100:
+                state = "Full"
+                power = 0.0
+            else:
+                state = "Charging"
+                power = self.RAPID_CHARGE_POWER if self._rapid_charge else self.CHARGE_POWER
+                if capacity > 80:
+                    # Constant-voltage phase: current tapers off
+                    power *= max(0.1, (100 - capacity) / 20)
+                self._energy += power * 1e6 * elapsed / 3600
+            
+            self._energy = min(max(self._energy, 0), self.ENERGY_FULL)
+            capacity = self._energy / self.ENERGY_FULL * 100
+            voltage = 13.8 + 1.6 * capacity / 100 + (0.3 if state == "Charging" else 0)
+            
+            # CPU temperature approaches a load-dependent target (tau = 20 s)
+            target = 38 + load * 1.2
+            self._cpu_temp += (target - self._cpu_temp) * min(1.0, elapsed / 20)
+            cpu_temp = self._cpu_temp
+            ac_online = self._ac_online
+        
+        fan_limits = {0: (0, 4200), 1: (0, 2800), 2: (2200, 4800)}
+        low, high = fan_limits.get(fan_mode, fan_limits[0])
+        fan_rpm = int(min(high, max(low, (cpu_temp - 45) * 90)))
+        
+        battery = self._path(self.BATTERY_PATH)
+        values = {
+            'status': state,
+            'capacity': int(round(capacity)),
+            'energy_now': int(self._energy),
+            'power_now': int(power * 1e6),
+            'voltage_now': int(voltage * 1e6),
+        }
+        for attribute, value in values.items():
+            self._write(battery / attribute, value)
+        self._write(battery / 'uevent', self._battery_uevent(values))
+        self._write(self._path(self.AC_PATH) / 'online', int(ac_online))
+        
+        hwmon = self._path(self.HWMON_BASE)
+        temps = {'hwmon0': cpu_temp - 10, 'hwmon1': cpu_temp,
+                 'hwmon2': cpu_temp - 6, 'hwmon3': 33 + load * 0.3}
+        for device, celsius in temps.items():
+            self._write(hwmon / device / 'temp1_input', int(celsius * 1000))
+        self._write(hwmon / 'hwmon4' / 'fan1_input', fan_rpm)
+        self._write(hwmon / 'hwmon4' / 'fan2_input', int(fan_rpm * 1.05))
+    
+    def _battery_uevent(self, values: Dict) -> str:
+        """Render BAT0/uevent like the kernel's power_supply class"""
+        lines = [
+            "POWER_SUPPLY_NAME=BAT0",
+            "POWER_SUPPLY_TYPE=Battery",
+            f"POWER_SUPPLY_STATUS={values['status']}",
+            "POWER_SUPPLY_PRESENT=1",
+            "POWER_SUPPLY_TECHNOLOGY=Li-poly",
+            "POWER_SUPPLY_CYCLE_COUNT=127",
+            f"POWER_SUPPLY_VOLTAGE_NOW={values['voltage_now']}",
+            f"POWER_SUPPLY_POWER_NOW={values['power_now']}",
+            f"POWER_SUPPLY_ENERGY_FULL_DESIGN={self.ENERGY_FULL_DESIGN}",
+            f"POWER_SUPPLY_ENERGY_FULL={self.ENERGY_FULL}",
+            f"POWER_SUPPLY_ENERGY_NOW={values['energy_now']}",
+            f"POWER_SUPPLY_CAPACITY={values['capacity']}",
+            "POWER_SUPPLY_MODEL_NAME=L19C4PC1",
+            "POWER_SUPPLY_MANUFACTURER=Celxpert",
+        ]
+        return "\n".join(lines)
+
+
+def main():
+    """Run the simulator until interrupted"""
+    parser = argparse.ArgumentParser(description="Simulated Legion 5 hardware tree")
+    parser.add_argument('--root', type=Path,
+                        help="tree root (default: temporary directory, removed on exit)")
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help="simulated seconds per real second (default: 1)")
+    parser.add_argument('--capacity', type=float, default=80.0,
+                        help="initial charge in percent (default: 80)")
+    parser.add_argument('--ac', action='store_true',
+                        help="start with the AC adapter connected")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    simulator = LegionSimulator(args.root, time_scale=args.time_scale,
+                                capacity=args.capacity, ac_online=args.ac)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    
+    with simulator:
+        print(f"LEGION_POWER_ROOT={simulator.root}", flush=True)
+        try:
+            stop.wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
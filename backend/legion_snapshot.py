@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Legion State Snapshot
+Compact warm-state snapshot written on idle exit and read on D-Bus activation
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StateSnapshot:
+    """
+    Warm state snapshot for fast service restarts
+    
+    The snapshot lives on tmpfs (/run) and is only trusted when it was
+    written during the current boot and is not too old. It also records
+    how long the system had been suspended when it was written, so a
+    reader can tell whether a suspend happened in between (firmware may
+    have reset hardware state meanwhile).
+    """
+    
+    VERSION = 1
+    SNAPSHOT_PATH = Path("/run/legion-power/snapshot.json")
+    BOOT_ID_PATH = Path("/proc/sys/kernel/random/boot_id")
+    MAX_AGE = 24 * 3600  # seconds
+    
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize snapshot store
+        
+        Args:
+            path: Snapshot file (default: SNAPSHOT_PATH)
+        """
+        self.path = Path(path) if path is not None else self.SNAPSHOT_PATH
+    
+    def _boot_id(self) -> str:
+        """Get current boot ID (empty if unavailable)"""
+        try:
+            return self.BOOT_ID_PATH.read_text().strip()
+        except OSError:
+            return ""
+    
+    @staticmethod
+    def suspended_seconds() -> float:
+        """Total time spent suspended since boot"""
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - time.monotonic()
+    
+    def save(self, data: Dict[str, Any]):
+        """
+        Atomically write snapshot
+        
+        Args:
+            data: JSON-serializable service state
+        """
+        snapshot = {
+            'version': self.VERSION,
+            'boot_id': self._boot_id(),
+            'saved_at': time.time(),
+            'suspended_seconds': self.suspended_seconds(),
+            'state': data,
+        }
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            logger.info("Saved state snapshot to %s", self.path)
+        except Exception as e:
+            logger.warning("Failed to save state snapshot: %s", e)
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read snapshot if it is valid for this boot
+        
+        Returns:
+            Dictionary with 'state' and 'slept' (True if the system was
+            suspended after the snapshot was written), or None
+        """
+        try:
+            with open(self.path, 'r') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug("Failed to read state snapshot: %s", e)
+            return None
+        
+        if snapshot.get('version') != self.VERSION:
+            logger.debug("Ignoring snapshot from another version")
+            return None
+        if snapshot.get('boot_id') != self._boot_id():
+            logger.debug("Ignoring snapshot from a previous boot")
+            return None
+        if time.time() - snapshot.get('saved_at', 0) > self.MAX_AGE:
+            logger.debug("Ignoring stale snapshot")
+            return None
+        
+        slept = self.suspended_seconds() - snapshot.get('suspended_seconds', 0) > 1.0
+        return {
+            'state': snapshot.get('state', {}),
+            'slept': slept,
+        }
+    
+    def discard(self):
+        """Remove snapshot (it is single-use)"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug("Failed to remove state snapshot: %s", e)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Legion Control Socket
+Newline-delimited JSON endpoint on a local Unix socket
+
+An alternative to D-Bus for scripts and dashboards: one connection
+carries any number of pipelined requests and telemetry streams, and a
+JSON line costs far less to produce and parse than a dbus-python call.
+
+Requests (one JSON value per line):
+    
+    {"id": 1, "method": "GetBatteryStatus"}
+    {"id": 2, "method": "SetPowerProfile", "params": ["quiet"]}
+    [{"id": 3, "method": "SetFanMode", "params": ["auto"]},
+     {"id": 4, "method": "GetFanMode"}]
+
+Methods and params are those of the D-Bus interface. Requests on a
+connection are answered in order; a JSON array is a batch answered with
+one array. Requests that are already waiting when the previous ones
+finish (pipelined, or in one batch) run in a single main-loop turn.
+Responses carry the request id and either "result" or "error".
+
+Telemetry streams use the shared subscription manager:
+    
+    {"id": 5, "method": "Subscribe", "params": [["battery", "fans"], 500]}
+    -> {"id": 5, "result": 1}
+    -> {"telemetry": 1, "data": {"battery": {...}, "fans": {...}, "timestamp": ...}}
+    {"id": 6, "method": "Unsubscribe", "params": [1]}
+
+Updates for a client that does not keep up are dropped rather than
+buffered without bound.
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from legion_metrics import METRICS
+    from legion_subscriptions import Subscription, SubscriptionError, SubscriptionManager
+except ImportError:
+    from .legion_metrics import METRICS
+    from .legion_subscriptions import Subscription, SubscriptionError, SubscriptionManager
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = Path("/run/legion-power/control.sock")
+
+OWNER_PREFIX = "socket:"
+
+# (method, params) pairs -> [(ok, result or error message), ...]
+Executor = Callable[[List[Tuple[str, list]]], concurrent.futures.Future]
+
+
+class SocketProtocolError(Exception):
+    """Raised for malformed requests"""
+    pass
+
+
+class ControlSocketServer:
+    """
+    asyncio Unix-socket server running on its own thread
+    
+    Commands are not executed on the asyncio thread: they are handed to
+    the executor (the service runs them on the GLib main loop, like D-Bus
+    calls), so the socket adds no new concurrency to the hardware paths.
+    """
+    
+    MAX_LINE = 256 * 1024
+    MAX_BATCH = 64
+    MAX_WRITE_BUFFER = 256 * 1024  # drop telemetry above this backlog
+    
+    def __init__(self, path: Path, execute: Executor,
+                 subscriptions: SubscriptionManager, mode: int = 0o660,
+                 on_subscribe: Optional[Callable[[], None]] = None):
+        """
+        Initialize server (call start() to listen)
+        
+        Args:
+            path: Socket path
+            execute: Runs a batch of (method, params) and returns a Future
+                     with one (ok, value) pair per command
+            subscriptions: Shared subscription manager; its deliver
+                           callback must route 'socket:' owners to deliver()
+            mode: Socket file permissions
+            on_subscribe: Called (on the socket thread) after every
+                          successful Subscribe, e.g. to start the sampler
+        """
+        self.path = Path(path)
+        self._execute = execute
+        self._subscriptions = subscriptions
+        self._mode = mode
+        self._on_subscribe = on_subscribe
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._server = None
+        self._clients: Dict[str, asyncio.StreamWriter] = {}
+        self._ids = itertools.count(1)
+    
+    def start(self):
+        """Bind the socket and serve on a background thread"""
+        if self._thread is not None:
+            return
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.is_socket():
+            self.path.unlink()
+        
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_unix_server(
+            self._handle_client, path=str(self.path), limit=self.MAX_LINE
+        ))
+        os.chmod(self.path, self._mode)
+        
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name='legion-socket',
+            daemon=True
+        )
+        self._thread.start()
+        logger.info("Control socket listening on %s", self.path)
+    
+    def stop(self):
+        """Close the server and all connections"""
+        if self._thread is None:
+            return
+        
+        async def shutdown():
+            self._server.close()
+            for writer in list(self._clients.values()):
+                writer.close()
+            await self._server.wait_closed()
+        
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._thread = None
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+    
+    def deliver(self, subscription: Subscription, payload: Dict[str, Any]):
+        """Queue a telemetry update for a socket subscriber (any thread)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._send_telemetry, subscription.owner,
+                                            subscription.handle, payload)
+    
+    def _send_telemetry(self, owner: str, handle: int, payload: Dict[str, Any]):
+        writer = self._clients.get(owner)
+        if writer is None or writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > self.MAX_WRITE_BUFFER:
+            METRICS.inc('socket.telemetry_dropped')
+            return
+        writer.write(_encode({'telemetry': handle, 'data': payload}))
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve one connection
+        
+        A reader task parses lines into a queue; requests that are already
+        queued when the previous ones finish (pipelined by the client) are
+        run together in one executor call. Responses keep request order.
+        """
+        owner = f"{OWNER_PREFIX}{next(self._ids)}"
+        self._clients[owner] = writer
+        METRICS.set_gauge('socket.clients', len(self._clients))
+        logger.debug("Control socket client %s connected", owner)
+        
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_BATCH)
+        reading = asyncio.ensure_future(self._read_requests(reader, queue))
+        try:
+            done = False
+            while not done:
+                units = [await queue.get()]
+                size = _unit_size(units[0])
+                while units[-1] is not None and size < self.MAX_BATCH and not queue.empty():
+                    units.append(queue.get_nowait())
+                    size += _unit_size(units[-1])
+                if units[-1] is None:
+                    units.pop()
+                    done = True
+                
+                requests = [request for unit in units for request in _unit_requests(unit)]
+                responses = iter(await self._run_batch(owner, requests))
+                for kind, payload in units:
+                    if kind == 'error':
+                        writer.write(_encode(payload))
+                    elif kind == 'batch':
+                        writer.write(_encode([next(responses) for _ in payload]))
+                    else:
+                        writer.write(_encode(next(responses)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            reading.cancel()
+            del self._clients[owner]
+            dropped = self._subscriptions.drop_owner(owner)
+            if dropped:
+                METRICS.inc('subscriptions.dropped', dropped)
+                METRICS.set_gauge('subscriptions.active', len(self._subscriptions))
+            METRICS.set_gauge('socket.clients', len(self._clients))
+            writer.close()
+            logger.debug("Control socket client %s disconnected", owner)
+    
+    async def _read_requests(self, reader: asyncio.StreamReader, queue: asyncio.Queue):
+        """
+        Parse request lines into (kind, payload) units; None marks the end
+        
+        Kinds: 'single' (one request), 'batch' (list of requests) and
+        'error' (a ready response for an unparsable line).
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await queue.put(('error', {'id': None, 'error': "Request line too long"}))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await queue.put(self._parse_line(line))
+        except ConnectionError:
+            pass
+        await queue.put(None)
+    
+    def _parse_line(self, line: bytes) -> Tuple[str, Any]:
+        """Turn one line into a queue unit"""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return 'error', {'id': None, 'error': f"Invalid JSON: {e}"}
+        
+        if isinstance(request, list):
+            if not request or len(request) > self.MAX_BATCH:
+                return 'error', {'id': None,
+                                 'error': f"Batch must hold 1-{self.MAX_BATCH} requests"}
+            return 'batch', request
+        return 'single', request
+    
+    async def _run_batch(self, owner: str, requests: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Run requests in order
+        
+        Consecutive service methods go to the executor as one batch;
+        subscription methods are handled here.
+        """
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        pending: List[Tuple[int, str, list]] = []
+        
+        async def flush():
+            if not pending:
+                return
+            with METRICS.timed('socket.batch'):
+                results = await asyncio.wrap_future(
+                    self._execute([(method, params) for _, method, params in pending])
+                )
+            for (index, _, _), (ok, value) in zip(pending, results):
+                responses[index] = _response(requests[index], ok, value)
+            pending.clear()
+        
+        for index, request in enumerate(requests):
+            try:
+                method, params = _parse_request(request)
+            except SocketProtocolError as e:
+                responses[index] = _response(request, False, str(e))
+                continue
+            
+            if method in ('Subscribe', 'Unsubscribe'):
+                await flush()
+                responses[index] = self._subscription_call(request, owner, method, params)
+            else:
+                pending.append((index, method, params))
+        await flush()
+        
+        METRICS.inc('socket.requests', len(requests))
+        return responses
+    
+    def _subscription_call(self, request: Any, owner: str, method: str,
+                           params: list) -> Dict[str, Any]:
+        """Subscribe(metrics, interval_ms) / Unsubscribe(handle) for this connection"""
+        try:
+            if method == 'Subscribe':
+                metrics, interval_ms = params
+                subscription = self._subscriptions.subscribe(owner, list(metrics), int(interval_ms))
+                result = subscription.handle
+                if self._on_subscribe is not None:
+                    self._on_subscribe()
+            else:
+                (handle,) = params
+                result = self._subscriptions.unsubscribe(int(handle), owner)
+        except SubscriptionError as e:
+            return _response(request, False, str(e))
+        except (TypeError, ValueError):
+            return _response(request, False, f"Invalid params for {method}")
+        
+        METRICS.set_gauge('subscriptions.active', len(self._subscriptions))
+        return _response(request, True, result)
+
+
+def _unit_requests(unit: Tuple[str, Any]) -> List[Any]:
+    kind, payload = unit
+    return payload if kind == 'batch' else [payload] if kind == 'single' else []
+
+
+def _unit_size(unit: Optional[Tuple[str, Any]]) -> int:
+    return len(_unit_requests(unit)) if unit is not None else 0
+
+
+def _parse_request(request: Any) -> Tuple[str, list]:
+    """Validate a request object"""
+    if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+        raise SocketProtocolError("Request must be an object with a 'method' string")
+    params = request.get('params', [])
+    if not isinstance(params, list):
+        raise SocketProtocolError("'params' must be an array")
+    return request['method'], params
+
+
+def _response(request: Any, ok: bool, value: Any) -> Dict[str, Any]:
+    request_id = request.get('id') if isinstance(request, dict) else None
+    if ok:
+        return {'id': request_id, 'result': value}
+    return {'id': request_id, 'error': value}
+
+
+def _encode(message: Any) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Legion Telemetry Subscriptions
+Client subscriptions fanned out from the shared telemetry sampler
+"""
+
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Set
+
+try:
+    from legion_sampler import TelemetrySampler
+except ImportError:
+    from .legion_sampler import TelemetrySampler
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionError(Exception):
+    """Raised when a subscription request is invalid"""
+    pass
+
+
+@dataclass
+class Subscription:
+    """One client's subscription"""
+    handle: int
+    owner: str               # D-Bus unique name of the subscriber
+    metrics: FrozenSet[str]
+    interval: float          # seconds
+    next_due: float = 0.0    # monotonic time of the next delivery
+
+
+class SubscriptionManager:
+    """
+    Telemetry subscriptions on top of one TelemetrySampler
+    
+    Each metric is sampled at the fastest interval any subscriber asked
+    for, and read once per tick no matter how many clients want it. After
+    a tick, every subscription whose metrics were read and whose own
+    interval has elapsed gets the values it asked for through the
+    deliver callback (called on the sampler thread).
+    """
+    
+    MIN_INTERVAL_MS = 100
+    MAX_INTERVAL_MS = 3600 * 1000
+    MAX_PER_OWNER = 16
+    
+    def __init__(self, sampler: TelemetrySampler,
+                 deliver: Callable[[Subscription, Dict[str, Any]], None]):
+        """
+        Initialize manager
+        
+        Args:
+            sampler: Shared sampler providing the metrics
+            deliver: Called with a subscription and its payload
+                     (metric -> value, plus 'timestamp')
+        """
+        self._sampler = sampler
+        self._deliver = deliver
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._handles = itertools.count(1)
+        sampler.add_listener(self._on_sample)
+    
+    def subscribe(self, owner: str, metrics: List[str], interval_ms: int) -> Subscription:
+        """
+        Add a subscription
+        
+        Args:
+            owner: Subscriber's bus name
+            metrics: Sampler source names (e.g. ["battery", "temperatures"])
+            interval_ms: Requested update interval (clamped to
+                         MIN_INTERVAL_MS..MAX_INTERVAL_MS)
+        
+        Returns:
+            New subscription
+        
+        Raises:
+            SubscriptionError: On unknown metrics or too many subscriptions
+        """
+        wanted = frozenset(metrics)
+        if not wanted:
+            raise SubscriptionError("No metrics given")
+        unknown = wanted - set(self._sampler.source_names)
+        if unknown:
+            raise SubscriptionError(
+                f"Unknown metric(s): {', '.join(sorted(unknown))}. "
+                f"Available: {', '.join(self._sampler.source_names)}"
+            )
+        
+        interval_ms = max(self.MIN_INTERVAL_MS, min(self.MAX_INTERVAL_MS, interval_ms))
+        
+        with self._lock:
+            owned = sum(1 for sub in self._subscriptions.values() if sub.owner == owner)
+            if owned >= self.MAX_PER_OWNER:
+                raise SubscriptionError(f"Too many subscriptions for {owner}")
+            
+            subscription = Subscription(next(self._handles), owner, wanted, interval_ms / 1000)
+            self._subscriptions[subscription.handle] = subscription
+            self._update_rates()
+        
+        logger.info("Subscription %s: %s every %sms for %s", subscription.handle,
+                    ','.join(sorted(wanted)), interval_ms, owner)
+        return subscription
+    
+    def unsubscribe(self, handle: int, owner: str) -> bool:
+        """
+        Remove a subscription (only its owner may remove it)
+        
+        Returns:
+            True if the subscription existed and was removed
+        """
+        with self._lock:
+            subscription = self._subscriptions.get(handle)
+            if subscription is None or subscription.owner != owner:
+                return False
+            del self._subscriptions[handle]
+            self._update_rates()
+        
+        logger.info("Subscription %s removed", handle)
+        return True
+    
+    def drop_owner(self, owner: str) -> int:
+        """
+        Remove all subscriptions of a bus name (e.g. after it vanished)
+        
+        Returns:
+            Number of subscriptions removed
+        """
+        with self._lock:
+            handles = [h for h, sub in self._subscriptions.items() if sub.owner == owner]
+            for handle in handles:
+                del self._subscriptions[handle]
+            if handles:
+                self._update_rates()
+        
+        if handles:
+            logger.info("Dropped %s subscription(s) of %s", len(handles), owner)
+        return len(handles)
+    
+    def has_owner(self, owner: str) -> bool:
+        """Whether a bus name has any subscriptions"""
+        with self._lock:
+            return any(sub.owner == owner for sub in self._subscriptions.values())
+    
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+    
+    def has_subscriptions(self) -> bool:
+        """Whether any client is subscribed"""
+        return bool(self._subscriptions)
+    
+    def _update_rates(self):
+        """Sample each metric at its fastest subscribed interval (lock held)"""
+        intervals: Dict[str, float] = {}
+        for sub in self._subscriptions.values():
+            for metric in sub.metrics:
+                intervals[metric] = min(intervals.get(metric, sub.interval), sub.interval)
+        self._sampler.set_source_intervals(intervals)
+    
+    def _on_sample(self, sample: Dict[str, Any], updated: Set[str]):
+        """Sampler listener: deliver to subscriptions that are due"""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for sub in self._subscriptions.values():
+                if not sub.metrics & updated:
+                    continue
+                # Ticks jitter around the fastest interval; 10% slack keeps a
+                # subscription from slipping a whole tick
+                if now < sub.next_due - sub.interval * 0.1:
+                    continue
+                sub.next_due = now + sub.interval
+                due.append(sub)
+        
+        for sub in due:
+            payload = {metric: sample[metric] for metric in sub.metrics
+                       if sample.get(metric) is not None}
+            payload['timestamp'] = sample['timestamp']
+            try:
+                self._deliver(sub, payload)
+            except Exception as e:
+                logger.warning("Delivery to subscription %s failed: %s", sub.handle, e)
@@ -9,6 +9,11 @@ import logging
 from typing import Optional
 from pathlib import Path
 
+try:
+    from legion_metrics import METRICS
+except ImportError:
+    from .legion_metrics import METRICS
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,16 +49,22 @@ class LegionSysfs:
     FAN_QUIET = 1
     FAN_PERFORMANCE = 2
     
-    def __init__(self):
-        """Initialize sysfs interface"""
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize sysfs interface
+        
+        Args:
+            root: Filesystem root prefix (default: $LEGION_POWER_ROOT or /)
+        """
+        root = root or os.environ.get("LEGION_POWER_ROOT", "/")
+        self._vpc_path = Path(root) / self.VPC_BASE.lstrip("/")
         self._check_vpc_available()
-        self._vpc_path = Path(self.VPC_BASE)
     
     def _check_vpc_available(self):
         """Check if VPC device is available"""
-        if not os.path.exists(self.VPC_BASE):
+        if not self._vpc_path.exists():
             raise SysfsError(
-                f"VPC device not found at {self.VPC_BASE}. "
+                f"VPC device not found at {self._vpc_path}. "
                 f"Is ideapad_laptop module loaded?"
             )
     
@@ -73,9 +84,9 @@ class LegionSysfs:
         path = self._vpc_path / attribute
         
         try:
-            with open(path, 'r') as f:
+            with METRICS.timed('sysfs.vpc_read'), open(path, 'r') as f:
                 value = f.read().strip()
-            logger.debug(f"Read {attribute}: {value}")
+            logger.debug("Read %s: %s", attribute, value)
             return value
         except FileNotFoundError:
             raise SysfsError(f"Attribute {attribute} not found at {path}")
@@ -98,9 +109,9 @@ class LegionSysfs:
         path = self._vpc_path / attribute
         
         try:
-            with open(path, 'w') as f:
+            with METRICS.timed('sysfs.vpc_write'), open(path, 'w') as f:
                 f.write(str(value))
-            logger.debug(f"Wrote {attribute}: {value}")
+            logger.debug("Wrote %s: %s", attribute, value)
         except FileNotFoundError:
             raise SysfsError(f"Attribute {attribute} not found at {path}")
         except PermissionError:
@@ -122,7 +133,7 @@ class LegionSysfs:
             value = self._read_sysfs(self.CONSERVATION_MODE)
             return value == "1"
         except SysfsError as e:
-            logger.error(f"Failed to get conservation mode: {e}")
+            logger.error("Failed to get conservation mode: %s", e)
             raise
     
     def set_conservation_mode(self, enable: bool) -> None:
@@ -135,9 +146,9 @@ class LegionSysfs:
         try:
             value = "1" if enable else "0"
             self._write_sysfs(self.CONSERVATION_MODE, value)
-            logger.info(f"Conservation mode {'enabled' if enable else 'disabled'} (sysfs)")
+            logger.info("Conservation mode %s (sysfs)", 'enabled' if enable else 'disabled')
         except SysfsError as e:
-            logger.error(f"Failed to set conservation mode: {e}")
+            logger.error("Failed to set conservation mode: %s", e)
             raise
     
     def get_fan_mode(self) -> str:
@@ -158,7 +169,7 @@ class LegionSysfs:
             
             return mode_map.get(value, "unknown")
         except SysfsError as e:
-            logger.error(f"Failed to get fan mode: {e}")
+            logger.error("Failed to get fan mode: %s", e)
             raise
     
     def set_fan_mode(self, mode: str) -> None:
@@ -186,9 +197,9 @@ class LegionSysfs:
         try:
             value = mode_map[mode]
             self._write_sysfs(self.FAN_MODE, str(value))
-            logger.info(f"Fan mode set to: {mode}")
+            logger.info("Fan mode set to: %s", mode)
         except SysfsError as e:
-            logger.error(f"Failed to set fan mode: {e}")
+            logger.error("Failed to set fan mode: %s", e)
             raise
     
     def get_camera_power(self) -> bool:
@@ -205,7 +216,7 @@ class LegionSysfs:
             value = "1" if enable else "0"
             self._write_sysfs(self.CAMERA_POWER, value)
         except SysfsError as e:
-            logger.warning(f"Failed to set camera power: {e}")
+            logger.warning("Failed to set camera power: %s", e)
     
     def get_usb_charging(self) -> bool:
         """Get USB charging status"""
@@ -221,7 +232,7 @@ class LegionSysfs:
             value = "1" if enable else "0"
             self._write_sysfs(self.USB_CHARGING, value)
         except SysfsError as e:
-            logger.warning(f"Failed to set USB charging: {e}")
+            logger.warning("Failed to set USB charging: %s", e)
     
     def get_fn_lock(self) -> bool:
         """Get Fn lock status"""
@@ -237,7 +248,7 @@ class LegionSysfs:
             value = "1" if enable else "0"
             self._write_sysfs(self.FN_LOCK, value)
         except SysfsError as e:
-            logger.warning(f"Failed to set Fn lock: {e}")
+            logger.warning("Failed to set Fn lock: %s", e)
     
     def get_all_status(self) -> dict:
         """
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Legion Tracing
+Opt-in span recorder with Chrome Trace Event JSON export
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _NullSpan:
+    """Span used while tracing is disabled (does nothing)"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Span recording one complete ("X") event on exit"""
+    
+    __slots__ = ('_tracer', '_name', '_cat', '_args', '_start')
+    
+    def __init__(self, tracer: 'Tracer', name: str, cat: str, args: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+    
+    def __enter__(self):
+        self._start = time.monotonic_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        end = time.monotonic_ns()
+        args = self._args
+        if exc_type is not None:
+            args = dict(args, error=exc_type.__name__)
+        self._tracer._record(self._name, self._cat, self._start, end, args)
+        return False
+
+
+class Tracer:
+    """
+    Bounded in-memory span recorder
+    
+    Spans carry monotonic timestamps and the native thread ID, so nested
+    spans on one thread show up nested in chrome://tracing or Perfetto.
+    The buffer is a ring: once full, the oldest events are dropped.
+    While disabled, span() returns a shared no-op object.
+    """
+    
+    MAX_EVENTS = 20000
+    TRACE_DIR = Path("/run/legion-power")
+    KEEP_DUMPS = 5  # default-location dumps kept (/run is RAM-backed)
+    
+    def __init__(self, max_events: int = MAX_EVENTS):
+        """
+        Initialize tracer (disabled)
+        
+        Args:
+            max_events: Ring buffer size
+        """
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._thread_names: Dict[int, str] = {}
+    
+    def enable(self, enabled: bool = True):
+        """Turn span recording on or off"""
+        self.enabled = enabled
+        logger.info("Tracing %s", 'enabled' if enabled else 'disabled')
+    
+    def span(self, name: str, cat: str = 'legion', **args):
+        """
+        Context manager recording a span
+        
+        Example:
+            with TRACER.span('config.save', 'config'):
+                ...
+        
+        Args:
+            name: Span name
+            cat: Category (shown as a filter in trace viewers)
+            **args: Extra values shown with the event
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+    
+    def _record(self, name: str, cat: str, start_ns: int, end_ns: int, args: Dict[str, Any]):
+        """Append one complete event (deque.append is thread-safe)"""
+        tid = threading.get_native_id()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': start_ns / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': tid,
+        }
+        if args:
+            event['args'] = args
+        self._events.append(event)
+    
+    def clear(self):
+        """Drop all recorded events"""
+        self._events.clear()
+    
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Get recorded events in Chrome Trace Event format
+        
+        Returns:
+            Dictionary ready for json.dump (open in chrome://tracing
+            or ui.perfetto.dev)
+        """
+        pid = os.getpid()
+        metadata = [
+            {'name': 'process_name', 'ph': 'M', 'pid': pid,
+             'args': {'name': 'legion-power-service'}},
+        ]
+        for tid, thread_name in list(self._thread_names.items()):
+            metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': pid,
+                             'tid': tid, 'args': {'name': thread_name}})
+        return {
+            'traceEvents': metadata + list(self._events),
+            'displayTimeUnit': 'ms',
+        }
+    
+    def dump(self, path: Optional[Path] = None) -> Path:
+        """
+        Write recorded events as Chrome Trace Event JSON
+        
+        Args:
+            path: Output file (default: TRACE_DIR/trace-<timestamp>.json,
+                  keeping only the newest KEEP_DUMPS of those)
+        
+        Returns:
+            Path written
+        """
+        prune = path is None
+        if path is None:
+            path = self.TRACE_DIR / time.strftime("trace-%Y%m%d-%H%M%S.json")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        trace = self.to_chrome_trace()
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+        logger.info("Wrote %s trace events to %s", len(trace['traceEvents']), path)
+        if prune:
+            self._prune_dumps()
+        return path
+    
+    def _prune_dumps(self):
+        """Delete all but the newest KEEP_DUMPS dumps in TRACE_DIR"""
+        # Timestamped names sort chronologically
+        dumps = sorted(self.TRACE_DIR.glob("trace-*.json"))
+        for old in dumps[:-self.KEEP_DUMPS]:
+            try:
+                old.unlink()
+            except OSError as e:
+                logger.debug("Cannot remove old trace %s: %s", old, e)
+
+
+# Process-wide tracer shared by the service and hardware modules
+TRACER = Tracer()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+r"""
+Kernel Uevent Listener
+Device add/remove/change notifications from a NETLINK_KOBJECT_UEVENT socket
+
+The kernel broadcasts a uevent for every device change; listening on the
+netlink socket lets the service react to monitor hotplug (drm "change"
+events with HOTPLUG=1, i2c adapters appearing with a dock) instead of
+re-detecting on a timer. Kernel messages look like:
+    
+    change@/devices/pci0000:00/0000:00:02.0/drm/card1\0ACTION=change\0
+    DEVPATH=/devices/pci0000:00/0000:00:02.0/drm/card1\0SUBSYSTEM=drm\0
+    HOTPLUG=1\0SEQNUM=4711\0
+
+The listener is non-blocking and meant to be driven by a main-loop fd
+watch: call receive() whenever fileno() is readable.
+
+A path instead of the netlink socket binds a Unix datagram socket there
+that accepts messages in the same format (ddc_simulator sends its
+hotplug events to one).
+"""
+
+import errno
+import logging
+import os
+import socket
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_GROUP = 1  # raw kernel events (group 2 carries udev's re-broadcasts)
+RECV_SIZE = 16 * 1024
+
+
+class UeventError(Exception):
+    """Raised when the uevent socket cannot be opened"""
+    pass
+
+
+@dataclass
+class Uevent:
+    """One kernel uevent"""
+    action: str  # add, remove, change, bind, unbind...
+    devpath: str  # sysfs path below /sys
+    subsystem: str
+    env: Dict[str, str] = field(default_factory=dict)
+    
+    @property
+    def name(self) -> str:
+        """Device name (last devpath component, e.g. "card1-DP-1")"""
+        return self.devpath.rsplit('/', 1)[-1]
+
+
+def parse_uevent(data: bytes) -> Optional[Uevent]:
+    """
+    Parse a kernel uevent message
+    
+    Returns:
+        The event, or None for messages that are not kernel uevents
+    """
+    header, _, body = data.partition(b"\0")
+    if b"@" not in header:
+        return None  # e.g. a udev ("libudev") message
+    
+    env = {}
+    for item in body.split(b"\0"):
+        key, sep, value = item.partition(b"=")
+        if sep:
+            env[key.decode(errors='replace')] = value.decode(errors='replace')
+    action, _, devpath = header.decode(errors='replace').partition("@")
+    return Uevent(
+        action=env.get('ACTION', action),
+        devpath=env.get('DEVPATH', devpath),
+        subsystem=env.get('SUBSYSTEM', ''),
+        env=env,
+    )
+
+
+class UeventListener:
+    """Non-blocking uevent receiver filtered by subsystem"""
+    
+    def __init__(self, subsystems: Iterable[str], path: Optional[str] = None):
+        """
+        Open the uevent socket
+        
+        Args:
+            subsystems: Subsystems to report (e.g. "drm", "i2c")
+            path: Simulated source: bind a Unix datagram socket here
+                  instead of the kernel netlink socket
+        
+        Raises:
+            UeventError: If the socket cannot be opened
+        """
+        self.subsystems = frozenset(subsystems)
+        self._path = path
+        try:
+            if path is not None:
+                if os.path.exists(path):
+                    os.unlink(path)
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._sock.bind(path)
+            else:
+                self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM,
+                                           NETLINK_KOBJECT_UEVENT)
+                self._sock.bind((0, KERNEL_GROUP))  # port id assigned by the kernel
+            self._sock.setblocking(False)
+        except (OSError, AttributeError) as e:  # AttributeError: no AF_NETLINK
+            raise UeventError(f"Cannot open uevent socket: {e}")
+    
+    def fileno(self) -> int:
+        return self._sock.fileno()
+    
+    def receive(self) -> List[Uevent]:
+        """
+        Read all pending events of the selected subsystems
+        
+        If the kernel dropped events because the socket buffer was full,
+        a "change" event with an empty devpath is reported for each
+        subsystem so that callers rescan.
+        """
+        events = []
+        while True:
+            try:
+                data = self._sock.recv(RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    logger.warning("uevent receive failed: %s", e)
+                    break
+                logger.info("uevents were dropped, rescanning")
+                events.extend(Uevent('change', '', subsystem) for subsystem in self.subsystems)
+                continue
+            event = parse_uevent(data)
+            if event is not None and event.subsystem in self.subsystems:
+                events.append(event)
+        return events
+    
+    def close(self):
+        """Close the socket"""
+        self._sock.close()
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+
+
+if __name__ == "__main__":
+    import select
+    
+    listener = UeventListener(('drm', 'i2c'))
+    print("Listening for drm/i2c uevents (Ctrl+C to stop)")
+    try:
+        while True:
+            select.select([listener], [], [])
+            for event in listener.receive():
+                print(f"{event.action:<8} {event.subsystem:<5} {event.devpath} {event.env.get('HOTPLUG', '')}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
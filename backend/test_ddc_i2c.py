@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the DDC/CI packet codec and DDCDevice on the simulated I2C bus
+
+Run with: python3 -m pytest backend/test_ddc_i2c.py
+"""
+
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ddc_i2c import (DDCDevice, DEST_ADDR, REPLY_SEED, I2CError, UnsupportedVCPError, checksum,
+                     decode_capabilities_reply, decode_vcp_reply, encode_request)
+from ddc_profiles import parse_capabilities
+from ddc_simulator import DDCBusSimulator
+
+
+def vcp_reply(code: int, current: int, maximum: int, result: int = 0) -> bytes:
+    """Get VCP reply as a display sends it"""
+    reply = bytes([DEST_ADDR, 0x88, 0x02, result, code, 0x00]) + struct.pack(">HH", maximum, current)
+    return reply + bytes([checksum(REPLY_SEED, reply)])
+
+
+def caps_reply(offset: int, data: bytes) -> bytes:
+    """Capabilities reply fragment as a display sends it"""
+    reply = bytes([DEST_ADDR, 0x80 | (len(data) + 3), 0xE3]) + struct.pack(">H", offset) + data
+    return reply + bytes([checksum(REPLY_SEED, reply)])
+
+
+def test_encode_request():
+    # Get VCP 0x10 as listed in the DDC/CI standard
+    assert encode_request(bytes([0x01, 0x10])) == bytes([0x51, 0x82, 0x01, 0x10, 0xAC])
+
+
+def test_decode_vcp_reply():
+    assert decode_vcp_reply(vcp_reply(0x10, 75, 100), 0x10) == (75, 100)
+    assert decode_vcp_reply(vcp_reply(0xDF, 0x0201, 0), 0xDF) == (0x0201, 0)
+
+
+def test_decode_vcp_reply_null_message():
+    with pytest.raises(I2CError, match="null message"):
+        decode_vcp_reply(bytes([DEST_ADDR, 0x80, 0xBE]), 0x10)
+
+
+def test_decode_vcp_reply_bad_checksum():
+    reply = bytearray(vcp_reply(0x10, 75, 100))
+    reply[-1] ^= 0xFF
+    with pytest.raises(I2CError, match="checksum"):
+        decode_vcp_reply(bytes(reply), 0x10)
+
+
+def test_decode_vcp_reply_other_code():
+    with pytest.raises(I2CError, match="Unexpected"):
+        decode_vcp_reply(vcp_reply(0x12, 50, 100), 0x10)
+
+
+def test_decode_vcp_reply_unsupported():
+    with pytest.raises(UnsupportedVCPError):
+        decode_vcp_reply(vcp_reply(0x99, 0, 0, result=1), 0x99)
+
+
+def test_decode_vcp_reply_truncated():
+    with pytest.raises(I2CError, match="Malformed"):
+        decode_vcp_reply(vcp_reply(0x10, 75, 100)[:8], 0x10)
+
+
+@pytest.fixture
+def sim():
+    with DDCBusSimulator(monitors=1, i2c=True, jitter=0.0) as sim:
+        yield sim
+
+
+@pytest.fixture
+def device(sim):
+    device = DDCDevice(str(sim.directory / "dev" / "i2c-5"))
+    yield device
+    device.close()
+
+
+def test_device_get_and_set(sim, device):
+    assert device.get_vcp(0x10) == (75, 100)
+    device.set_vcp(0x10, 40)
+    assert device.get_vcp(0x10) == (40, 100)
+    assert sim.get_vcp(1) == 40
+    assert device.failed_attempts == 0
+
+
+def test_device_retries_failed_transfers(sim, device):
+    sim.configure(failure_rate=1.0)
+    with pytest.raises(I2CError):
+        device.get_vcp(0x10)
+    assert device.failed_attempts == DDCDevice.RETRIES
+
+
+def test_device_unsupported_code_is_not_retried(sim, device):
+    transfers = sim.i2c_transfer_count()
+    with pytest.raises(UnsupportedVCPError):
+        device.get_vcp(0x99)
+    assert device.failed_attempts == 0
+    assert sim.i2c_transfer_count() - transfers == 2  # one request, one reply
+
+
+def test_device_open_fails(tmp_path):
+    with pytest.raises(I2CError):
+        DDCDevice(str(tmp_path / "i2c-9"))
+
+
+def test_device_closed(device):
+    device.close()
+    with pytest.raises(I2CError):
+        device.get_vcp(0x10)
+
+
+def test_decode_capabilities_reply():
+    assert decode_capabilities_reply(caps_reply(32, b"vcp(10 12)"), 32) == b"vcp(10 12)"
+    assert decode_capabilities_reply(caps_reply(64, b""), 64) == b""
+    with pytest.raises(I2CError):
+        decode_capabilities_reply(caps_reply(0, b"vcp(10 12)"), 32)
+    with pytest.raises(I2CError):
+        decode_capabilities_reply(bytes([DEST_ADDR, 0x80, 0xBE]), 0)
+
+
+def test_device_capabilities(device):
+    features, version = parse_capabilities(device.capabilities())
+    assert 0x10 in features
+    assert version == "2.1"
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Tests for DDCController
+
+Run with: python3 -m pytest backend/test_ddc_monitor.py
+"""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ddc_lib import LibDDCError, LibUnsupportedVCPError
+from ddc_monitor import DDCController, DDCMonitor
+from ddc_simulator import DDCBusSimulator
+
+
+@pytest.fixture
+def controller(tmp_path):
+    return DDCController(ddcutil=sys.executable, native=False, library=False, root=str(tmp_path))
+
+
+class FakeLibrary:
+    """LibDDCUtil stand-in recording handle use"""
+    
+    def __init__(self, buses):
+        self.displays = {
+            i + 1: SimpleNamespace(dispno=i + 1, bus=bus, mfg_id="DEL", model="U2720Q",
+                                   serial=f"SIM{i + 1}", vcp_version="2.1")
+            for i, bus in enumerate(buses)
+        }
+        self.open = True
+        self.events = []
+    
+    def detect(self, redetect=False):
+        if redetect:
+            self.events.append('close')
+            self.open = False
+            time.sleep(0.05)
+            self.open = True
+        return sorted(self.displays.values(), key=lambda d: d.dispno)
+    
+    def get_vcp(self, dispno, code):
+        assert self.open, "handle used while closed"
+        self.events.append('get')
+        time.sleep(0.2)
+        assert self.open, "handle closed during a call"
+        self.events.append('got')
+        return 50, 100
+
+
+def test_library_redetect_waits_for_calls_in_flight(controller):
+    controller._library = FakeLibrary([5])
+    assert [m.id for m in controller._library_detect()] == [1]  # first scan, no redetect
+    controller._monitors_cache = [DDCMonitor(1, "/dev/i2c-5", "DEL", "U2720Q", "SIM1", "2.1")]
+    
+    reader = threading.Thread(target=controller._library_get, args=(1, 0x10))
+    reader.start()
+    time.sleep(0.05)  # reader holds the display lock now
+    controller._library_detect()
+    reader.join()
+    assert controller._library.events == ['get', 'got', 'close']
+
+
+@pytest.fixture
+def sim():
+    with DDCBusSimulator(monitors=2, jitter=0.0) as sim:
+        yield sim
+
+
+@pytest.fixture
+def sim_controller(sim):
+    controller = DDCController(ddcutil=sim.ddcutil_path, native=False, library=False,
+                               root=str(sim.directory))
+    assert len(controller.detect_monitors(use_cache=False)) == 2
+    return controller
+
+
+def test_brightness_queue_latest_wins(sim, sim_controller):
+    applied = []
+    for value in range(10, 60, 5):
+        sim_controller.request_brightness(1, value, lambda *args: applied.append(args))
+    assert sim_controller.wait_for_writes(10)
+    
+    assert sim.get_vcp(1) == 55
+    assert applied[-1] == (1, 55, True)
+    assert len(applied) < 10  # superseded values were skipped, not written
+    assert sim_controller.get_brightness(1) == 55
+    assert sim.get_vcp(2) == 75  # other display untouched
+
+
+def test_brightness_queue_clamps(sim, sim_controller):
+    sim_controller.request_brightness(2, 150)
+    assert sim_controller.wait_for_writes(10)
+    assert sim.get_vcp(2) == 100
+
+
+def test_brightness_queue_unknown_display_after_invalidate(sim, sim_controller):
+    sim_controller.invalidate_cache()
+    applied = []
+    sim_controller.request_brightness(7, 30, lambda *args: applied.append(args))
+    sim_controller.request_brightness(1, 30, lambda *args: applied.append(args))
+    assert sim_controller.wait_for_writes(10)
+    assert sorted(applied) == [(1, 30, True), (7, 30, False)]
+    assert sim.get_vcp(1) == 30
+
+
+def test_set_brightness_all(sim, sim_controller):
+    assert sim_controller.set_brightness_all(30) == {1: (True, 30), 2: (True, 30)}
+    assert sim.get_vcp(1) == sim.get_vcp(2) == 30
+
+
+def test_set_brightness_all_relative(sim, sim_controller):
+    sim.set_vcp(2, 95)
+    assert sim_controller.set_brightness_all(10, relative=True) == {1: (True, 85), 2: (True, 100)}
+    assert sim_controller.set_brightness_all(-50, relative=True) == {1: (True, 35), 2: (True, 50)}
+    assert sim.get_vcp(1) == 35
+
+
+def test_set_brightness_all_selected_displays(sim, sim_controller):
+    assert sim_controller.set_brightness_all(20, display_ids=[2, 9]) == {2: (True, 20)}
+    assert sim.get_vcp(1) == 75
+    assert sim_controller.set_brightness_all(20, display_ids=[9]) == {}
+
+
+def test_set_brightness_all_runs_buses_concurrently(sim, sim_controller):
+    sim.configure(latency_ms={'setvcp': 400})
+    start = time.monotonic()
+    sim_controller.set_brightness_all(40)
+    # Two displays on two buses: about one write, not two
+    assert time.monotonic() - start < 0.75
+
+
+def test_set_brightness_all_lands_after_queued_writes(sim, sim_controller):
+    sim.configure(latency_ms={'setvcp': 200})
+    applied = []
+    sim_controller.request_brightness(1, 20, lambda *args: applied.append(args))
+    time.sleep(0.05)  # the worker is writing 20 now
+    sim_controller.request_brightness(1, 25, lambda *args: applied.append(args))
+    assert sim_controller.set_brightness_all(80) == {1: (True, 80), 2: (True, 80)}
+    assert sim_controller.wait_for_writes(10)
+    # The queued 25 was superseded, the in-flight 20 landed first
+    assert applied == [(1, 20, True)]
+    assert sim.get_vcp(1) == 80
+    assert sim_controller.get_brightness(1) == 80
+
+
+def test_library_display_is_matched_by_bus(controller):
+    # libddcutil numbered a monitor that DRM enumeration left out
+    controller._library = SimpleNamespace(displays={
+        1: SimpleNamespace(dispno=1, bus=5),
+        2: SimpleNamespace(dispno=2, bus=6),
+    })
+    controller._library_scanned = True
+    controller._monitors_cache = [DDCMonitor(1, "/dev/i2c-6", "DEL", "U2720Q", "", "2.1")]
+    assert controller._library_dispno(1) == 2
+    assert controller._library_dispno(2) is None
+    
+    controller._monitors_cache = [DDCMonitor(1, "/dev/i2c-7", "DEL", "U2720Q", "", "2.1")]
+    assert controller._library_dispno(1) is None
+
+
+def test_detect_identical_monitors(sim):
+    # A pair of the same model without serial numbers has the same EDID
+    drm = sim.directory / "sys" / "class" / "drm"
+    (drm / "card1-DP-2" / "edid").write_bytes((drm / "card1-DP-1" / "edid").read_bytes())
+    controller = DDCController(ddcutil=sim.ddcutil_path, native=False, library=False,
+                               root=str(sim.directory))
+    
+    monitors = controller.detect_monitors()
+    assert [m.bus for m in monitors] == ["/dev/i2c-5", "/dev/i2c-6"]
+    assert monitors[0].edid_key == monitors[1].edid_key
+    assert controller._profile(1) is not controller._profile(2)
+    
+    assert controller.set_brightness(1, 20)
+    assert controller.set_brightness(2, 40)
+    assert (sim.get_vcp(1), sim.get_vcp(2)) == (20, 40)
+    
+    # Again from the saved profile, without probing
+    controller = DDCController(ddcutil=sim.ddcutil_path, native=False, library=False,
+                               root=str(sim.directory))
+    assert [m.bus for m in controller.detect_monitors()] == ["/dev/i2c-5", "/dev/i2c-6"]
+    assert controller._profile(1).bus == "/dev/i2c-5"
+    assert controller._profile(2).bus == "/dev/i2c-6"
+
+
+def test_refresh_monitors_renumbers(sim, sim_controller):
+    sim_controller.set_brightness(2, 30)
+    
+    sim.unplug(1)
+    assert sim_controller.refresh_monitors()
+    monitors = sim_controller.get_cached_monitors()
+    assert [(m.id, m.bus) for m in monitors] == [(1, "/dev/i2c-6")]
+    # The cached brightness moved with the monitor
+    assert sim_controller.get_brightness(1) == 30
+    
+    sim.plug(1)
+    assert sim_controller.refresh_monitors()
+    assert [(m.id, m.bus) for m in sim_controller.get_cached_monitors()] == \
+        [(1, "/dev/i2c-5"), (2, "/dev/i2c-6")]
+    assert sim_controller.get_brightness(2) == 30
+    assert not sim_controller.refresh_monitors()
+
+
+def test_refresh_monitors_probes_silent_monitors_again():
+    with DDCBusSimulator(monitors=2, i2c=True, jitter=0.0) as sim:
+        controller = DDCController(ddcutil=sim.ddcutil_path, native=True, library=False,
+                                   root=str(sim.directory))
+        # Still powering up: nothing answers DDC/CI
+        sim.configure(failure_rate=1.0)
+        assert controller.detect_monitors() == []
+        
+        sim.configure(failure_rate=0.0)
+        assert controller.refresh_monitors()
+        assert [m.bus for m in controller.get_cached_monitors()] == ["/dev/i2c-5", "/dev/i2c-6"]
+        controller.close()
+
+
+def test_parse_terse_getvcp():
+    output = "VCP 10 C 75 100\nVCP 60 SNC x0f\nVCP 62 ERR\nDisplay 1\n"
+    assert DDCController._parse_terse_getvcp(output) == {0x10: (75, 100), 0x60: (0x0f, 0)}
+
+
+@pytest.fixture
+def fast_circuit(monkeypatch):
+    monkeypatch.setattr(DDCController, 'CIRCUIT_BACKOFF', (0.05, 0.1))
+
+
+def fail(controller, display_id, times):
+    for _ in range(times):
+        assert controller._circuit_allows(display_id)
+        controller._circuit_record(display_id, False)
+
+
+def test_circuit_opens_after_consecutive_failures(fast_circuit, controller):
+    fail(controller, 1, DDCController.CIRCUIT_FAILURES - 1)
+    assert controller.get_health()[1].state == 'closed'
+    fail(controller, 1, 1)
+    health = controller.get_health()[1]
+    assert health.state == 'open'
+    assert health.failures == DDCController.CIRCUIT_FAILURES
+    assert 0 < health.retry_in <= 0.05
+    assert not controller._circuit_allows(1)
+    assert controller._circuit_allows(2)  # other displays are not affected
+
+
+def test_success_resets_failure_count(fast_circuit, controller):
+    fail(controller, 1, DDCController.CIRCUIT_FAILURES - 1)
+    controller._circuit_record(1, True)
+    fail(controller, 1, DDCController.CIRCUIT_FAILURES - 1)
+    assert controller.get_health()[1].state == 'closed'
+
+
+def test_circuit_lets_one_probe_through(fast_circuit, controller):
+    fail(controller, 1, DDCController.CIRCUIT_FAILURES)
+    time.sleep(0.06)
+    assert controller._circuit_allows(1)
+    assert controller.get_health()[1].state == 'half-open'
+    assert not controller._circuit_allows(1)  # only one probe at a time
+    
+    # A failed probe reopens the circuit with the next backoff
+    controller._circuit_record(1, False)
+    health = controller.get_health()[1]
+    assert health.state == 'open' and health.trips == 2
+    assert 0.05 < health.retry_in <= 0.1
+    
+    time.sleep(0.11)
+    assert controller._circuit_allows(1)
+    controller._circuit_record(1, True)
+    assert controller.get_health() == {}
+
+
+def test_late_failure_does_not_extend_open_circuit(fast_circuit, controller):
+    fail(controller, 1, DDCController.CIRCUIT_FAILURES)
+    retry_at = controller.get_health()[1].retry_at
+    controller._circuit_record(1, False)  # command started before the circuit opened
+    assert controller.get_health()[1].retry_at == retry_at
+
+
+def test_open_circuit_fails_fast():
+    with DDCBusSimulator(monitors=1, failure_rate=1.0, jitter=0.0) as sim:
+        controller = DDCController(ddcutil=sim.ddcutil_path, native=False, library=False,
+                                   root=str(sim.directory))
+        sim.configure(failure_rate=0.0)
+        assert len(controller.detect_monitors(use_cache=False)) == 1
+        sim.configure(failure_rate=1.0)
+        for _ in range(DDCController.CIRCUIT_FAILURES):
+            assert not controller.set_brightness(1, 30)
+        assert controller.get_health()[1].state == 'open'
+        
+        commands = sim.command_count()
+        start = time.monotonic()
+        assert not controller.set_brightness(1, 30)
+        assert controller.get_brightness(1, force=True) == 0
+        assert time.monotonic() - start < 0.05
+        assert sim.command_count() == commands
+
+
+def test_unsupported_codes_do_not_trip_circuit(sim, sim_controller):
+    # Capabilities did not list the features, the monitor answers every
+    # read with "unsupported feature"
+    sim_controller._profile(1).features = []
+    for _ in range(DDCController.CIRCUIT_FAILURES + 1):
+        assert sim_controller.get_vcp_values(1, [0x99, 0x9A]) == {}
+    assert sim_controller.get_health() == {}
+
+
+def test_library_unsupported_codes_do_not_trip_circuit(controller):
+    class Library:
+        displays = {1: SimpleNamespace(dispno=1, bus=5)}
+        
+        def get_vcp(self, dispno, code):
+            if code == 0x9A:
+                raise LibDDCError("getvcp failed: DDCRC_RETRIES")
+            raise LibUnsupportedVCPError("getvcp failed: DDCRC_REPORTED_UNSUPPORTED")
+    
+    controller._library = Library()
+    controller._library_scanned = True
+    controller._monitors_cache = [DDCMonitor(1, "/dev/i2c-5", "DEL", "U2720Q", "", "2.1")]
+    for _ in range(DDCController.CIRCUIT_FAILURES + 1):
+        assert controller.get_vcp_values(1, [0x99, 0x9A]) == {}
+    assert controller.get_health() == {}
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for MCCS capabilities parsing and monitor profile learning
+
+Run with: python3 -m pytest backend/test_ddc_profiles.py
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ddc_profiles import MonitorProfile, MonitorProfileStore, ProfileError, parse_capabilities
+
+
+def test_parse_capabilities():
+    features, version = parse_capabilities(
+        "(prot(monitor)type(lcd)model(X)cmds(01 02 03 0C E3 F3)"
+        "vcp(02 04 10 12 14(05 08 0B) 60(0F 11) DF)mccs_ver(2.1))")
+    assert features == [0x02, 0x04, 0x10, 0x12, 0x14, 0x60, 0xDF]
+    assert version == "2.1"
+
+
+def test_parse_capabilities_without_spaces():
+    features, version = parse_capabilities("(vcp(101260(0F11)D6(0104)))")
+    assert features == [0x10, 0x12, 0x60, 0xD6]
+    assert version == 'Unknown'
+
+
+def test_parse_capabilities_without_vcp():
+    with pytest.raises(ProfileError):
+        parse_capabilities("(prot(monitor)type(lcd))")
+
+
+def profile(**kwargs) -> MonitorProfile:
+    return MonitorProfile(edid_key="key", name="TEST", bus="/dev/i2c-5", vcp_version="2.1", **kwargs)
+
+
+def test_profile_backs_off_on_failure():
+    p = profile()
+    assert p.record(False)
+    assert p.sleep_multiplier == 1.5
+    assert p.failed_multiplier == 1.0
+    assert p.streak == 0
+
+
+def test_profile_shortens_after_successes():
+    p = profile()
+    for _ in range(MonitorProfile.LEARN_SUCCESSES - 1):
+        assert not p.record(True)
+    assert p.record(True)
+    assert p.sleep_multiplier == 0.85
+
+
+def test_profile_stays_above_highest_failure():
+    p = profile(sleep_multiplier=0.3)
+    p.record(False)  # 0.3 fails, backs off to 0.45
+    p.sleep_multiplier = 0.6
+    p.record(False)  # 0.6 fails too
+    for _ in range(100):
+        p.record(True)
+    assert p.failed_multiplier == 0.6
+    assert p.sleep_multiplier >= 0.6 * MonitorProfile.FAILED_MARGIN
+
+
+def test_profile_forgets_old_failure():
+    p = profile()
+    p.record(False)
+    for _ in range(MonitorProfile.LEARN_SUCCESSES * MonitorProfile.FORGET_FAILURE):
+        p.record(True)
+    assert p.failed_multiplier == 0.0
+
+
+def test_profile_dict_round_trip():
+    p = profile(features=[0x10, 0x12], sleep_multiplier=0.7)
+    assert MonitorProfile.from_dict(p.to_dict()) == p
+    assert p.supports(0x10) and not p.supports(0x60)
+    assert profile().supports(0x60)  # features unknown
+
+
+def test_profile_store_round_trip(tmp_path):
+    store = MonitorProfileStore(tmp_path / "profiles" / "monitors.json")
+    store.put(profile(features=[0x10], sleep_multiplier=0.7))
+    assert (tmp_path / "profiles" / "monitors.json").exists()
+    assert not (tmp_path / "profiles" / "monitors.tmp").exists()
+    
+    loaded = MonitorProfileStore(tmp_path / "profiles" / "monitors.json")
+    assert len(loaded) == 1
+    assert loaded.get("key") == profile(features=[0x10], sleep_multiplier=0.7)
+
+
+def test_profile_store_ignores_other_versions(tmp_path):
+    path = tmp_path / "monitors.json"
+    path.write_text(json.dumps({'version': 99, 'monitors': [profile().to_dict()]}))
+    assert len(MonitorProfileStore(path)) == 0
+    path.write_text("not json")
+    assert len(MonitorProfileStore(path)) == 0
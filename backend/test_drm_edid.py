@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for EDID parsing and DRM output enumeration
+
+Run with: python3 -m pytest backend/test_drm_edid.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ddc_simulator import DDCBusSimulator, build_edid
+from drm_edid import EDIDError, list_outputs, parse_edid
+
+
+def test_parse_edid():
+    info = parse_edid(build_edid("DEL", 41393, "DELL U2720Q", "SIM1", 7))
+    assert info.manufacturer == "DEL"
+    assert info.product_code == 41393
+    assert info.model == "DELL U2720Q"
+    assert info.serial == "SIM1"
+    assert info.serial_number == 7
+    assert info.year == 2023
+    assert info.name == "DEL DELL U2720Q"
+
+
+def test_parse_edid_ignores_extension_blocks():
+    edid = build_edid("GSM", 1, "LG", "", 0)
+    assert parse_edid(edid + bytes(128)) == parse_edid(edid)
+
+
+def test_edid_key_identifies_monitor():
+    a = parse_edid(build_edid("DEL", 41393, "DELL U2720Q", "SIM1", 7))
+    b = parse_edid(build_edid("DEL", 41393, "DELL U2720Q", "SIM2", 8))
+    assert a.key != b.key
+    assert a.key == parse_edid(build_edid("DEL", 41393, "DELL U2720Q", "SIM1", 7)).key
+
+
+def test_parse_edid_without_descriptors():
+    info = parse_edid(build_edid("BOE", 2455, "", "", 0))
+    assert info.model == '' and info.serial == ''
+    assert info.name == "BOE"
+
+
+def test_parse_edid_bad_checksum():
+    edid = bytearray(build_edid("DEL", 1, "X", "", 0))
+    edid[20] ^= 1
+    with pytest.raises(EDIDError):
+        parse_edid(bytes(edid))
+
+
+def test_parse_edid_bad_header():
+    with pytest.raises(EDIDError):
+        parse_edid(bytes(128))
+    with pytest.raises(EDIDError):
+        parse_edid(build_edid("DEL", 1, "X", "", 0)[:100])
+
+
+def test_list_outputs():
+    with DDCBusSimulator(monitors=2) as sim:
+        outputs = list_outputs(str(sim.directory))
+    # eDP panel and the disconnected HDMI port are left out
+    assert [o.connector for o in outputs] == ["card1-DP-1", "card1-DP-2"]
+    assert [o.bus for o in outputs] == [5, 6]
+    assert outputs[0].edid.serial == "SIM000001"
+
+
+def test_list_outputs_after_unplug():
+    with DDCBusSimulator(monitors=2) as sim:
+        sim.unplug(1)
+        assert [o.bus for o in list_outputs(str(sim.directory))] == [6]
+
+
+def test_list_outputs_without_drm(tmp_path):
+    with pytest.raises(EDIDError):
+        list_outputs(str(tmp_path))
+
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the ACPI interface against the simulated hardware tree
+
+Run with: python3 -m pytest backend/test_legion_acpi.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legion_acpi import ACPIError, LegionACPI
+from legion_simulator import LegionSimulator
+
+
+@pytest.fixture
+def acpi():
+    with LegionSimulator(tick=60) as sim:
+        yield LegionACPI(root=str(sim.root))
+
+
+@pytest.mark.parametrize('profile', ["quiet", "balanced", "performance"])
+def test_power_profile_round_trip(acpi, profile):
+    acpi.set_power_profile(profile)
+    assert acpi.get_power_profile() == profile
+
+
+@pytest.mark.parametrize('result, profile', [
+    ("0x3B01", "quiet"),
+    ("0xFB01", "balanced"),
+    ("0x2B01", "performance"),
+    ("0x3001", "balanced"),  # STD function: firmware default
+    ("0x7B01", "balanced"),  # unknown MMC mode
+])
+def test_power_profile_decode(monkeypatch, acpi, result, profile):
+    monkeypatch.setattr(acpi, '_execute_acpi_call', lambda method, param=None: result)
+    assert acpi.get_power_profile() == profile
+
+
+def test_power_profile_unparsable(monkeypatch, acpi):
+    monkeypatch.setattr(acpi, '_execute_acpi_call',
+                        lambda method, param=None: "Error: AE_NOT_FOUND")
+    with pytest.raises(ACPIError):
+        acpi.get_power_profile()
+
+
+def test_conservation_mode_round_trip(acpi):
+    acpi.set_conservation_mode(True)
+    assert acpi.get_conservation_mode()
+    acpi.set_conservation_mode(False)
+    assert not acpi.get_conservation_mode()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the OpenMetrics textfile exporter
+
+Run with: python3 -m pytest backend/test_legion_exporter.py
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legion_exporter import TextfileExporter
+from legion_metrics import ServiceMetrics
+from legion_sampler import TelemetrySampler
+
+SAMPLE_LINE = re.compile(r'^([a-z_]+)(\{[^}]*\})? (\S+)$')
+
+
+def exporter(tmp_path, sources=None, metrics=None) -> TextfileExporter:
+    sampler = TelemetrySampler(sources or {
+        'battery': lambda: {'capacity': 87, 'power_now': 21.5, 'state': "Discharging",
+                            'manufacturer': 'Sun"wo', 'model_name': "L20M4PC1"},
+        'temperatures': lambda: {'k10temp_Tctl': 61.25},
+        'fans': lambda: {'legion_hwmon_Fan 1': 2400, 'amdgpu_fan1': 0},
+        'ac_online': lambda: True,
+        'power_profile': lambda: "balanced",
+    }, interval=None)
+    sampler.sample()
+    return TextfileExporter(sampler, tmp_path / "legion_power.prom",
+                            metrics=metrics if metrics is not None else ServiceMetrics())
+
+
+def families(text: str):
+    """Family name -> (type, [(sample name, labels, value)])"""
+    result = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            current = result[name] = (metric_type, [])
+        elif line.startswith("#"):
+            continue
+        else:
+            match = SAMPLE_LINE.match(line)
+            assert match, f"Malformed sample line: {line}"
+            current[1].append((match.group(1), match.group(2) or '', match.group(3)))
+    return result
+
+
+def test_render_telemetry(tmp_path):
+    text = exporter(tmp_path).render()
+    assert text.endswith("# EOF\n")
+    parsed = families(text)
+    assert parsed['legion_battery_capacity_percent'] == ('gauge', [
+        ('legion_battery_capacity_percent', '', '87')])
+    assert ('legion_fan_speed_rpm', '{fan="amdgpu_fan1"}', '0') in parsed['legion_fan_speed_rpm'][1]
+    assert parsed['legion_ac_online'][1] == [('legion_ac_online', '', '1')]
+    profiles = {labels: value for _, labels, value in parsed['legion_power_profile'][1]}
+    assert profiles == {'{profile="quiet"}': '0', '{profile="balanced"}': '1',
+                        '{profile="performance"}': '0'}
+    # Label values are escaped
+    assert 'manufacturer="Sun\\"wo"' in text
+
+
+def test_render_service_metrics(tmp_path):
+    metrics = ServiceMetrics()
+    metrics.observe('dbus.GetBatteryInfo', 0.3)
+    metrics.observe('dbus.GetBatteryInfo', 4.0, error=True)
+    metrics.inc('resume.count')
+    parsed = families(exporter(tmp_path, metrics=metrics).render())
+    
+    metric_type, samples = parsed['legion_operation_duration_seconds']
+    assert metric_type == 'histogram'
+    buckets = [int(value) for name, _, value in samples if name.endswith('_bucket')]
+    assert buckets == sorted(buckets) and buckets[-1] == 2
+    assert ('legion_operation_duration_seconds_count', '{op="dbus.GetBatteryInfo"}', '2') in samples
+    
+    # Counter families carry no _total suffix, their samples do
+    assert parsed['legion_operation_errors'] == ('counter', [
+        ('legion_operation_errors_total', '{op="dbus.GetBatteryInfo"}', '1')])
+    assert parsed['legion_service_events'] == ('counter', [
+        ('legion_service_events_total', '{name="resume.count"}', '1')])
+    assert not any(name.endswith('_total') for name in parsed)
+
+
+def test_render_without_samples(tmp_path):
+    sampler = TelemetrySampler({}, interval=None)
+    text = TextfileExporter(sampler, tmp_path / "out.prom", metrics=ServiceMetrics()).render()
+    assert text == "# EOF\n"
+
+
+def test_write_replaces_file(tmp_path):
+    exp = exporter(tmp_path)
+    exp.write()
+    exp.write()
+    assert exp.path.read_text() == exp.render()
+    assert oct(exp.path.stat().st_mode & 0o777) == oct(0o644)
+    assert os.listdir(tmp_path) == ["legion_power.prom"]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for rate-limited, queue-based logging
+
+Run with: python3 -m pytest backend/test_legion_logging.py
+"""
+
+import logging
+import os
+import queue
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import legion_logging
+from legion_logging import DroppingQueueHandler, RateLimitFilter, configure_logging, stop_logging
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(legion_logging.time, 'monotonic', clock)
+    return clock
+
+
+def record(msg, *args, level=logging.WARNING, name='test'):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_repeats_are_suppressed_within_interval(clock):
+    limiter = RateLimitFilter(interval=60)
+    assert limiter.filter(record("EC read failed: %s", 5))
+    clock.now += 10
+    assert not limiter.filter(record("EC read failed: %s", 5))
+    assert not limiter.filter(record("EC read failed: %s", 5))
+    # Different message, level or logger is not a repeat
+    assert limiter.filter(record("EC read failed: %s", 6))
+    assert limiter.filter(record("EC read failed: %s", 5, level=logging.ERROR))
+    assert limiter.filter(record("EC read failed: %s", 5, name='other'))
+
+
+def test_repeat_count_reported_after_interval(clock):
+    limiter = RateLimitFilter(interval=60)
+    limiter.filter(record("EC read failed: %s", 5))
+    for _ in range(3):
+        limiter.filter(record("EC read failed: %s", 5))
+    clock.now += 61
+    late = record("EC read failed: %s", 5)
+    assert limiter.filter(late)
+    assert late.getMessage() == "EC read failed: 5 (repeated 3 more times)"
+    
+    clock.now += 61
+    quiet = record("EC read failed: %s", 5)
+    assert limiter.filter(quiet)
+    assert quiet.getMessage() == "EC read failed: 5"
+
+
+def test_low_levels_are_not_limited(clock):
+    limiter = RateLimitFilter(interval=60)
+    for _ in range(3):
+        assert limiter.filter(record("tick", level=logging.INFO))
+
+
+def test_tracked_messages_are_bounded(clock):
+    limiter = RateLimitFilter(interval=60)
+    for i in range(RateLimitFilter.MAX_TRACKED + 10):
+        limiter.filter(record("message %s", i))
+    assert len(limiter._seen) == RateLimitFilter.MAX_TRACKED
+    # The oldest entry was forgotten, so it is logged again
+    assert limiter.filter(record("message %s", 0))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(record("message %s", i))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_configure_logging_writes_through_listener(tmp_path, restore_root_logger):
+    log_file = tmp_path / "logs" / "service.log"
+    configure_logging(log_file, rate_limit_interval=60)
+    log = logging.getLogger('legion.test')
+    for _ in range(3):
+        log.warning("fan curve rejected")
+    log.info("started")
+    stop_logging()
+    
+    lines = log_file.read_text().splitlines()
+    assert [line.rsplit(' - ', 1)[1] for line in lines] == ["fan curve rejected", "started"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for latency histograms and the metrics registry
+
+Run with: python3 -m pytest backend/test_legion_metrics.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legion_metrics import LatencyHistogram, ServiceMetrics, format_metrics, instrumented
+
+
+def histogram(*durations_ms) -> LatencyHistogram:
+    h = LatencyHistogram()
+    for duration in durations_ms:
+        h.observe(duration)
+    return h
+
+
+def test_empty_histogram():
+    h = LatencyHistogram()
+    assert h.percentile(50) == 0.0
+    assert h.summary()['mean_ms'] == 0.0
+
+
+def test_percentile_within_one_bucket():
+    h = histogram(*range(1, 101))
+    # Exact: p50 = 50, p95 = 95, p99 = 99 - estimates stay inside their bucket
+    assert 25 < h.percentile(50) <= 50
+    assert 50 < h.percentile(95) <= 100
+    assert 50 < h.percentile(99) <= 100
+    assert h.percentile(100) == 100
+    assert h.percentile(0) == 1
+
+
+def test_percentile_is_monotonic():
+    h = histogram(0.02, 0.3, 0.3, 4, 12, 12, 80, 900, 2000)
+    values = [h.percentile(q) for q in range(0, 101, 5)]
+    assert values == sorted(values)
+
+
+def test_percentile_clamped_to_observed_range():
+    h = histogram(3.0)
+    assert h.percentile(1) == h.percentile(50) == h.percentile(99) == 3.0
+
+
+def test_percentile_above_last_bucket():
+    h = histogram(45000, 60000)
+    assert 30000 <= h.percentile(50) <= 60000
+    assert h.percentile(100) == 60000
+
+
+def test_bucket_bounds_are_inclusive():
+    h = histogram(1.0)
+    assert h.counts[LatencyHistogram.BUCKETS_MS.index(1)] == 1
+
+
+def test_summary_and_copy():
+    h = histogram(10, 20, 30)
+    h.observe(40, error=True)
+    copy = h.copy()
+    h.observe(1000)
+    summary = copy.summary()
+    assert summary['count'] == 4
+    assert summary['errors'] == 1
+    assert summary['mean_ms'] == 25
+    assert summary['max_ms'] == 40
+
+
+def test_timed_counts_exceptions_as_errors():
+    metrics = ServiceMetrics()
+    with metrics.timed('op'):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.timed('op'):
+            raise ValueError()
+    with metrics.timed('op') as timer:
+        timer.error = True
+    summary = metrics.snapshot()['operations']['op']
+    assert summary['count'] == 3
+    assert summary['errors'] == 2
+
+
+def test_instrumented_keeps_signature():
+    import inspect
+    
+    @instrumented('test.')
+    def method(self, value, sender=None):
+        return value
+    
+    assert list(inspect.signature(method).parameters) == ['self', 'value', 'sender']
+    assert method(None, 5) == 5
+
+
+def test_format_metrics():
+    metrics = ServiceMetrics()
+    metrics.observe('dbus.GetBatteryInfo', 2.0)
+    metrics.set_gauge('restore.last_ms', 12.5)
+    metrics.inc('resume.count')
+    text = format_metrics(metrics.snapshot())
+    assert "dbus.GetBatteryInfo" in text
+    assert "restore.last_ms" in text and "12.50" in text
+    assert "resume.count" in text
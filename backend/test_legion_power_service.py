@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for LegionPowerService against the simulated hardware tree
+
+Needs dbus-python and PyGObject; the service is not exported on a bus.
+
+Run with: python3 -m pytest backend/test_legion_power_service.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+pytest.importorskip("dbus")
+pytest.importorskip("gi")
+
+import dbus
+
+from ddc_simulator import DDCBusSimulator
+from legion_metrics import METRICS
+from legion_power_service import LegionPowerService
+from legion_simulator import LegionSimulator
+from legion_snapshot import StateSnapshot
+
+
+@pytest.fixture
+def sim(monkeypatch):
+    with LegionSimulator(tick=60) as sim:
+        monkeypatch.setenv('LEGION_POWER_ROOT', str(sim.root))
+        monkeypatch.setenv('LEGION_DDCUTIL', str(sim.root / "no-ddcutil"))
+        monkeypatch.setenv('LEGION_DDC_LIBRARY', '0')
+        yield sim
+
+
+@pytest.fixture
+def service(sim, tmp_path):
+    return LegionPowerService(None, snapshot=StateSnapshot(tmp_path / "snapshot.json"),
+                              config_dir=tmp_path / "config")
+
+
+@pytest.fixture
+def ddc_sim(sim, monkeypatch):
+    with DDCBusSimulator(directory=sim.root, monitors=2, jitter=0.0) as ddc_sim:
+        monkeypatch.setenv('LEGION_DDCUTIL', ddc_sim.ddcutil_path)
+        monkeypatch.setenv('LEGION_DDC_NATIVE', '0')
+        yield ddc_sim
+
+
+@pytest.fixture
+def ddc_service(ddc_sim, tmp_path):
+    return LegionPowerService(None, snapshot=StateSnapshot(tmp_path / "snapshot.json"),
+                              config_dir=tmp_path / "config")
+
+
+def test_diff_state():
+    desired = {'conservation_mode': True, 'fan_mode': 'auto', 'power_profile': 'quiet'}
+    current = {'conservation_mode': True, 'fan_mode': 'quiet'}
+    # Unreadable features (power_profile) are always written
+    assert LegionPowerService._diff_state(desired, current) == {
+        'fan_mode': 'auto', 'power_profile': 'quiet'}
+    assert LegionPowerService._diff_state(desired, desired) == {}
+
+
+def test_restore_writes_only_differences(sim, service):
+    service.config.set('conservation_mode_enabled', True)
+    service.config.set('power_profile', 'performance')
+    
+    applied = service._restore_settings()
+    assert applied == {'conservation_mode': True, 'power_profile': 'performance'}
+    assert service.acpi.get_power_profile() == 'performance'
+    assert service.sysfs.get_conservation_mode()
+    
+    # Hardware now matches the config: nothing is written again
+    calls = sim.acpi_calls
+    assert service._restore_settings() == {}
+    assert sim.acpi_calls - calls == 1  # the DYTC query
+
+
+def test_set_monitor_brightness_checks_display(ddc_sim, ddc_service):
+    ddc_service.GetExternalMonitors()
+    with pytest.raises(dbus.exceptions.DBusException, match="Unknown display 9"):
+        ddc_service.SetMonitorBrightness(9, 30)
+    ddc_service.SetMonitorBrightness(2, 30)
+    assert ddc_service.ddc.wait_for_writes(10)
+    assert ddc_sim.get_vcp(2) == 30
+
+
+def test_set_monitor_brightness_after_refresh(ddc_sim, ddc_service):
+    ddc_service.GetExternalMonitors()
+    ddc_service.RefreshExternalMonitors()
+    # The monitor list is not known right now: the write is queued and
+    # the display checked on the worker
+    ddc_service.SetMonitorBrightness(1, 40)
+    assert ddc_service.ddc.wait_for_writes(10)
+    assert ddc_sim.get_vcp(1) == 40
+
+
+def test_monitors_changed_is_instrumented(ddc_sim, ddc_service):
+    ddc_service.GetExternalMonitors()
+    operations = METRICS.snapshot()['operations']
+    before = operations.get('signal.MonitorsChanged', {}).get('count', 0)
+    ddc_service._emit_monitors_changed()
+    assert METRICS.snapshot()['operations']['signal.MonitorsChanged']['count'] == before + 1
+
+
+def test_get_monitor_features_replies_from_worker(ddc_sim, ddc_service):
+    ddc_service.GetExternalMonitors()
+    ddc_sim.configure(latency_ms={'getvcp': 300})
+    done = threading.Event()
+    replies = []
+    
+    start = time.monotonic()
+    ddc_service.GetMonitorFeatures(1, reply_handler=lambda r: (replies.append(r), done.set()),
+                                   error_handler=lambda e: (replies.append(e), done.set()))
+    assert time.monotonic() - start < 0.1  # the main loop is not blocked
+    assert done.wait(20)
+    assert replies[0]['brightness'] == 75
+    assert replies[0]['brightness_max'] == 100
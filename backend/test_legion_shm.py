@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-memory telemetry layout
+
+Run with: python3 -m pytest backend/test_legion_shm.py
+"""
+
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legion_shm import (DATA_SIZE, HEADER_SIZE, LABEL_SIZE, RECORD_SIZE, TRAILER_OFFSET,
+                        ShmError, TelemetryShmReader, TelemetryShmWriter, decode, encode)
+
+SAMPLE = {
+    'timestamp': 1700000000.5,
+    'battery': {
+        'capacity': 87, 'cycle_count': 112, 'voltage': 16.9, 'power_now': 21.5,
+        'energy_now': 68.1, 'energy_full': 78.3, 'energy_full_design': 80.0,
+        'health': 97.9, 'state': "Discharging", 'time_remaining_minutes': 190,
+    },
+    'temperatures': {'k10temp_Tctl': 61.25, 'amdgpu_edge': 48.0},
+    # Same label on two hwmon devices: distinct once prefixed
+    'fans': {'legion_hwmon_Fan 1': 2400, 'amdgpu_fan1': 0},
+    'ac_online': False,
+    'power_profile': "balanced",
+}
+
+
+def test_layout_matches_applet():
+    # telemetryShm.js hard-codes these offsets
+    assert HEADER_SIZE == 64
+    assert TRAILER_OFFSET == 576
+    assert RECORD_SIZE == 584
+    assert LABEL_SIZE == 32
+    assert struct.calcsize("<d2i6d2i4B") + 8 * (LABEL_SIZE + 4) == 364
+
+
+def test_round_trip():
+    data = encode(SAMPLE)
+    assert len(data) == DATA_SIZE
+    decoded = decode(data, 0)
+    assert decoded['timestamp'] == SAMPLE['timestamp']
+    assert decoded['temperatures'] == SAMPLE['temperatures']
+    assert decoded['fans'] == SAMPLE['fans']
+    assert decoded['ac_online'] is False
+    assert decoded['power_profile'] == "balanced"
+    battery = decoded['battery']
+    assert battery['capacity'] == 87
+    assert battery['state'] == "Discharging"
+    assert battery['time_remaining_minutes'] == 190
+    assert 'time_to_full_minutes' not in battery
+
+
+def test_empty_sample():
+    decoded = decode(encode({}), 0)
+    assert decoded['temperatures'] == {} and decoded['fans'] == {}
+    assert decoded['ac_online'] is None
+    assert decoded['power_profile'] is None
+    assert decoded['battery']['state'] == "Unknown"
+
+
+def test_long_labels_are_truncated():
+    label = "x" * 40
+    decoded = decode(encode({'temperatures': {label: 50.0}}), 0)
+    assert decoded['temperatures'] == {label[:LABEL_SIZE - 1]: 50.0}
+
+
+def test_writer_and_reader(tmp_path):
+    path = tmp_path / "telemetry"
+    writer = TelemetryShmWriter(path)
+    try:
+        with TelemetryShmReader(path) as reader:
+            assert reader.read() is None
+            writer.write(SAMPLE)
+            assert reader.sequence == 2
+            assert reader.read()['fans'] == SAMPLE['fans']
+    finally:
+        writer.close()
+    assert not path.exists()
+
+
+def test_reader_rejects_other_layout(tmp_path):
+    path = tmp_path / "telemetry"
+    path.write_bytes(bytes(RECORD_SIZE))
+    with pytest.raises(ShmError):
+        TelemetryShmReader(path)
+
+
+def test_writer_does_not_follow_planted_symlink(tmp_path):
+    victim = tmp_path / "victim"
+    victim.write_text("important")
+    path = tmp_path / "telemetry"
+    path.symlink_to(victim)
+    
+    writer = TelemetryShmWriter(path)
+    try:
+        assert victim.read_text() == "important"
+        assert not path.is_symlink()
+        assert path.stat().st_size == RECORD_SIZE
+    finally:
+        writer.close()
+
+
+def test_writer_replaces_stale_segment(tmp_path):
+    path = tmp_path / "telemetry"
+    path.write_bytes(b"stale")
+    writer = TelemetryShmWriter(path)
+    try:
+        writer.write(SAMPLE)
+        with TelemetryShmReader(path) as reader:
+            assert reader.read()['temperatures'] == SAMPLE['temperatures']
+    finally:
+        writer.close()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the NDJSON control socket
+
+The service's executor is replaced by a plain function, so these run
+without D-Bus.
+
+Run with: python3 -m pytest backend/test_legion_socket.py
+"""
+
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legion_sampler import TelemetrySampler
+from legion_socket import OWNER_PREFIX, ControlSocketServer
+from legion_subscriptions import SubscriptionManager
+
+METHODS = {
+    'GetFanMode': lambda: "auto",
+    'Echo': lambda *params: list(params),
+}
+
+
+def execute(commands):
+    """Stand-in for the service's main-loop executor"""
+    results = []
+    for method, params in commands:
+        if method in METHODS:
+            results.append((True, METHODS[method](*params)))
+        else:
+            results.append((False, f"Unknown method: {method}"))
+    future = concurrent.futures.Future()
+    future.set_result(results)
+    return future
+
+
+class Client:
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(3)
+        self.sock.connect(str(path))
+        self.file = self.sock.makefile('rwb')
+    
+    def send(self, *messages):
+        for message in messages:
+            self.file.write(message if isinstance(message, bytes) else json.dumps(message).encode() + b"\n")
+        self.file.flush()
+    
+    def receive(self):
+        return json.loads(self.file.readline())
+    
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+@pytest.fixture
+def sampler():
+    sampler = TelemetrySampler({'battery': lambda: {'capacity': 87},
+                                'fans': lambda: {'legion_hwmon_fan1': 2400}}, interval=None)
+    yield sampler
+    sampler.stop()
+
+
+@pytest.fixture
+def server(tmp_path, sampler):
+    holder = {}
+    subscriptions = SubscriptionManager(sampler, lambda sub, payload: holder['server'].deliver(sub, payload))
+    server = holder['server'] = ControlSocketServer(tmp_path / "control.sock", execute, subscriptions,
+                                                    on_subscribe=sampler.start)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = Client(server.path)
+    yield client
+    client.close()
+
+
+def test_requests_answered_in_order(client):
+    client.send({'id': 1, 'method': 'GetFanMode'},
+                {'id': 2, 'method': 'Echo', 'params': [1, "a"]},
+                {'id': 3, 'method': 'Nope'})
+    assert client.receive() == {'id': 1, 'result': "auto"}
+    assert client.receive() == {'id': 2, 'result': [1, "a"]}
+    assert client.receive() == {'id': 3, 'error': "Unknown method: Nope"}
+
+
+def test_batch(client):
+    client.send([{'id': 1, 'method': 'GetFanMode'}, {'id': 2, 'method': 'Echo', 'params': [5]}])
+    assert client.receive() == [{'id': 1, 'result': "auto"}, {'id': 2, 'result': [5]}]
+
+
+def test_malformed_requests(client):
+    client.send(b"{not json\n", [], {'id': 4, 'params': []},
+                {'id': 5, 'method': 'Echo', 'params': {}})
+    assert "Invalid JSON" in client.receive()['error']
+    assert "Batch" in client.receive()['error']
+    assert client.receive()['id'] == 4
+    assert client.receive() == {'id': 5, 'error': "'params' must be an array"}
+
+
+def test_subscription_delivers_frames(server, sampler, client):
+    assert not sampler.running
+    client.send({'id': 1, 'method': 'Subscribe', 'params': [["battery"], 100]})
+    handle = client.receive()['result']
+    assert sampler.running
+    
+    frame = client.receive()
+    assert frame['telemetry'] == handle
+    assert frame['data']['battery'] == {'capacity': 87}
+    assert 'fans' not in frame['data']
+    
+    client.send({'id': 2, 'method': 'Unsubscribe', 'params': [handle]})
+    while 'id' not in frame:
+        frame = client.receive()
+    assert frame == {'id': 2, 'result': True}
+
+
+def test_invalid_subscription(client):
+    client.send({'id': 1, 'method': 'Subscribe', 'params': [["gpu"], 100]},
+                {'id': 2, 'method': 'Subscribe', 'params': ["battery"]})
+    assert "Unknown metric" in client.receive()['error']
+    assert client.receive() == {'id': 2, 'error': "Invalid params for Subscribe"}
+
+
+def test_disconnect_drops_subscriptions(server, client):
+    client.send({'id': 1, 'method': 'Subscribe', 'params': [["fans"], 1000]})
+    client.receive()
+    assert server._subscriptions.has_owner(f"{OWNER_PREFIX}1")
+    client.close()
+    deadline = time.monotonic() + 2
+    while server.client_count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not server._subscriptions.has_subscriptions()
+
+
+def test_stop_removes_socket(tmp_path, sampler):
+    server = ControlSocketServer(tmp_path / "control.sock", execute,
+                                 SubscriptionManager(sampler, lambda sub, payload: None))
+    server.start()
+    assert server.path.is_socket()
+    assert oct(server.path.stat().st_mode & 0o777) == oct(0o660)
+    server.stop()
+    assert not server.path.exists()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for telemetry subscriptions over the shared sampler
+
+Run with: python3 -m pytest backend/test_legion_subscriptions.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legion_sampler import TelemetrySampler
+from legion_subscriptions import SubscriptionError, SubscriptionManager
+
+
+class Counter:
+    """Telemetry source counting its reads"""
+    
+    def __init__(self):
+        self.reads = 0
+    
+    def __call__(self):
+        self.reads += 1
+        return self.reads
+
+
+@pytest.fixture
+def sources():
+    return {'battery': Counter(), 'temperatures': Counter(), 'fans': Counter()}
+
+
+@pytest.fixture
+def sampler(sources):
+    sampler = TelemetrySampler(sources, interval=None)
+    yield sampler
+    sampler.stop()
+
+
+@pytest.fixture
+def delivered():
+    return []
+
+
+@pytest.fixture
+def manager(sampler, delivered):
+    return SubscriptionManager(sampler, lambda sub, payload: delivered.append((sub.handle, payload)))
+
+
+def test_metrics_sampled_at_fastest_interval(sampler, manager):
+    a = manager.subscribe(':1.1', ['battery', 'temperatures'], 1000)
+    manager.subscribe(':1.2', ['battery'], 200)
+    assert sampler._source_intervals == {'battery': 0.2, 'temperatures': 1.0}
+    
+    manager.unsubscribe(a.handle, ':1.1')
+    assert sampler._source_intervals == {'battery': 0.2}
+    manager.drop_owner(':1.2')
+    assert sampler._source_intervals == {}
+    assert not manager.has_subscriptions()
+
+
+def test_interval_is_clamped(manager):
+    assert manager.subscribe(':1.1', ['fans'], 1).interval == SubscriptionManager.MIN_INTERVAL_MS / 1000
+    assert manager.subscribe(':1.1', ['fans'], 10 ** 9).interval == SubscriptionManager.MAX_INTERVAL_MS / 1000
+
+
+def test_invalid_subscriptions(manager):
+    with pytest.raises(SubscriptionError):
+        manager.subscribe(':1.1', [], 1000)
+    with pytest.raises(SubscriptionError, match="Unknown metric"):
+        manager.subscribe(':1.1', ['battery', 'gpu'], 1000)
+    for _ in range(SubscriptionManager.MAX_PER_OWNER):
+        manager.subscribe(':1.1', ['battery'], 1000)
+    with pytest.raises(SubscriptionError, match="Too many"):
+        manager.subscribe(':1.1', ['battery'], 1000)
+    manager.subscribe(':1.2', ['battery'], 1000)  # the limit is per owner
+
+
+def test_only_owner_may_unsubscribe(manager):
+    sub = manager.subscribe(':1.1', ['battery'], 1000)
+    assert not manager.unsubscribe(sub.handle, ':1.2')
+    assert manager.unsubscribe(sub.handle, ':1.1')
+    assert not manager.unsubscribe(sub.handle, ':1.1')
+
+
+def test_delivers_only_requested_metrics(sampler, manager, delivered):
+    battery = manager.subscribe(':1.1', ['battery'], 1000)
+    manager.subscribe(':1.2', ['fans'], 1000)
+    sampler.sample(['battery'])
+    assert [handle for handle, _ in delivered] == [battery.handle]
+    payload = delivered[0][1]
+    assert set(payload) == {'battery', 'timestamp'}
+    
+    # Not due again until its interval has passed
+    sampler.sample(['battery'])
+    assert len(delivered) == 1
+
+
+def test_shared_sampler_reads_each_source_once_per_tick(sampler, sources, manager, delivered):
+    for owner in (':1.1', ':1.2', ':1.3'):
+        manager.subscribe(owner, ['temperatures'], 100)
+    sampler.start()
+    time.sleep(0.55)
+    sampler.stop()
+    
+    reads = sources['temperatures'].reads
+    assert 4 <= reads <= 7
+    assert sources['battery'].reads == 0  # nobody asked for it
+    # Every subscriber got (almost) every tick
+    for owner_handle in (1, 2, 3):
+        assert sum(1 for handle, _ in delivered if handle == owner_handle) >= reads - 1
+
+
+def test_failing_delivery_does_not_stop_others(sampler):
+    got = threading.Event()
+    
+    def deliver(sub, payload):
+        if sub.owner == ':1.1':
+            raise RuntimeError("client gone")
+        got.set()
+    
+    manager = SubscriptionManager(sampler, deliver)
+    manager.subscribe(':1.1', ['fans'], 1000)
+    manager.subscribe(':1.2', ['fans'], 1000)
+    sampler.sample(['fans'])
+    assert got.is_set()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Tests for kernel uevent parsing
+
+Run with: python3 -m pytest backend/test_legion_uevent.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legion_uevent import parse_uevent
+
+
+def test_parse_uevent():
+    event = parse_uevent(b"change@/devices/pci0000:00/drm/card1\0ACTION=change\0"
+                         b"DEVPATH=/devices/pci0000:00/drm/card1\0SUBSYSTEM=drm\0HOTPLUG=1\0")
+    assert event.action == "change"
+    assert event.subsystem == "drm"
+    assert event.name == "card1"
+    assert event.env['HOTPLUG'] == "1"
+
+
+def test_parse_uevent_header_only():
+    event = parse_uevent(b"add@/devices/platform/i2c-7\0")
+    assert (event.action, event.devpath, event.subsystem) == ("add", "/devices/platform/i2c-7", "")
+    assert event.name == "i2c-7"
+
+
+def test_parse_uevent_ignores_udev_messages():
+    assert parse_uevent(b"libudev\0\xfe\xed\xca\xfe") is None
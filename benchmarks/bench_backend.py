@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the backend hot paths
+
+Measures throughput (ops/sec) and memory per call of the functions the
+service runs on every poll:
+
+- LegionMonitor.get_battery_status / get_temperatures
+- LegionSysfs.get_all_status
+- LegionACPI getters (conservation mode, rapid charge, power profile)
+- DDCController._parse_detect_output on large synthetic detect output
+- LegionConfig.set
+
+Runs against the simulated hardware tree by default, so it works on any
+Linux machine. Results can be saved as JSON and compared against a
+baseline to catch regressions before deployment:
+    
+    python3 bench_backend.py --output baseline.json
+    python3 bench_backend.py --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from ddc_monitor import DDCController
+from legion_acpi import LegionACPI
+from legion_config import LegionConfig
+from legion_monitor import LegionMonitor
+from legion_simulator import LegionSimulator
+from legion_sysfs import LegionSysfs
+
+
+def make_detect_output(displays: int) -> str:
+    """Synthetic 'ddcutil detect' output with the given number of displays"""
+    blocks = []
+    for i in range(1, displays + 1):
+        blocks.append(
+            f"Display {i}\n"
+            f"   I2C bus:  /dev/i2c-{i + 3}\n"
+            f"   DRM connector:           card1-DP-{i}\n"
+            f"   EDID synopsis:\n"
+            f"      Mfg id:               IVM - Iiyama North America\n"
+            f"      Model:                PL2745Q\n"
+            f"      Product code:         26267  (0x669b)\n"
+            f"      Serial number:        1227734{i:05d}\n"
+            f"      Binary serial number: {i} (0x{i:08x})\n"
+            f"      Manufacture year:     2023,  Week: 43\n"
+            f"   VCP version:         2.1\n"
+        )
+    return "\n".join(blocks)
+
+
+def measure(func: Callable[[], object], duration: float, memory_calls: int) -> Dict:
+    """
+    Benchmark one callable
+    
+    Args:
+        func: Function under test
+        duration: Seconds to spend on the throughput measurement
+        memory_calls: Calls traced for the memory measurement
+    
+    Returns:
+        Result dictionary (ops_per_sec, mean_us, p50_us, p99_us,
+        peak_bytes_per_op, retained_bytes)
+    """
+    # Warm up caches and lazy imports
+    for _ in range(3):
+        func()
+    
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline or len(samples) < 10:
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    
+    total_s = sum(samples) / 1e9
+    ordered = sorted(samples)
+    
+    # Memory: transient peak per call and bytes still held after all calls
+    tracemalloc.start()
+    peaks = []
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(memory_calls):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        'calls': len(samples),
+        'ops_per_sec': len(samples) / total_s,
+        'mean_us': total_s / len(samples) * 1e6,
+        'p50_us': ordered[len(ordered) // 2] / 1000,
+        'p99_us': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] / 1000,
+        'peak_bytes_per_op': int(statistics.median(peaks)),
+        'retained_bytes': max(0, current - baseline),
+    }
+
+
+def build_benchmarks(root: str, config_dir: Path, displays: int) -> Dict[str, Callable]:
+    """Create the benchmark callables against the given root"""
+    monitor = LegionMonitor(root=root)
+    sysfs = LegionSysfs(root=root)
+    acpi = LegionACPI(root=root)
+    config = LegionConfig(config_dir=config_dir)
+    
+    # The parser needs no ddcutil binary, so skip the availability check
+    ddc = DDCController.__new__(DDCController)
+    detect_output = make_detect_output(displays)
+    
+    counter = iter(range(10 ** 9))
+    
+    return {
+        'monitor.get_battery_status': monitor.get_battery_status,
+        'monitor.get_temperatures': monitor.get_temperatures,
+        'sysfs.get_all_status': sysfs.get_all_status,
+        'acpi.get_conservation_mode': acpi.get_conservation_mode,
+        'acpi.get_rapid_charge': acpi.get_rapid_charge,
+        'acpi.get_power_profile': acpi.get_power_profile,
+        f'ddc.parse_detect_output[{displays}]': lambda: ddc._parse_detect_output(detect_output),
+        'config.set': lambda: config.set('bench_counter', next(counter)),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> bool:
+    """
+    Print a comparison against a baseline
+    
+    Regressions are judged on median latency, which is far less
+    sensitive to scheduler noise than mean throughput.
+    
+    Returns:
+        True if any benchmark regressed by more than threshold percent
+    """
+    regressed = False
+    print(f"\n{'benchmark':<36} {'baseline p50':>12} {'current p50':>12} {'change':>9}  mem/op")
+    for name, current in results['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"{name:<36} {'-':>12} {current['p50_us']:>10.1f}us {'new':>9}")
+            continue
+        
+        # Positive change = slower
+        change = (current['p50_us'] / base['p50_us'] - 1) * 100
+        mem_change = current['peak_bytes_per_op'] - base['peak_bytes_per_op']
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:<36} {base['p50_us']:>10.1f}us {current['p50_us']:>10.1f}us "
+              f"{change:>+8.1f}%  {mem_change:+d} B{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--duration', type=float, default=1.0,
+                        help="seconds per benchmark (default: 1)")
+    parser.add_argument('--memory-calls', type=int, default=50,
+                        help="calls traced for memory per benchmark (default: 50)")
+    parser.add_argument('--displays', type=int, default=200,
+                        help="displays in the synthetic detect output (default: 200)")
+    parser.add_argument('--root', metavar='DIR',
+                        help="existing hardware root, e.g. / for real hardware "
+                             "(default: start a simulated tree)")
+    parser.add_argument('--filter', metavar='TEXT',
+                        help="only run benchmarks whose name contains TEXT")
+    parser.add_argument('--output', type=Path, metavar='FILE',
+                        help="write results as JSON")
+    parser.add_argument('--compare', type=Path, metavar='FILE',
+                        help="compare against a baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="median latency increase in percent reported as a regression "
+                             "with --compare (default: 10)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        simulator = None
+        root = args.root
+        if root is None:
+            simulator = LegionSimulator(Path(tmp) / 'root', seed=0)
+            simulator.start()
+            root = str(simulator.root)
+        
+        try:
+            benchmarks = build_benchmarks(root, Path(tmp) / 'config', args.displays)
+            results = {
+                'meta': {
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                    'simulated': simulator is not None,
+                    'duration_s': args.duration,
+                },
+                'results': {},
+            }
+            
+            print(f"{'benchmark':<36} {'ops/sec':>12} {'mean':>10} {'p99':>10} {'mem/op':>10}")
+            for name, func in benchmarks.items():
+                if args.filter and args.filter not in name:
+                    continue
+                r = measure(func, args.duration, args.memory_calls)
+                results['results'][name] = r
+                print(f"{name:<36} {r['ops_per_sec']:>12.0f} {r['mean_us']:>8.1f}us "
+                      f"{r['p99_us']:>8.1f}us {r['peak_bytes_per_op']:>8d} B")
+        finally:
+            if simulator is not None:
+                simulator.stop()
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+D-Bus load generator for Legion Power Service
+
+Starts a private session bus, the simulated hardware tree and a service
+instance (--session --root --watch-stalls), then runs N client processes
+that issue a weighted mix of Get/Set calls at a fixed total rate.
+
+Reports throughput, client-side latency percentiles per method,
+server-side latency from GetMetrics and main-loop stalls measured by the
+service's heartbeat. Latency is measured from each call's scheduled send
+time (open loop), so a service that falls behind shows up as queueing
+delay instead of silently lowering the offered rate.
+    
+    python3 bench_dbus_load.py --clients 8 --rate 400 --duration 20
+    python3 bench_dbus_load.py --mix GetBatteryStatus=3,SetPowerProfile=1
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND))
+
+from legion_simulator import LegionSimulator
+
+SERVICE_NAME = 'com.legion.Power'
+OBJECT_PATH = '/com/legion/Power'
+INTERFACE = 'com.legion.Power.Manager'
+
+DEFAULT_MIX = ('GetBatteryStatus=40,GetTemperatures=20,GetPowerProfile=10,'
+               'GetConservationMode=10,GetFanSpeed=10,SetPowerProfile=5,SetFanMode=5')
+
+# Arguments for each call; Set* methods cycle through valid values
+CALL_ARGS = {
+    'SetPowerProfile': lambda i: (('quiet', 'balanced', 'performance')[i % 3],),
+    'SetFanMode': lambda i: (('auto', 'quiet', 'performance')[i % 3],),
+    'SetConservationMode': lambda i: (bool(i % 2),),
+    'SetRapidCharge': lambda i: (bool(i % 2),),
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse 'Method=weight,...'"""
+    mix = {}
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run_client(client_id: int, address: str, rate: float, start_at: float,
+               duration: float, mix: Dict[str, float], results):
+    """
+    Client process: issue calls on a fixed schedule
+    
+    Args:
+        client_id: Client number (seeds the method choice)
+        address: Bus address
+        rate: Calls per second for this client
+        start_at: Wall-clock start time shared by all clients
+        duration: Seconds to run
+        mix: Method name -> weight
+        results: Queue receiving {method: [(latency_ms, error), ...]}
+    """
+    import dbus
+    
+    bus = dbus.bus.BusConnection(address)
+    iface = dbus.Interface(bus.get_object(SERVICE_NAME, OBJECT_PATH), INTERFACE)
+    chooser = random.Random(client_id)
+    methods, weights = list(mix), list(mix.values())
+    samples: Dict[str, list] = {name: [] for name in methods}
+    
+    time.sleep(max(0, start_at - time.time()))
+    start = time.monotonic() + chooser.random() / rate  # spread clients out
+    i = 0
+    while True:
+        scheduled = start + i / rate
+        if scheduled - start >= duration:
+            break
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        
+        method = chooser.choices(methods, weights)[0]
+        args = CALL_ARGS.get(method, lambda i: ())(i)
+        error = False
+        try:
+            getattr(iface, method)(*args, timeout=30)
+        except dbus.exceptions.DBusException:
+            error = True
+        samples[method].append(((time.monotonic() - scheduled) * 1000, error))
+        i += 1
+    
+    results.put(samples)
+
+
+def wait_for_service(bus, timeout: float):
+    """Block until the service name has an owner"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if bus.name_has_owner(SERVICE_NAME):
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f"{SERVICE_NAME} did not appear within {timeout}s")
+
+
+def summarize(samples: Dict[str, list], duration: float) -> Dict:
+    """Client-side throughput and latency per method and overall"""
+    per_method = {}
+    all_latencies = []
+    total_errors = 0
+    for method, values in sorted(samples.items()):
+        latencies = sorted(latency for latency, _ in values)
+        errors = sum(1 for _, error in values if error)
+        total_errors += errors
+        all_latencies.extend(latencies)
+        per_method[method] = {
+            'calls': len(latencies),
+            'errors': errors,
+            'p50_ms': percentile(latencies, 0.50),
+            'p99_ms': percentile(latencies, 0.99),
+            'max_ms': latencies[-1] if latencies else 0.0,
+        }
+    
+    all_latencies.sort()
+    return {
+        'calls': len(all_latencies),
+        'errors': total_errors,
+        'throughput': len(all_latencies) / duration,
+        'p50_ms': percentile(all_latencies, 0.50),
+        'p99_ms': percentile(all_latencies, 0.99),
+        'max_ms': all_latencies[-1] if all_latencies else 0.0,
+        'methods': per_method,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('-c', '--clients', type=int, default=4,
+                        help="concurrent client processes (default: 4)")
+    parser.add_argument('-r', '--rate', type=float, default=200,
+                        help="total calls per second across all clients (default: 200)")
+    parser.add_argument('-d', '--duration', type=float, default=10,
+                        help="seconds of load (default: 10)")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f"weighted method mix (default: {DEFAULT_MIX})")
+    parser.add_argument('--json', type=Path, metavar='FILE',
+                        help="write results as JSON")
+    args = parser.parse_args()
+    
+    import dbus
+    
+    mix = parse_mix(args.mix)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        bus_daemon = subprocess.Popen(
+            ['dbus-daemon', '--session', '--nofork', '--print-address=1',
+             f'--address=unix:path={tmp / "bus"}'],
+            stdout=subprocess.PIPE, text=True
+        )
+        simulator = LegionSimulator(tmp / 'root', seed=0)
+        service = None
+        try:
+            address = bus_daemon.stdout.readline().strip()
+            simulator.start()
+            
+            env = dict(os.environ, DBUS_SESSION_BUS_ADDRESS=address, HOME=str(tmp))
+            with open(tmp / 'service.out', 'w') as log:
+                service = subprocess.Popen(
+                    [sys.executable, str(BACKEND / 'legion_power_service.py'),
+                     '--session', '--root', str(tmp / 'root'), '--watch-stalls'],
+                    env=env, stdout=log, stderr=subprocess.STDOUT
+                )
+            
+            bus = dbus.bus.BusConnection(address)
+            wait_for_service(bus, timeout=15)
+            iface = dbus.Interface(bus.get_object(SERVICE_NAME, OBJECT_PATH), INTERFACE)
+            # Let background init finish before measuring
+            iface.GetBatteryStatus(timeout=30)
+            time.sleep(1)
+            before = iface.GetMetrics()
+            
+            ctx = multiprocessing.get_context('spawn')
+            results = ctx.Queue()
+            start_at = time.time() + 1.0
+            clients = [
+                ctx.Process(target=run_client,
+                            args=(i, address, args.rate / args.clients, start_at,
+                                  args.duration, mix, results))
+                for i in range(args.clients)
+            ]
+            for client in clients:
+                client.start()
+            
+            samples: Dict[str, list] = {name: [] for name in mix}
+            for _ in clients:
+                for method, values in results.get().items():
+                    samples[method].extend(values)
+            for client in clients:
+                client.join()
+            
+            after = iface.GetMetrics()
+        finally:
+            if service is not None:
+                service.terminate()
+                service.wait(timeout=10)
+            simulator.stop()
+            bus_daemon.terminate()
+            bus_daemon.wait(timeout=10)
+    
+    report = summarize(samples, args.duration)
+    report['offered_rate'] = args.rate
+    report['clients'] = args.clients
+    
+    stall = dict(after['operations'].get('mainloop.stall', {}))
+    stall['stalls'] = int(after['counters'].get('mainloop.stalls', 0)
+                          - before['counters'].get('mainloop.stalls', 0))
+    report['mainloop_stall'] = {k: float(v) for k, v in stall.items()}
+    report['server'] = {
+        op[len('dbus.'):]: {k: float(v) for k, v in summary.items()}
+        for op, summary in after['operations'].items()
+        if op.startswith('dbus.') and op[len('dbus.'):] in mix
+    }
+    
+    print(f"{args.clients} clients, offered {args.rate:.0f}/s for {args.duration:.0f}s: "
+          f"{report['throughput']:.1f} calls/s, {report['errors']} errors")
+    print(f"latency p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, "
+          f"max {report['max_ms']:.2f} ms\n")
+    print(f"{'method':<22} {'calls':>7} {'errors':>7} {'p50':>9} {'p99':>9} "
+          f"{'server p50':>11} {'server p99':>11}")
+    for method, r in report['methods'].items():
+        server = report['server'].get(method, {})
+        print(f"{method:<22} {r['calls']:>7} {r['errors']:>7} {r['p50_ms']:>7.2f}ms "
+              f"{r['p99_ms']:>7.2f}ms {server.get('p50_ms', 0):>9.2f}ms "
+              f"{server.get('p99_ms', 0):>9.2f}ms")
+    print(f"\nmain-loop stalls (>50 ms): {stall['stalls']} "
+          f"(heartbeat lateness p99 {stall.get('p99_ms', 0):.1f} ms, "
+          f"max {stall.get('max_ms', 0):.1f} ms)")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+DDCController benchmark against simulated monitors
+
+Runs DDCController against the stub ddcutil from ddc_simulator (and with
+--native against its simulated /dev/i2c-N buses), so detection,
+brightness get/set and locking can be measured without real monitors:
+
+- detect: cold detection (DRM connectors, DDC/CI probes for new
+  monitors only) vs cached lookups
+- get/set: sequential brightness reads and writes, and batched reads
+  of all default VCP features (get_vcp_values)
+- contention: an applet slider drag (set at 30 Hz) while the applet
+  poller and the GUI read the same display; reports failed calls per
+  caller and whether the display ends at the slider's last value
+    
+    python3 bench_ddc.py --monitors 2 --failure-rate 0.02
+    python3 bench_ddc.py --native
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from ddc_monitor import DDCController
+from ddc_simulator import DEFAULT_LATENCY_MS, DDCBusSimulator
+
+
+def summarize(latencies_ms: List[float], failures: int = 0) -> Dict:
+    """Latency summary in milliseconds"""
+    ordered = sorted(latencies_ms)
+    if not ordered:
+        return {'calls': 0, 'failures': failures}
+    return {
+        'calls': len(ordered),
+        'failures': failures,
+        'p50_ms': statistics.median(ordered),
+        'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        'max_ms': ordered[-1],
+    }
+
+
+def timed_calls(func: Callable[[], object], count: int) -> Dict:
+    """Call func count times; falsy results count as failures"""
+    latencies = []
+    failures = 0
+    for _ in range(count):
+        start = time.perf_counter()
+        ok = func()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if not ok:
+            failures += 1
+    return summarize(latencies, failures)
+
+
+def bench_detect(controller: DDCController, runs: int) -> Dict:
+    """Cold detection vs cache hits"""
+    return {
+        'cold': timed_calls(lambda: controller.detect_monitors(use_cache=False), runs),
+        'cached': timed_calls(lambda: controller.detect_monitors(use_cache=True), runs * 100),
+    }
+
+
+def bench_get_set(controller: DDCController, runs: int) -> Dict:
+    """Sequential brightness reads and writes on display 1, group writes on all"""
+    features = len(controller.FEATURE_CODES)
+    values = iter(range(10 ** 6))
+    
+    def set_all() -> bool:
+        results = controller.set_brightness_all(next(values) % 100 + 1)
+        return all(success for success, _ in results.values())
+    
+    return {
+        'get': timed_calls(lambda: controller.get_brightness(1, force=True) > 0, runs),
+        'set': timed_calls(lambda: controller.set_brightness(1, next(values) % 100 + 1), runs),
+        'set_all': timed_calls(set_all, runs),
+        'features': timed_calls(lambda: len(controller.get_vcp_values(1)) == features, runs),
+    }
+
+
+def bench_contention(controller: DDCController, simulator: DDCBusSimulator,
+                     duration: float) -> Dict:
+    """Slider drag vs. concurrent readers on one display"""
+    stop = threading.Event()
+    results: Dict[str, Dict] = {}
+    last_slider_value = [None]
+    applied = {'applied': 0, 'failed': 0}
+    
+    def on_applied(display_id: int, value: int, success: bool):
+        applied['applied' if success else 'failed'] += 1
+    
+    def periodic(name: str, interval: float, call: Callable[[int], bool]):
+        latencies, failures, i = [], 0, 0
+        next_at = time.monotonic()
+        while not stop.is_set():
+            start = time.perf_counter()
+            if not call(i):
+                failures += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+            i += 1
+            next_at += interval
+            stop.wait(max(0, next_at - time.monotonic()))
+        results[name] = summarize(latencies, failures)
+    
+    def slider(i: int) -> bool:
+        # Drag back and forth across 1-100 (get_brightness reports
+        # failures as 0, so the readers' success check needs non-zero)
+        value = abs((i * 3) % 198 - 99) + 1
+        last_slider_value[0] = value
+        controller.request_brightness(1, value, on_applied)
+        return True
+    
+    callers = (
+        ('slider', 1 / 30, slider),
+        ('applet_poll', 0.2, lambda i: controller.get_brightness(1) > 0),
+        ('gui_poll', 1.0, lambda i: controller.get_brightness(1) > 0),
+    )
+    threads = [threading.Thread(target=periodic, args=caller) for caller in callers]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    controller.wait_for_writes()
+    
+    results['slider_writes'] = dict(applied)
+    final = simulator.get_vcp(1)
+    results['final_value'] = final
+    results['last_slider_value'] = last_slider_value[0]
+    results['final_value_matches'] = final == last_slider_value[0]
+    return results
+
+
+def print_summary(name: str, r: Dict):
+    """Print one summary line"""
+    if not r.get('calls'):
+        print(f"  {name:<14} no calls")
+        return
+    print(f"  {name:<14} {r['calls']:>6} calls {r['failures']:>5} failed   "
+          f"p50 {r['p50_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  max {r['max_ms']:>8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--monitors', type=int, default=2,
+                        help="simulated monitors (default: 2)")
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help="probability that a ddcutil command fails (default: 0)")
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help="multiply all simulated command latencies (default: 1)")
+    parser.add_argument('--runs', type=int, default=20,
+                        help="sequential calls per get/set/detect benchmark (default: 20)")
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help="seconds of the contention scenario (default: 5)")
+    parser.add_argument('--native', action='store_true',
+                        help="probe and get/set brightness over the simulated I2C "
+                             "buses instead of ddcutil")
+    parser.add_argument('--json', type=Path, metavar='FILE',
+                        help="write results as JSON")
+    args = parser.parse_args()
+    
+    # Failed calls are expected under contention; keep the output readable
+    logging.basicConfig(level=logging.CRITICAL)
+    
+    latency = {k: v * args.latency_scale for k, v in DEFAULT_LATENCY_MS.items()}
+    with DDCBusSimulator(monitors=args.monitors, latency_ms=latency,
+                         failure_rate=args.failure_rate, i2c=args.native) as simulator:
+        controller = DDCController(ddcutil=simulator.ddcutil_path, native=args.native,
+                                   root=str(simulator.directory))
+        
+        results = {
+            'config': {'monitors': args.monitors, 'failure_rate': args.failure_rate,
+                       'latency_ms': latency, 'native': args.native},
+            'detect': bench_detect(controller, max(1, args.runs // 4)),
+            'brightness': bench_get_set(controller, args.runs),
+            'contention': bench_contention(controller, simulator, args.duration),
+        }
+        results['ddcutil_commands'] = simulator.command_count()
+        results['i2c_transfers'] = simulator.i2c_transfer_count()
+        controller.close()
+    
+    print("detect")
+    for name, r in results['detect'].items():
+        print_summary(name, r)
+    print("brightness")
+    for name, r in results['brightness'].items():
+        print_summary(name, r)
+    print(f"contention ({args.duration:.0f}s)")
+    contention = results['contention']
+    for name in ('slider', 'applet_poll', 'gui_poll'):
+        print_summary(name, contention[name])
+    print(f"  slider writes applied {contention['slider_writes']['applied']}, "
+          f"failed {contention['slider_writes']['failed']}")
+    print(f"  final value {contention['final_value']} "
+          f"(slider ended at {contention['last_slider_value']}) -> "
+          f"{'OK' if contention['final_value_matches'] else 'LOST UPDATE'}")
+    print(f"\n{results['ddcutil_commands']} ddcutil commands, "
+          f"{results['i2c_transfers']} native I2C transfers")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
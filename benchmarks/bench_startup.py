@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cold-start vs warm-start benchmark for Legion Power Service
+
+Measures the time from creating the service object until it has
+brought its components up, restored settings and answered a first
+GetExternalMonitors call:
+
+- cold: no state snapshot, every component is probed and monitors detected
+- warm: rehydrated from the snapshot written on idle exit
+
+The service object is not exported on the bus, so this can run next to
+an installed service. Run as the same user as the service (root) to
+measure real hardware access, or pass --simulate to run against the
+simulated hardware tree from legion_simulator.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from legion_power_service import LegionPowerService
+from legion_simulator import LegionSimulator
+from legion_snapshot import StateSnapshot
+
+
+def run_once(snapshot_path: Path, config_dir: Path = None) -> float:
+    """Start one service instance and return time to first answered call (ms)"""
+    start = time.perf_counter()
+    service = LegionPowerService(None, snapshot=StateSnapshot(snapshot_path),
+                                 config_dir=config_dir)
+    service.initialize()
+    service.GetExternalMonitors()
+    return (time.perf_counter() - start) * 1000
+
+
+def prime_snapshot(snapshot_path: Path, config_dir: Path = None):
+    """Write a snapshot the same way idle exit does"""
+    service = LegionPowerService(None, snapshot=StateSnapshot(snapshot_path),
+                                 config_dir=config_dir)
+    service.initialize()
+    service.GetExternalMonitors()
+    service._snapshot.save(service._collect_snapshot())
+
+
+def summarize(samples):
+    """Summary statistics in milliseconds"""
+    ordered = sorted(samples)
+    return {
+        'runs': len(samples),
+        'min_ms': ordered[0],
+        'median_ms': statistics.median(ordered),
+        'p90_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+        'max_ms': ordered[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('-n', '--runs', type=int, default=10,
+                        help="runs per mode (default: 10)")
+    parser.add_argument('--json', action='store_true',
+                        help="print results as JSON")
+    parser.add_argument('--simulate', action='store_true',
+                        help="run against simulated hardware instead of /sys and /proc")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = Path(tmp) / 'snapshot.json'
+        config_dir = None
+        simulator = None
+        if args.simulate:
+            simulator = LegionSimulator(Path(tmp) / 'root')
+            simulator.start()
+            os.environ['LEGION_POWER_ROOT'] = str(simulator.root)
+            config_dir = Path(tmp) / 'config'
+        
+        try:
+            cold = []
+            for _ in range(args.runs):
+                snapshot_path.unlink(missing_ok=True)
+                cold.append(run_once(snapshot_path, config_dir))
+            
+            warm = []
+            for _ in range(args.runs):
+                prime_snapshot(snapshot_path, config_dir)
+                warm.append(run_once(snapshot_path, config_dir))
+        finally:
+            if simulator is not None:
+                simulator.stop()
+    
+    results = {'cold': summarize(cold), 'warm': summarize(warm)}
+    results['speedup'] = results['cold']['median_ms'] / max(results['warm']['median_ms'], 1e-6)
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"{'mode':<6} {'runs':>5} {'min':>10} {'median':>10} {'p90':>10} {'max':>10}")
+    for mode in ('cold', 'warm'):
+        r = results[mode]
+        print(f"{mode:<6} {r['runs']:>5} {r['min_ms']:>8.1f}ms {r['median_ms']:>8.1f}ms "
+              f"{r['p90_ms']:>8.1f}ms {r['max_ms']:>8.1f}ms")
+    print(f"\nWarm start is {results['speedup']:.1f}x faster (median)")
+
+
+if __name__ == '__main__':
+    main()